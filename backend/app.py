@@ -3,9 +3,20 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 from config import Config
-from extensions import db, ma
+from extensions import db, ma, migrate, socketio
 from database.db_init import init_db
 from routes import register_blueprints
+from commands import register_commands
+from services.analytics_service import AnalyticsService
+from services.stk_dispatcher import StkDispatcher
+from services.callback_inbox import CallbackInboxService
+from services.realtime import RealtimeService
+from services.token_service import TokenService
+from services.password_hasher import PasswordHasher
+from services.rate_limiter import RateLimiter
+from services.entity_cache import EntityCache
+from services.user_version import UserVersionService
+from services.request_metrics import RequestMetrics
 
 # Load environment variables from .env
 load_dotenv()
@@ -17,24 +28,56 @@ def create_app():
     # ————— Enable CORS on all /api/* routes for our React frontend —————
     CORS(
         app,
-        resources={r"/api/*": {
-            "origins": [
-                "http://localhost:5173",
-                "https://money-transfer-d.onrender.com"
-            ]
-        }},
+        resources={r"/api/*": {"origins": app.config["FRONTEND_ORIGINS"]}},
         supports_credentials=True,
         allow_headers=["Content-Type", "Authorization"],
-        expose_headers=["Authorization"]
+        expose_headers=["Authorization", "ETag", "Server-Timing"]
     )
 
     # Initialize extensions
     db.init_app(app)
     ma.init_app(app)
+    migrate.init_app(
+        app, db,
+        directory=os.path.join(os.path.dirname(__file__), "migrations"),
+        render_as_batch=True,  # SQLite needs batch mode for ALTERs
+    )
+
+    # SQL count/time, Server-Timing headers, slow-query log and /metrics
+    # (first, so its timing covers the other request hooks)
+    RequestMetrics.init_app(app)
+
+    # Signed bearer tokens (keyed by SECRET_KEY)
+    TokenService.init_app(app)
+    PasswordHasher.init_app(app)
+
+    # Socket.IO, with per-user events emitted after commit
+    RealtimeService.init_app(app)
+
+    # Keep analytics rollups in step with every flushed Transaction
+    AnalyticsService.init_app(app)
+
+    # Background STK push sender (thread pool is started on first use)
+    StkDispatcher.init_app(app)
+
+    # M-Pesa callbacks are queued in an inbox and settled in batches
+    CallbackInboxService.init_app(app)
+
+    # Cached user / beneficiary / wallet-id lookups, evicted on commit
+    EntityCache.init_app(app)
+
+    # Per-user change counters behind the ETags of user-scoped GETs
+    UserVersionService.init_app(app)
+
+    # Per-route rate limits (before_request)
+    RateLimiter.init_app(app)
 
     # Register all blueprints
     register_blueprints(app)
 
+    # Register CLI jobs (flask ledger ..., flask analytics ..., flask mpesa ..., flask seed ...)
+    register_commands(app)
+
     # Global error handlers
     @app.errorhandler(404)
     def not_found_error(error):
@@ -55,6 +98,6 @@ if __name__ == "__main__":
 
     # Run server
     port = int(os.environ.get("PORT", 5000))
-    app.run(debug=True, port=port)
+    socketio.run(app, debug=True, port=port)
 
 
@@ -0,0 +1,112 @@
+"""
+Payroll-style payouts: N calls to /api/transactions/send vs one call to
+/api/transactions/send/batch.
+
+Gives a sender --beneficiaries beneficiaries (half of them registered
+users, so both sides of those transfers are written), then pays each of
+them --amount per round, first one /send at a time and then as a single
+batch. Reports wall time, SQL statements and commits per round, and checks
+the ledger reconciles afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch [--beneficiaries 100 500] [--amount 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--beneficiaries", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--amount", type=float, default=10)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_batch.db")
+    os.environ["CALLBACK_INBOX_WORKER"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["TRANSFER_BATCH_MAX_ITEMS"] = str(max(args.beneficiaries))
+
+    from sqlalchemy import event
+    from app import create_app
+    from extensions import db
+    from models.user import User
+    from models.wallet import Wallet
+    from models.beneficiary import Beneficiary
+    from services.ledger_service import LedgerService
+    from services.transfer_service import TransferService
+    from services.token_service import TokenService
+
+    app = create_app()
+    counts = {"statements": 0, "commits": 0}
+    with app.app_context():
+        db.create_all()
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count(*_):
+            counts["statements"] += 1
+
+        @event.listens_for(db.engine, "commit")
+        def _commit(*_):
+            counts["commits"] += 1
+
+    client = app.test_client()
+    ok = True
+    print(f"{'items':>6} {'mode':<8} {'ms':>9} {'statements':>11} {'commits':>8}")
+    for n in args.beneficiaries:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            sender = User(email="payroll@example.com", password_hash="x", first_name="Pay",
+                          last_name="Roll", phone="+254700000000")
+            db.session.add(sender)
+            db.session.flush()
+            wallet = Wallet(user_id=sender.id, balance=0)
+            db.session.add(wallet)
+            db.session.flush()
+            TransferService.credit(wallet.id, n * args.amount * 10)
+            for i in range(n):
+                phone = f"+2547{i + 1:08d}"
+                if i % 2 == 0:
+                    staff = User(email=f"staff{i}@example.com", password_hash="x",
+                                 first_name="Staff", last_name=str(i), phone=phone)
+                    db.session.add(staff)
+                    db.session.flush()
+                    db.session.add(Wallet(user_id=staff.id, balance=0))
+                db.session.add(Beneficiary(user_id=sender.id, name=f"Staff {i}", phone=phone))
+            db.session.commit()
+            ids = [b.id for b in Beneficiary.query.filter_by(user_id=sender.id).order_by(Beneficiary.id)]
+            headers = {"Authorization": f"Bearer {TokenService.issue(sender.id, sender.role)}"}
+
+        def loop():
+            for beneficiary_id in ids:
+                r = client.post("/api/transactions/send", headers=headers,
+                                json={"beneficiaryId": beneficiary_id, "amount": args.amount})
+                if r.status_code != 200:
+                    return False
+            return True
+
+        def batch():
+            r = client.post("/api/transactions/send/batch", headers=headers, json={
+                "items": [{"beneficiaryId": i, "amount": args.amount} for i in ids]})
+            return r.status_code == 200 and r.json["completed"] == n
+
+        for mode, fn in (("loop", loop), ("batch", batch)):
+            counts.update(statements=0, commits=0)
+            t0 = time.perf_counter()
+            ok &= fn()
+            elapsed = time.perf_counter() - t0
+            print(f"{n:>6} {mode:<8} {elapsed * 1000:9.1f} {counts['statements']:>11} {counts['commits']:>8}")
+
+        with app.app_context():
+            report = LedgerService.reconcile()
+            ok &= report["ok"]
+
+    print("OK: ledger reconciles" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Response path of user-scoped GETs: full response vs If-None-Match (304).
+
+Gives one user --transactions transactions and --beneficiaries
+beneficiaries, then requests balance, profile, beneficiaries and the first
+page of history --requests times each, once plainly and once with the ETag
+from the previous response. Reports time per request, SQL statements per
+request and bytes sent.
+
+Usage (from backend/):
+    python -m benchmarks.bench_etag [--transactions 5000] [--beneficiaries 50] [--requests 300]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--beneficiaries", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_etag.db")
+    os.environ["CALLBACK_INBOX_WORKER"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+
+    from sqlalchemy import event
+    from app import create_app
+    from extensions import db
+    from models.user import User
+    from models.wallet import Wallet
+    from models.beneficiary import Beneficiary
+    from models.transaction import Transaction
+    from services.token_service import TokenService
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email="etag@example.com", password_hash="x", first_name="Etag",
+                    last_name="Bench", phone="+254700000000")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Wallet(user_id=user.id, balance=0))
+        db.session.add_all([Beneficiary(user_id=user.id, name=f"B{i}", phone=f"+2547{i:08d}")
+                            for i in range(args.beneficiaries)])
+        start = datetime.datetime.utcnow() - datetime.timedelta(days=30)
+        db.session.add_all([
+            Transaction(user_id=user.id, type="deposit", amount=100, fee=0, status="completed",
+                        description=f"tx {i}", created_at=start + datetime.timedelta(minutes=i))
+            for i in range(args.transactions)
+        ])
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {TokenService.issue(user.id, user.role)}"}
+
+        queries = {"n": 0}
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count(*_):
+            queries["n"] += 1
+
+    client = app.test_client()
+    ok = True
+    print(f"{args.transactions} transactions, {args.beneficiaries} beneficiaries, "
+          f"{args.requests} requests per row")
+    print(f"{'endpoint':<22} {'mode':<6} {'status':>6} {'ms/req':>8} {'queries/req':>12} {'bytes':>8}")
+    for url in ("/api/wallet/balance", "/api/auth/profile",
+                "/api/beneficiaries/", "/api/transactions/"):
+        etag = client.get(url, headers=headers).headers["ETag"]
+        for mode, extra in (("full", {}), ("304", {"If-None-Match": etag})):
+            queries["n"] = 0
+            t0 = time.perf_counter()
+            for _ in range(args.requests):
+                response = client.get(url, headers={**headers, **extra})
+            elapsed = time.perf_counter() - t0
+            print(f"{url:<22} {mode:<6} {response.status_code:>6} "
+                  f"{elapsed / args.requests * 1000:8.2f} {queries['n'] / args.requests:12.1f} "
+                  f"{len(response.data):8}")
+            if mode == "304" and response.status_code != 304:
+                ok = False
+
+    print("OK" if ok else "FAIL: conditional request did not get a 304")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Seed a large transaction table (`flask seed synthetic`'s generator: skewed
+hot accounts, a year of history) and time the hot controller paths with and
+without the composite indexes from migration 8d031ad2720e.
+
+Usage (from backend/):
+    python -m benchmarks.bench_indexes [--transactions 1000000] [--users 1000]
+
+Uses DATABASE_URL when set (e.g. a local Postgres), otherwise a throwaway
+SQLite file. The target database is dropped and rebuilt.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+INDEXES = [
+    ("ix_transaction_user_created", "transaction", ["user_id", "created_at", "id"]),
+    ("ix_transaction_created", "transaction", ["created_at", "id"]),
+    ("ix_transaction_type_status_created", "transaction", ["type", "status", "created_at"]),
+    ("ix_beneficiary_user_id", "beneficiary", ["user_id"]),
+]
+
+
+def workloads(users):
+    from controllers import admin_controller, beneficiary_controller, transaction_controller
+    from controllers import wallet_controller
+
+    rng = random.Random(7)
+    return {
+        "transaction_controller.get_transactions":
+            lambda: transaction_controller.get_transactions(rng.randint(1, users)),
+        "transaction_controller.get_transactions(type=deposit)":
+            lambda: transaction_controller.get_transactions(rng.randint(1, users), {"type": "deposit"}),
+        "admin_controller.get_all_transactions":
+            lambda: admin_controller.get_all_transactions(),
+        "admin_controller.get_all_transactions(status=pending)":
+            lambda: admin_controller.get_all_transactions({"status": "pending"}),
+        "admin_controller.get_user_details_for_admin":
+            lambda: admin_controller.get_user_details_for_admin(rng.randint(1, users)),
+        "beneficiary_controller.get_beneficiaries":
+            lambda: beneficiary_controller.get_beneficiaries(rng.randint(1, users)),
+        "wallet_controller.get_wallet_balance":
+            lambda: wallet_controller.get_wallet_balance(rng.randint(1, users)),
+        "wallet_controller.get_transaction_status":
+            lambda: wallet_controller.get_transaction_status("unknown-checkout-id", rng.randint(1, users)),
+    }
+
+
+def measure(db, fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            fn()
+        except ValueError:
+            pass
+        samples.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "bench_indexes.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from extensions import db
+    from database import synthetic
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        counts = synthetic.generate(args.users, args.transactions, days=365, batch_size=50_000)
+        print(f"Seeded {counts['transactions']:,} transactions in {counts['seconds']}s")
+
+        def set_indexes(present):
+            with db.engine.begin() as conn:
+                for name, table, cols in INDEXES:
+                    conn.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+                    if present:
+                        quoted = ", ".join(cols)
+                        conn.exec_driver_sql(f'CREATE INDEX {name} ON "{table}" ({quoted})')
+                conn.exec_driver_sql("ANALYZE")
+
+        results = {}
+        for label, present in (("before", False), ("after", True)):
+            set_indexes(present)
+            for name, fn in workloads(args.users).items():
+                results.setdefault(name, {})[label] = measure(db, fn, args.repeat)
+
+        width = max(len(n) for n in results)
+        print(f"{'query':<{width}}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}")
+        for name, r in results.items():
+            speedup = r["before"] / r["after"] if r["after"] else float("inf")
+            print(f"{name:<{width}}  {r['before']:>10.2f}  {r['after']:>10.2f}  {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
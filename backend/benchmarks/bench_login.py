@@ -0,0 +1,123 @@
+"""
+Login throughput under a login storm: inline hashing vs the process pool.
+
+Starts the app under gunicorn with the production eventlet worker (see
+Dockerfile) once per mode, then has --clients threads log in as fast as they
+can for --seconds while another thread keeps requesting /api/auth/profile, a
+cheap, I/O-bound call:
+
+  - inline: PASSWORD_HASH_WORKERS=0, PBKDF2 runs on the web worker
+  - pool:   PASSWORD_HASH_WORKERS=--workers, PBKDF2 runs in the process pool
+
+Reports logins/s with login latency, and the latency of the profile requests
+that were competing with the storm. In inline mode the eventlet hub is
+blocked for the length of each hash, so those requests queue behind logins.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login [--clients 16] [--seconds 10] [--workers 2]
+        [--method pbkdf2:sha256:600000]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(workers, method):
+    port = _free_port()
+    env = dict(os.environ,
+               DATABASE_URL="sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_login.db"),
+               SOCKETIO_ASYNC_MODE="eventlet",
+               CALLBACK_INBOX_WORKER="0",
+               PASSWORD_HASH_WORKERS=str(workers),
+               PASSWORD_HASH_METHOD=method,
+               PASSWORD_HASH_QUEUE="1000")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "wsgi:app", "--bind", f"127.0.0.1:{port}",
+         "--worker-class", "eventlet", "--workers", "1", "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url + "/api/auth/profile", timeout=1)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def _pct(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else float("nan")
+
+
+def _run(url, clients, seconds):
+    credentials = {"email": "john@example.com", "password": "password123"}
+    token = requests.post(url + "/api/auth/login", json=credentials).json()["token"]
+    stop = time.monotonic() + seconds
+    logins, probes, errors = [], [], []
+
+    def login_loop():
+        with requests.Session() as http:
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                r = http.post(url + "/api/auth/login", json=credentials)
+                (logins if r.status_code == 200 else errors).append(time.perf_counter() - start)
+
+    def probe_loop():
+        with requests.Session() as http:
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                http.get(url + "/api/auth/profile", headers={"Authorization": f"Bearer {token}"})
+                probes.append(time.perf_counter() - start)
+                time.sleep(0.05)
+
+    prober = threading.Thread(target=probe_loop)
+    prober.start()
+    with ThreadPoolExecutor(clients) as pool:
+        for _ in range(clients):
+            pool.submit(login_loop)
+    prober.join()
+    return logins, probes, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes in pool mode.")
+    parser.add_argument("--method", default="pbkdf2:sha256:600000")
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients logging in for {args.seconds:g}s, {args.method}, {os.cpu_count()} CPUs")
+    for name, workers in (("inline", 0), ("pool", args.workers)):
+        proc, url = _start_server(workers, args.method)
+        try:
+            logins, probes, errors = _run(url, args.clients, args.seconds)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{name:<7} {len(logins) / args.seconds:6.1f} logins/s "
+              f"(p50 {_pct(logins, .5) * 1000:6.0f}ms, p95 {_pct(logins, .95) * 1000:6.0f}ms, "
+              f"{len(errors)} errors) | profile during storm: "
+              f"p50 {_pct(probes, .5) * 1000:6.1f}ms, p95 {_pct(probes, .95) * 1000:6.1f}ms "
+              f"over {len(probes)} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+DB load of deposit-status delivery: polling vs Socket.IO push.
+
+Gives N users a pending M-Pesa deposit each, then delivers the outcome two
+ways and counts the SQL statements each one costs:
+
+  - polling: every client hits /api/wallet/tx-status/<id> once per
+    --interval seconds while it waits --wait seconds (the frontend polls
+    every second)
+  - push:    every client holds an authenticated Socket.IO connection and
+    receives deposit_status / balance_changed when the callback batch
+    commits
+
+Settling the callbacks costs the same in both models and is reported
+separately.
+
+Usage (from backend/):
+    python -m benchmarks.bench_realtime [--clients 200] [--wait 10] [--interval 1]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--wait", type=float, default=10, help="Seconds a user waits for M-Pesa.")
+    parser.add_argument("--interval", type=float, default=1, help="Polling interval (s).")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_realtime.db")
+    os.environ["CALLBACK_INBOX_WORKER"] = "0"
+    os.environ["SOCKETIO_ASYNC_MODE"] = "threading"
+
+    from sqlalchemy import event
+    from app import create_app
+    from extensions import db, socketio
+    from models.user import User
+    from models.wallet import Wallet
+    from models.transaction import Transaction
+    from services.callback_inbox import CallbackInboxService
+    from services.token_service import TokenService
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        users = [User(email=f"rt{i}@example.com", password_hash="x", first_name="Rt",
+                      last_name=str(i), phone=f"+2547{i:08d}") for i in range(args.clients)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all([Wallet(user_id=u.id, balance=0) for u in users])
+        deposits = [Transaction(user_id=u.id, type="deposit", amount=100, fee=0, status="pending",
+                                checkout_request_id=f"ws_CO_{u.id}", dispatch_status="sent")
+                    for u in users]
+        db.session.add_all(deposits)
+        db.session.commit()
+        plan = [(u.id, t.id, t.checkout_request_id) for u, t in zip(users, deposits)]
+        tokens = {u.id: TokenService.issue(u.id, u.role) for u in users}
+
+        queries = {"n": 0}
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count(*_):
+            queries["n"] += 1
+
+    def measure(fn):
+        queries["n"] = 0
+        start = time.perf_counter()
+        result = fn()
+        return result, queries["n"], time.perf_counter() - start
+
+    client = app.test_client()
+    polls_per_client = max(1, int(args.wait / args.interval))
+
+    def poll_all():
+        for _ in range(polls_per_client):
+            for user_id, tx_id, _ in plan:
+                client.get(f"/api/wallet/tx-status/{tx_id}",
+                           headers={"Authorization": f"Bearer {tokens[user_id]}"})
+
+    _, poll_queries, poll_time = measure(poll_all)
+
+    sockets, connect_queries, _ = measure(lambda: [
+        socketio.test_client(app, auth={"token": tokens[user_id]}) for user_id, _, _ in plan
+    ])
+
+    def settle():
+        with app.app_context():
+            for _, _, checkout_id in plan:
+                CallbackInboxService.append(json.dumps({"Body": {"stkCallback": {
+                    "ResultCode": 0, "ResultDesc": "ok", "CheckoutRequestID": checkout_id,
+                    "CallbackMetadata": {"Item": [
+                        {"Name": "Amount", "Value": 100},
+                        {"Name": "MpesaReceiptNumber", "Value": f"R{checkout_id}"},
+                    ]},
+                }}}))
+            while CallbackInboxService.drain():
+                pass
+
+    _, settle_queries, settle_time = measure(settle)
+
+    delivered = 0
+    for sock in sockets:
+        names = {m["name"] for m in sock.get_received()}
+        delivered += {"deposit_status", "balance_changed"} <= names
+        sock.disconnect()
+
+    total_polls = polls_per_client * len(plan)
+    print(f"{len(plan)} clients waiting {args.wait:g}s for their deposit")
+    print(f"polling: {total_polls} requests, {poll_queries} queries "
+          f"({poll_queries / total_polls:.1f}/poll, {poll_queries / args.wait:.0f}/s), {poll_time:.2f}s of server time")
+    print(f"push:    {len(sockets)} connections, {connect_queries} queries to connect, "
+          f"0 while idle; {delivered}/{len(plan)} clients got deposit_status + balance_changed")
+    print(f"settling the {len(plan)} callbacks (both models): {settle_queries} queries, {settle_time:.2f}s")
+
+    ok = delivered == len(plan) and connect_queries == 0
+    print("OK" if ok else "FAIL: push delivery incomplete or connect touched the DB")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+List serialization: marshmallow auto-schemas vs column projections.
+
+For transactions (with the owner's name/email), users and beneficiaries at
+each --sizes row count, builds the list response both ways and checks the
+bodies are byte-identical:
+
+  - marshmallow: ORM query -> schema.dump(many=True) -> jsonify
+  - projection:  column-projected query -> Projection.dump_rows -> json_response
+
+Timings cover query + serialization + JSON encoding (best of --repeat).
+A small table with non-ASCII names and NULLs is checked first, which also
+exercises the jsonify fallback.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serializers [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_serializers.db")
+    os.environ["CALLBACK_INBOX_WORKER"] = "0"
+
+    from sqlalchemy import insert
+    from app import create_app
+    from extensions import db
+    from models.user import User
+    from models.beneficiary import Beneficiary
+    from models.transaction import Transaction
+    from schemas.user_schema import users_schema, users_projection
+    from schemas.beneficiary_schema import beneficiaries_schema, beneficiaries_projection
+    from schemas.transaction_schema import transactions_schema, transactions_projection
+    from utils.json_response import json_response
+
+    app = create_app()
+    rng = random.Random(20)
+    start = datetime.datetime(2026, 1, 1)
+
+    def reset(n, names=("Amina", "Brian", "Wanjiku", "Otieno")):
+        db.drop_all()
+        db.create_all()
+        users = max(1, n // 20)
+        db.session.execute(insert(User), [
+            {"id": i + 1, "email": f"u{i}@example.com", "password_hash": "x",
+             "first_name": names[i % len(names)], "last_name": f"L{i}", "phone": f"+2547{i:08d}",
+             "role": "user", "created_at": start + datetime.timedelta(seconds=i)}
+            for i in range(users)])
+        db.session.execute(insert(Beneficiary), [
+            {"user_id": i % users + 1, "name": names[i % len(names)], "phone": f"+2541{i:08d}",
+             "email": None if i % 3 else f"b{i}@example.com", "created_at": start}
+            for i in range(n)])
+        db.session.execute(insert(Transaction), [
+            {"user_id": i % users + 1, "type": rng.choice(["send", "receive", "deposit"]),
+             "amount": rng.randint(1, 10_000_000), "fee": rng.randint(0, 100_000),
+             "status": "completed", "description": None if i % 4 == 0 else f"tx {i}",
+             "recipient_name": names[i % len(names)], "recipient_phone": "+254700000000",
+             "created_at": None if i == 7 else start + datetime.timedelta(seconds=i)}
+            for i in range(n)])
+        db.session.commit()
+
+    cases = {
+        "transactions": (
+            lambda: transactions_schema.dump(Transaction.query.order_by(Transaction.id).all()),
+            lambda: transactions_projection.dump_rows(
+                transactions_projection.apply(Transaction.query.order_by(Transaction.id)).all()),
+        ),
+        "users": (
+            lambda: users_schema.dump(User.query.all()),
+            lambda: users_projection.dump_rows(db.session.execute(users_projection.select())),
+        ),
+        "beneficiaries": (
+            lambda: beneficiaries_schema.dump(Beneficiary.query.all()),
+            lambda: beneficiaries_projection.dump_rows(
+                db.session.execute(beneficiaries_projection.select())),
+        ),
+    }
+
+    def body_slow(name, dump):
+        db.session.expunge_all()
+        return app.json.response({name: dump()}).get_data()
+
+    def body_fast(name, dump):
+        db.session.expunge_all()
+        return json_response({name: dump()}).get_data()
+
+    def best(fn, *a):
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = fn(*a)
+            times.append(time.perf_counter() - t0)
+        return min(times), out
+
+    ok = True
+    with app.test_request_context():
+        reset(40, names=("Zoë", "Ngʼang'a", "Brian", "Åsa"))
+        for name, (slow, fast) in cases.items():
+            same = body_slow(name, slow) == body_fast(name, fast)
+            ok &= same
+            print(f"non-ASCII / NULL check, {name}: {'identical' if same else 'DIFFERENT'}")
+
+        print(f"{'rows':>7} {'payload':<14} {'marshmallow':>12} {'projection':>11} {'speedup':>8} {'bytes':>10}")
+        for n in args.sizes:
+            reset(n)
+            for name, (slow, fast) in cases.items():
+                t_slow, b_slow = best(body_slow, name, slow)
+                t_fast, b_fast = best(body_fast, name, fast)
+                same = b_slow == b_fast
+                ok &= same
+                print(f"{n:>7} {name:<14} {t_slow * 1000:10.1f}ms {t_fast * 1000:9.1f}ms "
+                      f"{t_slow / t_fast:7.1f}x {len(b_fast):>10}{'' if same else '  DIFFERENT'}")
+
+    print("OK: byte-identical payloads" if ok else "FAIL: payloads differ")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+STK push client benchmark: token cache + pooled session vs the old path.
+
+Runs against the local stub Daraja server (started in-process), with an
+optional simulated network latency per request:
+
+  - baseline: a fresh OAuth round-trip and new connections for every push
+    (what MpesaService did before it cached tokens)
+  - cached:   MpesaService.lipa_na_mpesa (cached token, keep-alive pool)
+
+then fires a burst of pushes from many threads at a cold cache to check
+that the OAuth call is single-flight.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stk [--pushes 200] [--threads 32] [--latency 0.02]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from benchmarks.stub_daraja import StubDaraja
+
+
+def _timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name, samples):
+    samples = sorted(samples)
+    print(f"{name:<10} n={len(samples):<5} mean={statistics.mean(samples):7.2f}ms "
+          f"p50={samples[len(samples) // 2]:7.2f}ms p95={samples[int(len(samples) * .95)]:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pushes", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub latency per request (s).")
+    args = parser.parse_args()
+
+    stub = StubDaraja(latency=args.latency).start()
+    os.environ.update({
+        "MPESA_BASE_URL": stub.url,
+        "MPESA_CONSUMER_KEY": "bench-key",
+        "MPESA_CONSUMER_SECRET": "bench-secret",
+        "MPESA_SHORTCODE": "174379",
+        "MPESA_PASSKEY": "bench-passkey",
+        "MPESA_TOKEN_STORE": os.path.join(tempfile.mkdtemp(), "mpesa_token.json"),
+    })
+    from config import Config
+    for key in ("MPESA_BASE_URL", "MPESA_CONSUMER_KEY", "MPESA_CONSUMER_SECRET",
+                "MPESA_SHORTCODE", "MPESA_PASSKEY", "MPESA_TOKEN_STORE"):
+        setattr(Config, key, os.environ[key])
+    from services.mpesa_service import MpesaService
+
+    def baseline():
+        res = requests.get(f"{stub.url}/oauth/v1/generate?grant_type=client_credentials",
+                           auth=HTTPBasicAuth("bench-key", "bench-secret"))
+        token = res.json()["access_token"]
+        requests.post(f"{stub.url}/mpesa/stkpush/v1/processrequest",
+                      json={"Amount": 1}, headers={"Authorization": f"Bearer {token}"}).raise_for_status()
+
+    def cached():
+        MpesaService.lipa_na_mpesa("0712345678", 1, "bench", "bench")
+
+    _report("baseline", _timed(baseline, args.pushes))
+    before = dict(stub.stats)
+    _report("cached", _timed(cached, args.pushes))
+    cached_tokens = stub.stats["token"] - before["token"]
+    print(f"OAuth calls for {args.pushes} cached pushes: {cached_tokens}")
+
+    # cold-cache burst: every thread wants a token at once
+    MpesaService.reset()
+    os.remove(Config.MPESA_TOKEN_STORE)
+    before = dict(stub.stats)
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(lambda _: cached(), range(args.threads * 4)))
+    burst_tokens = stub.stats["token"] - before["token"]
+    print(f"OAuth calls for a cold burst of {args.threads * 4} pushes "
+          f"from {args.threads} threads: {burst_tokens}")
+    stub.stop()
+
+    ok = cached_tokens <= 1 and burst_tokens == 1
+    print("OK" if ok else "FAIL: token fetch was not cached / single-flight")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+End-to-end load test over the auth, user, wallet, transaction, beneficiary
+and admin blueprints.
+
+Seeds the database (`flask seed synthetic`'s generator plus the demo
+admin), starts the stub Daraja server in-process and the app under gunicorn
+with the production eventlet worker (see Dockerfile), then runs a weighted
+mix of API calls from --concurrency virtual users for --duration seconds
+after a --warmup. Each virtual user is a synthetic account with its own
+bearer token, beneficiaries and topped-up wallet; admin calls use the demo
+admin. STK pushes go to the stub, which posts the success callbacks back.
+
+Reports, per endpoint and in total: requests, errors, throughput, p50/p95/
+p99/max latency (client side) and SQL statements per request (from the
+server's Server-Timing header, see services/request_metrics.py; statements
+run while a streamed body is being sent are not included). The report and the run
+parameters are written to --output as JSON; --compare prints the change
+against an earlier report and exits 1 when a p95 or queries-per-request
+figure regressed by more than --threshold.
+
+Mixes: default (read-heavy, every endpoint), read (no writes), write
+(writes weighted x5).
+
+Usage (from backend/):
+    python -m benchmarks.loadtest [--users 2000] [--transactions 100000]
+        [--concurrency 16] [--duration 30] [--warmup 5] [--mix default|read|write]
+        [--etags] [--output loadtest.json] [--compare baseline.json] [--threshold 0.2]
+
+Uses DATABASE_URL when set (e.g. a local Postgres; seeded unless --no-seed),
+otherwise a throwaway SQLite file.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+OPERATIONS = {}  # name -> (weight in the default mix, writes, fn(vu))
+MIXES = ("default", "read", "write")
+_QUERIES = re.compile(r'desc="queries=(\d+)"')
+
+
+def operation(name, weight, writes=False):
+    def register(fn):
+        OPERATIONS[name] = (weight, writes, fn)
+        return fn
+    return register
+
+
+def _query_count(response):
+    """SQL statements the server ran for this response (its Server-Timing header)."""
+    match = _QUERIES.search(response.headers.get("Server-Timing", ""))
+    return int(match.group(1)) if match else None
+
+
+# ─── virtual users ───
+
+class VirtualUser:
+    def __init__(self, url, user, admin_headers, seed, etags):
+        self.url = url
+        self.user_id, self.phone = user
+        self.admin_headers = admin_headers
+        self.rng = random.Random(seed)
+        self.etags = {} if etags else None
+        self.http = requests.Session()
+        self.headers = {}
+        self.beneficiaries = []
+        self.created = []      # beneficiaries this user added (and may delete)
+        self.deposits = []
+        self.cursor = None
+        self.samples = defaultdict(list)  # name -> [(seconds, status, queries)]
+        self.recording = False
+
+    def call(self, name, method, path, admin=False, **kwargs):
+        headers = dict(self.admin_headers if admin else self.headers)
+        cached = None
+        if self.etags is not None and method == "GET":
+            cached = self.etags.get(path + json.dumps(kwargs.get("params"), sort_keys=True))
+            if cached:
+                headers["If-None-Match"] = cached[0]
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.url + path, headers=headers, timeout=30, **kwargs)
+            response.content  # read streamed bodies to the end
+        except requests.RequestException:
+            if self.recording:
+                self.samples[name].append((time.perf_counter() - start, 0, None))
+            return None
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            self.samples[name].append((elapsed, response.status_code, _query_count(response)))
+        if self.etags is not None and method == "GET":
+            key = path + json.dumps(kwargs.get("params"), sort_keys=True)
+            if response.status_code == 304 and cached:
+                return cached[1]
+            if response.headers.get("ETag"):
+                self.etags[key] = (response.headers["ETag"], response)
+        return response
+
+    def setup(self, token):
+        self.headers = {"Authorization": f"Bearer {token}"}
+        r = self.call("setup", "GET", "/api/beneficiaries/")
+        self.beneficiaries = [b["id"] for b in r.json()["beneficiaries"]]
+        if not self.beneficiaries:
+            r = self.call("setup", "POST", "/api/beneficiaries/",
+                          json={"name": "Load Test", "phone": "+254700000001"})
+            self.beneficiaries.append(r.json()["beneficiary"]["id"])
+        self.call("setup", "POST", "/api/wallet/add-funds/manual", json={"amount": 1_000_000})
+        r = self.call("setup", "GET", "/api/transactions/", params={"type": "deposit", "limit": 20})
+        self.deposits = [t["id"] for t in r.json()["transactions"]]
+
+    def run(self, mix, stop_at, record_at):
+        names = list(mix)
+        weights = [mix[n] for n in names]
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                return
+            self.recording = now >= record_at
+            name = self.rng.choices(names, weights)[0]
+            OPERATIONS[name][2](self)
+
+
+# ─── operations ───
+
+@operation("POST /api/auth/login", 1)
+def _login(vu):
+    vu.call("POST /api/auth/login", "POST", "/api/auth/login",
+            json={"email": f"user{vu.user_id}@example.com", "password": "password123"})
+
+
+@operation("GET /api/auth/profile", 8)
+def _profile(vu):
+    vu.call("GET /api/auth/profile", "GET", "/api/auth/profile")
+
+
+@operation("PUT /api/auth/profile", 1, writes=True)
+def _update_profile(vu):
+    vu.call("PUT /api/auth/profile", "PUT", "/api/auth/profile", json={"phone": vu.phone})
+
+
+@operation("GET /api/users/<id>", 1)
+def _user(vu):
+    vu.call("GET /api/users/<id>", "GET", f"/api/users/{vu.user_id}")
+
+
+@operation("GET /api/wallet/balance", 12)
+def _balance(vu):
+    vu.call("GET /api/wallet/balance", "GET", "/api/wallet/balance")
+
+
+@operation("POST /api/wallet/add-funds", 2, writes=True)
+def _stk_push(vu):
+    r = vu.call("POST /api/wallet/add-funds", "POST", "/api/wallet/add-funds",
+                json={"amount": vu.rng.randint(10, 500), "phone_number": vu.phone})
+    if r is not None and r.status_code == 202:
+        vu.deposits = (vu.deposits + [r.json()["transactionId"]])[-20:]
+
+
+@operation("GET /api/wallet/tx-status/<id>", 3)
+def _tx_status(vu):
+    if vu.deposits:
+        vu.call("GET /api/wallet/tx-status/<id>", "GET",
+                f"/api/wallet/tx-status/{vu.rng.choice(vu.deposits)}")
+
+
+@operation("GET /api/wallet/statement", 1)
+def _statement(vu):
+    since = (datetime.date.today() - datetime.timedelta(days=30)).isoformat()
+    vu.call("GET /api/wallet/statement", "GET", "/api/wallet/statement", params={"from": since})
+
+
+@operation("GET /api/transactions/", 12)
+def _history(vu):
+    r = vu.call("GET /api/transactions/", "GET", "/api/transactions/")
+    if r is not None and r.status_code == 200:
+        vu.cursor = r.json()["nextCursor"]
+
+
+@operation("GET /api/transactions/?cursor", 3)
+def _history_page(vu):
+    if not vu.cursor:
+        return _history(vu)
+    vu.call("GET /api/transactions/?cursor", "GET", "/api/transactions/",
+            params={"cursor": vu.cursor})
+
+
+@operation("POST /api/transactions/send", 5, writes=True)
+def _send(vu):
+    vu.call("POST /api/transactions/send", "POST", "/api/transactions/send",
+            json={"beneficiaryId": vu.rng.choice(vu.beneficiaries),
+                  "amount": vu.rng.randint(1, 50), "description": "load test"})
+
+
+@operation("POST /api/transactions/send/batch", 1, writes=True)
+def _send_batch(vu):
+    items = [{"beneficiaryId": vu.rng.choice(vu.beneficiaries), "amount": vu.rng.randint(1, 50)}
+             for _ in range(10)]
+    vu.call("POST /api/transactions/send/batch", "POST", "/api/transactions/send/batch",
+            json={"items": items, "mode": "best_effort"})
+
+
+@operation("GET /api/beneficiaries/", 8)
+def _beneficiaries(vu):
+    vu.call("GET /api/beneficiaries/", "GET", "/api/beneficiaries/")
+
+
+@operation("POST /api/beneficiaries/", 1, writes=True)
+def _add_beneficiary(vu):
+    r = vu.call("POST /api/beneficiaries/", "POST", "/api/beneficiaries/",
+                json={"name": "Load Test", "phone": f"+2547{vu.rng.randrange(10 ** 8):08d}"})
+    if r is not None and r.status_code == 201:
+        vu.created.append(r.json()["beneficiary"]["id"])
+
+
+@operation("DELETE /api/beneficiaries/<id>", 1, writes=True)
+def _remove_beneficiary(vu):
+    if not vu.created:
+        return _add_beneficiary(vu)
+    vu.call("DELETE /api/beneficiaries/<id>", "DELETE", f"/api/beneficiaries/{vu.created.pop()}")
+
+
+@operation("GET /api/admin/users", 1)
+def _admin_users(vu):
+    vu.call("GET /api/admin/users", "GET", "/api/admin/users", admin=True)
+
+
+@operation("GET /api/admin/users/<id>", 1)
+def _admin_user(vu):
+    vu.call("GET /api/admin/users/<id>", "GET", f"/api/admin/users/{vu.user_id}", admin=True)
+
+
+@operation("GET /api/admin/transactions", 2)
+def _admin_transactions(vu):
+    vu.call("GET /api/admin/transactions", "GET", "/api/admin/transactions", admin=True)
+
+
+@operation("GET /api/admin/analytics/summary", 1)
+def _admin_summary(vu):
+    vu.call("GET /api/admin/analytics/summary", "GET", "/api/admin/analytics/summary", admin=True)
+
+
+@operation("GET /api/admin/analytics/trends", 1)
+def _admin_trends(vu):
+    vu.call("GET /api/admin/analytics/trends", "GET", "/api/admin/analytics/trends",
+            admin=True, params={"granularity": "day"})
+
+
+@operation("GET /api/admin/analytics/wallets", 1)
+def _admin_wallets(vu):
+    vu.call("GET /api/admin/analytics/wallets", "GET", "/api/admin/analytics/wallets", admin=True)
+
+
+def mix_weights(mix):
+    if mix == "read":
+        return {n: w for n, (w, writes, _) in OPERATIONS.items() if not writes}
+    if mix == "write":
+        return {n: w * 5 if writes else w for n, (w, writes, _) in OPERATIONS.items()}
+    return {n: w for n, (w, _, _) in OPERATIONS.items()}
+
+
+# ─── reporting ───
+
+def _pct(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else None
+
+
+def summarize(samples, seconds):
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[2] for s in samples if s[2] is not None]
+    statuses = defaultdict(int)
+    for _, status, _ in samples:
+        statuses[str(status)] += 1
+    errors = sum(n for status, n in statuses.items() if not 200 <= int(status) < 400)
+
+    def ms(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / seconds, 2),
+        "p50_ms": ms(_pct(latencies, 0.50)),
+        "p95_ms": ms(_pct(latencies, 0.95)),
+        "p99_ms": ms(_pct(latencies, 0.99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        "statuses": dict(statuses),
+    }
+
+
+def print_report(report):
+    print(f"{'endpoint':<36} {'reqs':>6} {'err':>4} {'rps':>7} {'p50':>8} {'p95':>8} "
+          f"{'p99':>8} {'q/req':>6}")
+    rows = sorted(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        def fmt(v, spec):
+            return format(v, spec) if v is not None else "-"
+        print(f"{name:<36} {s['requests']:>6} {s['errors']:>4} {s['rps']:>7.1f} "
+              f"{fmt(s['p50_ms'], '8.1f')} {fmt(s['p95_ms'], '8.1f')} {fmt(s['p99_ms'], '8.1f')} "
+              f"{fmt(s['queries_per_request'], '6.1f')}")
+
+
+def compare(report, baseline, threshold):
+    """Print p95 and queries/request changes; returns the regressed endpoints."""
+    regressions = []
+    print(f"\n{'vs baseline':<36} {'p95 before':>10} {'after':>8} {'change':>7} "
+          f"{'q/req before':>12} {'after':>6}")
+    for name, now in sorted(report["endpoints"].items()):
+        before = baseline["endpoints"].get(name)
+        if not before:
+            continue
+        flags = []
+        for key in ("p95_ms", "queries_per_request"):
+            old, new = before.get(key), now.get(key)
+            if old and new is not None and new > old * (1 + threshold):
+                flags.append(key)
+        change = (now["p95_ms"] / before["p95_ms"] - 1) * 100 if before.get("p95_ms") and now.get("p95_ms") else 0
+        print(f"{name:<36} {before.get('p95_ms') or 0:10.1f} {now.get('p95_ms') or 0:8.1f} "
+              f"{change:+6.0f}% {before.get('queries_per_request') or 0:12.1f} "
+              f"{now.get('queries_per_request') or 0:6.1f}{'  REGRESSED ' + ','.join(flags) if flags else ''}")
+        if flags:
+            regressions.append(name)
+    return regressions
+
+
+# ─── setup ───
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(env, port, log_path):
+    log = open(log_path, "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "wsgi:app",
+         "--bind", f"127.0.0.1:{port}", "--worker-class", "eventlet", "--workers", "1",
+         "--log-level", "warning"],
+        env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline and proc.poll() is None:
+        try:
+            requests.get(url + "/api/auth/profile", timeout=2)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.3)
+    proc.kill()
+    raise RuntimeError(f"server did not start; see {log_path}")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000, help="Synthetic users to seed.")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Synthetic transactions to seed.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-seed", action="store_true", help="Use DATABASE_URL as it is.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds first.")
+    parser.add_argument("--mix", choices=MIXES, default="default")
+    parser.add_argument("--etags", action="store_true", help="Send If-None-Match like a caching client.")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Daraja stub latency (s).")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the per-route rate limits on.")
+    parser.add_argument("--output", default="loadtest.json")
+    parser.add_argument("--compare", help="Earlier --output file to diff against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression.")
+    args = parser.parse_args()
+
+    from benchmarks.stub_daraja import StubDaraja
+
+    workdir = tempfile.mkdtemp()
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "loadtest.db")
+    stub = StubDaraja(latency=args.stub_latency, callback=True).start()
+    port = _free_port()
+    env = {
+        "SOCKETIO_ASYNC_MODE": "eventlet",
+        "RATE_LIMIT_ENABLED": "1" if args.rate_limits else "0",
+        "SERVER_TIMING_ENABLED": "1",
+        "MPESA_BASE_URL": stub.url,
+        "MPESA_CONSUMER_KEY": "loadtest-key",
+        "MPESA_CONSUMER_SECRET": "loadtest-secret",
+        "MPESA_SHORTCODE": "174379",
+        "MPESA_PASSKEY": "loadtest-passkey",
+        "MPESA_TOKEN_STORE": os.path.join(workdir, "mpesa_token.json"),
+    }
+    os.environ.update(env)
+    # the seeding app below runs no background workers; the server does
+    os.environ.update(CALLBACK_INBOX_WORKER="0", PASSWORD_HASH_WORKERS="0")
+
+    from app import create_app
+    from extensions import db
+    from database.db_init import init_db
+    from database import synthetic
+    from models.user import User
+    from services.token_service import TokenService
+
+    app = create_app()
+    init_db(app)
+    with app.app_context():
+        if not args.no_seed:
+            counts = synthetic.generate(args.users, args.transactions, seed=args.seed)
+            print(f"Seeded {json.dumps(counts)}")
+        admin = User.query.filter_by(role="admin").first()
+        users = (db.session.query(User.id, User.phone)
+                 .filter(User.role == "user").order_by(User.id).all())
+        rng = random.Random(args.seed)
+        picked = rng.sample(users, min(args.concurrency, len(users)))
+        admin_token = TokenService.issue(admin.id, admin.role)
+        tokens = [TokenService.issue(uid, "user") for uid, _ in picked]
+        dialect = db.engine.dialect.name
+
+    log_path = os.path.join(workdir, "server.log")
+    # the stub posts each callback to the CallBackURL sent with the push
+    server_env = dict(os.environ, CALLBACK_INBOX_WORKER="1",
+                      PASSWORD_HASH_WORKERS=os.environ.get("LOADTEST_HASH_WORKERS", "2"),
+                      MPESA_CALLBACK_URL=f"http://127.0.0.1:{port}/api/wallet/mpesa/callback")
+    proc, url = _start_server(server_env, port, log_path)
+    try:
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        vus = [VirtualUser(url, user, admin_headers, args.seed + k, args.etags)
+               for k, user in enumerate(picked)]
+        for vu, token in zip(vus, tokens):
+            vu.setup(token)
+
+        mix = mix_weights(args.mix)
+        record_at = time.monotonic() + args.warmup
+        stop_at = record_at + args.duration
+        threads = [threading.Thread(target=vu.run, args=(mix, stop_at, record_at)) for vu in vus]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        proc.send_signal(signal.SIGINT)  # quick shutdown; SIGTERM waits out open requests
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        stub.stop()
+
+    merged = defaultdict(list)
+    for vu in vus:
+        for name, samples in vu.samples.items():
+            if name != "setup":
+                merged[name].extend(samples)
+    report = {
+        "meta": {
+            "started_at": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            "stub": stub.stats,
+        },
+        "endpoints": {name: summarize(s, args.duration) for name, s in sorted(merged.items())},
+        "total": summarize([x for s in merged.values() for x in s], args.duration),
+    }
+    print_report(report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"FAIL: {len(regressions)} endpoint(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
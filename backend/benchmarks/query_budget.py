@@ -0,0 +1,268 @@
+"""
+Query and allocation budgets for the API's hot paths.
+
+Seeds the database at each size N (N synthetic users, 10*N transactions,
+and N/2 extra beneficiaries on the busiest user, who is the caller for the
+user routes and pays the demo user in the transfer routes), then calls
+every route in BUDGETS once to warm up and once measured. The measured call
+counts SQL statements and the peak memory Python allocated during the
+request (tracemalloc). Response bodies are consumed chunk by chunk from
+the response iterator and dropped, never buffered, so a streamed body
+(statement, export) runs its queries inside the measurement and is held
+to a constant-memory budget like any other route. Entity caching is
+per-request only (ENTITY_CACHE_TTL=0), so counts are those of a cold
+worker. Balance snapshots are switched off: the checkpoint a posting
+writes once every LEDGER_SNAPSHOT_INTERVAL entries per wallet would land
+on whichever measured call crossed it.
+
+A route fails when:
+  - it answers with an error status
+  - its statement count is over its budget at any size, or grows with N
+  - its allocation budget (KiB) is set and exceeded, or the allocation at
+    the largest size is more than `alloc_growth` times the smallest
+    (routes that return a whole list, e.g. beneficiaries, have no
+    allocation budget; their rows grow with N by design)
+
+The smallest size should give the busiest user a history of a few
+thousand rows (N=1000 does), or the streamed routes have not yet reached
+their steady state of two fetches in flight and look like they grow.
+
+tests/test_query_budget.py runs it under the test suite. From the command
+line it prints the table and exits 1 when any route fails, so it can run in
+CI next to the build.
+
+Usage (from backend/):
+    python -m benchmarks.query_budget [--sizes 1000 2000 5000] [--route transactions]
+        [--alloc-growth 1.5]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import tracemalloc
+from unittest import mock
+
+# (route, method, path, caller, max statements, max KiB allocated or None, JSON body)
+# Paths and bodies are formatted with the seeded ids: {user}, {beneficiary},
+# {phone}, {deposit}, {cursor}.
+BUDGETS = (
+    ("POST /api/auth/login", "POST", "/api/auth/login", None, 1, 128,
+     {"email": "user{user}@example.com", "password": "password123"}),
+    ("GET /api/auth/profile", "GET", "/api/auth/profile", "user", 2, 64, None),
+    ("PUT /api/auth/profile", "PUT", "/api/auth/profile", "user", 3, 128, {"firstName": "Budget"}),
+    ("GET /api/users/<id>", "GET", "/api/users/{user}", "user", 1, 64, None),
+    ("GET /api/wallet/balance", "GET", "/api/wallet/balance", "user", 2, 64, None),
+    ("POST /api/wallet/add-funds", "POST", "/api/wallet/add-funds", "user", 7, 128,
+     {"amount": 100, "phone_number": "{phone}"}),
+    ("GET /api/wallet/tx-status/<id>", "GET", "/api/wallet/tx-status/{deposit}", "user", 2, 64, None),
+    # streamed: two 1000-row fetches and a CSV chunk, however long the history
+    ("GET /api/wallet/statement", "GET", "/api/wallet/statement", "user", 1, 2048, None),
+    ("GET /api/transactions/", "GET", "/api/transactions/", "user", 2, 384, None),
+    ("GET /api/transactions/?cursor", "GET", "/api/transactions/?cursor={cursor}", "user", 2, 384, None),
+    ("GET /api/transactions/?filters", "GET", "/api/transactions/?status=completed&minAmount=1",
+     "user", 2, 384, None),
+    ("POST /api/transactions/send", "POST", "/api/transactions/send", "user", 16, 128,
+     {"beneficiaryId": "{beneficiary}", "amount": 10}),
+    ("POST /api/transactions/send/batch", "POST", "/api/transactions/send/batch", "user", 11, 256,
+     {"items": [{"beneficiaryId": "{beneficiary}", "amount": 1}] * 10, "mode": "best_effort"}),
+    ("GET /api/beneficiaries/", "GET", "/api/beneficiaries/", "user", 2, None, None),
+    ("POST /api/beneficiaries/", "POST", "/api/beneficiaries/", "user", 3, 128,
+     {"name": "Budget", "phone": "+254700000009"}),
+    ("GET /api/admin/users", "GET", "/api/admin/users", "admin", 1, None, None),
+    # embeds the user's whole history (the admin UI counts it), so memory is O(N)
+    ("GET /api/admin/users/<id>", "GET", "/api/admin/users/{user}", "admin", 5, None, None),
+    ("GET /api/admin/transactions", "GET", "/api/admin/transactions", "admin", 1, 384, None),
+    ("GET /api/admin/transactions/export", "GET", "/api/admin/transactions/export?format=csv",
+     "admin", 1, 3072, None),
+    ("GET /api/admin/analytics/summary", "GET", "/api/admin/analytics/summary", "admin", 1, 64, None),
+    ("GET /api/admin/analytics/trends", "GET", "/api/admin/analytics/trends?granularity=day",
+     "admin", 1, 128, None),
+    ("GET /api/admin/analytics/wallets", "GET", "/api/admin/analytics/wallets", "admin", 1, 64, None),
+)
+
+
+# Config overrides for the measured app; see the docstring
+SETTINGS = {
+    "CALLBACK_INBOX_WORKER": False,
+    "RATE_LIMIT_ENABLED": False,
+    "ENTITY_CACHE_TTL": 0,
+    "AUTH_REVOCATION_REFRESH": 1e9,         # synced once, during the warm-up
+    "PASSWORD_HASH_WORKERS": 0,
+    "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+    "STK_DISPATCH_WORKERS": 0,              # push inside the request, to the stub
+    "SLOW_QUERY_MS": 0,
+    "LEDGER_SNAPSHOT_INTERVAL": 1_000_000_000,
+    "MPESA_CONSUMER_KEY": "budget-key",
+    "MPESA_CONSUMER_SECRET": "budget-secret",
+    "MPESA_SHORTCODE": "174379",
+    "MPESA_PASSKEY": "budget-passkey",
+}
+
+
+def _fill(value, ids):
+    if isinstance(value, str):
+        filled = value.format(**ids)
+        return int(filled) if value.startswith("{") and filled.isdigit() else filled
+    if isinstance(value, dict):
+        return {k: _fill(v, ids) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, ids) for v in value]
+    return value
+
+
+def measure(sizes, routes=BUDGETS):
+    """
+    Seed at each size and measure every route once.
+    Returns {route: [(statements, KiB, status) per size]}.
+    """
+    from sqlalchemy import event, func, insert, select
+    from benchmarks.stub_daraja import StubDaraja
+    from config import Config
+    from extensions import db
+    from database import synthetic
+    from database.db_init import seed_data
+    from models.beneficiary import Beneficiary
+    from models.transaction import Transaction
+    from models.user import User
+    from models.wallet import Wallet
+    from services.entity_cache import EntityCache
+    from services.token_service import TokenService
+    from services.transfer_service import TransferService
+
+    workdir = tempfile.mkdtemp()
+    stub = StubDaraja().start()
+    settings = {**SETTINGS, "MPESA_BASE_URL": stub.url,
+                "MPESA_TOKEN_STORE": os.path.join(workdir, "mpesa_token.json")}
+    with contextlib.ExitStack() as stack:
+        stack.callback(stub.stop)
+        for name, value in settings.items():
+            stack.enter_context(mock.patch.object(Config, name, value))
+        from app import create_app
+        app = create_app()
+
+        counts = {"statements": 0}
+
+        def count(*_):
+            counts["statements"] += 1
+
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", count)
+            stack.callback(event.remove, db.engine, "before_cursor_execute", count)
+
+        client = app.test_client()
+        results = {}
+        for n in sizes:
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                seed_data()
+                synthetic.generate(n, 10 * n, seed=n, batch_size=50_000)
+                user_id = db.session.scalar(
+                    select(Transaction.user_id).group_by(Transaction.user_id)
+                    .order_by(func.count().desc(), Transaction.user_id).limit(1))
+                user = db.session.get(User, user_id)
+                db.session.execute(insert(Beneficiary), [
+                    {"user_id": user_id, "name": f"Extra {i}", "phone": f"+2542{i:08d}"}
+                    for i in range(n // 2)])
+                wallet_id = db.session.scalar(select(Wallet.id).where(Wallet.user_id == user_id))
+                TransferService.credit(wallet_id, 1_000_000)
+                # transfers go to a registered user, so both sides are written
+                payee = Beneficiary(user_id=user_id, name="Budget Payee",
+                                    phone=User.query.filter_by(email="john@example.com").one().phone)
+                db.session.add(payee)
+                db.session.commit()
+                admin = User.query.filter_by(role="admin").first()
+                ids = {
+                    "user": user_id,
+                    "phone": user.phone,
+                    "beneficiary": payee.id,
+                    "deposit": db.session.scalar(
+                        select(Transaction.id).where(Transaction.user_id == user_id,
+                                                     Transaction.type == "deposit").limit(1)),
+                }
+                headers = {
+                    None: {},
+                    "user": {"Authorization": f"Bearer {TokenService.issue(user_id, 'user')}"},
+                    "admin": {"Authorization": f"Bearer {TokenService.issue(admin.id, 'admin')}"},
+                }
+            ids["cursor"] = client.get("/api/transactions/", headers=headers["user"]).json["nextCursor"]
+
+            for name, method, path, caller, _, _, body in routes:
+                def call():
+                    r = client.open(_fill(path, ids), method=method, headers=headers[caller],
+                                    json=_fill(body, ids))
+                    try:
+                        for _ in r.response:  # a streamed body runs its queries here
+                            pass
+                    finally:
+                        r.close()
+                    return r.status_code
+
+                call()  # warm-up: compiled statement cache, OAuth token, revocation sync
+                EntityCache.clear()
+                counts["statements"] = 0
+                tracemalloc.start()
+                status = call()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results.setdefault(name, []).append((counts["statements"], peak / 1024, status))
+            with app.app_context():
+                db.session.remove()
+    return results
+
+
+def check(results, routes=BUDGETS, alloc_growth=1.5):
+    """{route: [problem, ...]} for every route in `results` (empty list = within budget)."""
+    problems = {}
+    for name, _, _, _, max_queries, max_kib, _ in routes:
+        rows = results[name]
+        queries = [q for q, _, _ in rows]
+        kib = [k for _, k, _ in rows]
+        found = problems[name] = []
+        if any(status >= 400 for _, _, status in rows):
+            found.append("status " + "/".join(str(s) for _, _, s in rows))
+        if max(queries) > max_queries:
+            found.append("over query budget")
+        if max(queries) > queries[0]:
+            found.append("queries grow with N")
+        if max_kib is not None:
+            if max(kib) > max_kib:
+                found.append("over allocation budget")
+            if kib[-1] > kib[0] * alloc_growth:
+                found.append("allocation grows with N")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000])
+    parser.add_argument("--route", help="Only routes whose name contains this.")
+    parser.add_argument("--alloc-growth", type=float, default=1.5,
+                        help="Allowed allocation ratio, largest size / smallest.")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "query_budget.db")
+    routes = [b for b in BUDGETS if not args.route or args.route in b[0]]
+    results = measure(args.sizes, routes)
+    problems = check(results, routes, args.alloc_growth)
+
+    sizes = " ".join(f"{'N=' + str(n):>8}" for n in args.sizes)
+    print(f"{'route':<36} {'statements at':>13} {sizes} {'budget':>7}   "
+          f"{'KiB at':>6} {sizes} {'budget':>7}")
+    for name, _, _, _, max_queries, max_kib, _ in routes:
+        rows = results[name]
+        print(f"{name:<36} {'':>13} " + " ".join(f"{q:>8}" for q, _, _ in rows)
+              + f" {max_queries:>7}   {'':>6} " + " ".join(f"{k:>8.0f}" for _, k, _ in rows)
+              + f" {max_kib if max_kib is not None else '-':>7}"
+              + (f"  FAIL: {', '.join(problems[name])}" if problems[name] else ""))
+
+    failed = [name for name, found in problems.items() if found]
+    if failed:
+        print(f"FAIL: {len(failed)} route(s) over budget or growing with N")
+        sys.exit(1)
+    print(f"OK: {len(routes)} routes within budget, statement counts flat across N")
+
+
+if __name__ == "__main__":
+    main()
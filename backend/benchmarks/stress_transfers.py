@@ -0,0 +1,126 @@
+"""
+Concurrency stress check for TransferService / send_money.
+
+Creates a ring of users who all list each other as beneficiaries, fires
+hundreds of random transfers from parallel threads, then verifies that no
+wallet went negative and that money was conserved:
+
+    sum(balances after) + sum(fees charged) == sum(balances before)
+
+and that the ledger and its balance snapshots reconcile with every wallet.
+
+Usage (from backend/):
+    python -m benchmarks.stress_transfers [--users 20] [--transfers 500] [--threads 32]
+
+Uses DATABASE_URL when set (point it at Postgres to exercise row locks),
+otherwise a throwaway SQLite file. The target database is dropped and rebuilt.
+Exits non-zero if an invariant is violated.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transfers", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--balance", type=float, default=1000)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "stress_transfers.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from extensions import db
+    from models.user import User
+    from models.wallet import Wallet
+    from models.beneficiary import Beneficiary
+    from models.transaction import Transaction
+    from controllers import transaction_controller
+    from services.ledger_service import LedgerService
+    from services.transfer_service import TransferService
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [
+            User(email=f"stress{i}@example.com", password_hash="x", first_name="Stress",
+                 last_name=str(i), phone=f"+2547{i:08d}")
+            for i in range(args.users)
+        ]
+        db.session.add_all(users)
+        db.session.flush()
+        wallets = [Wallet(user_id=u.id, balance=0) for u in users]
+        db.session.add_all(wallets)
+        db.session.flush()
+        TransferService.apply([(w.id, args.balance) for w in wallets])
+        beneficiaries = {}
+        for u in users:
+            for v in users:
+                if u.id != v.id:
+                    b = Beneficiary(user_id=u.id, name=v.last_name, phone=v.phone)
+                    db.session.add(b)
+                    beneficiaries.setdefault(u.id, []).append(b)
+        db.session.commit()
+        plan = []
+        rng = random.Random(1)
+        for _ in range(args.transfers):
+            sender = rng.choice(users)
+            plan.append((sender.id, rng.choice(beneficiaries[sender.id]).id,
+                         float(rng.randint(1, int(args.balance // 4)))))
+        before = db.session.query(db.func.sum(Wallet.balance)).scalar()
+
+    def worker(item):
+        sender_id, beneficiary_id, amount = item
+        with app.app_context():
+            try:
+                transaction_controller.send_money(sender_id, beneficiary_id, amount, "stress")
+                return "ok"
+            except ValueError:
+                return "rejected"
+            finally:
+                db.session.remove()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        outcomes = list(pool.map(worker, plan))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        after = db.session.query(db.func.sum(Wallet.balance)).scalar()
+        fees = db.session.query(db.func.sum(Transaction.fee)).filter_by(type="send").scalar() or 0
+        sends = Transaction.query.filter_by(type="send").count()
+        negative = Wallet.query.filter(Wallet.balance < 0).count()
+        ledger = LedgerService.reconcile()
+
+    ok = outcomes.count("ok")
+    print(f"{len(plan)} transfers in {elapsed:.2f}s with {args.threads} threads: "
+          f"{ok} committed, {outcomes.count('rejected')} rejected")
+    print(f"balances before={before:.2f} after={after:.2f} fees={fees:.2f}")
+    print(f"ledger: {ledger['entries']} entries, {ledger['snapshots']} snapshots checked")
+
+    failures = []
+    if after + fees != before:
+        failures.append("money not conserved")
+    if negative:
+        failures.append(f"{negative} wallet(s) overdrawn")
+    if sends != ok:
+        failures.append(f"{sends} send rows for {ok} committed transfers")
+    if not ledger["ok"]:
+        failures.append("ledger does not reconcile")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK: money conserved, no overdrafts, ledger reconciles")
+
+
+if __name__ == "__main__":
+    main()
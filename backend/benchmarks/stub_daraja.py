@@ -0,0 +1,192 @@
+"""
+Local stub of the Safaricom Daraja API for tests, benchmarks and load runs.
+
+Implements the two endpoints MpesaService uses:
+
+    GET  /oauth/v1/generate?grant_type=client_credentials   (Basic auth)
+    POST /mpesa/stkpush/v1/processrequest                   (Bearer token)
+
+Tokens expire after --token-ttl seconds and an STK push with an unknown or
+expired token gets a 401, like the real API. With --callback the stub also
+POSTs a success callback to the request's CallBackURL after
+--callback-delay seconds.
+
+Point the app at it with MPESA_BASE_URL=http://127.0.0.1:<port>.
+
+    cd backend
+    python -m benchmarks.stub_daraja --port 8089 --latency 0.05 --callback
+"""
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubDaraja:
+    def __init__(self, host="127.0.0.1", port=0, token_ttl=3599, latency=0.0,
+                 callback=False, callback_delay=0.5, fail_rate=0.0):
+        self.token_ttl = token_ttl
+        self.latency = latency
+        self.callback = callback
+        self.callback_delay = callback_delay
+        self.fail_rate = fail_rate  # share of STK pushes answered with a 503
+        self.stats = {"token": 0, "stk": 0, "unauthorized": 0, "failed": 0, "callbacks": 0}
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ─── request handling ───
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _issue_token(self):
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._tokens[token] = time.time() + self.token_ttl
+        return token
+
+    def _valid(self, header):
+        token = (header or "").removeprefix("Bearer ").strip()
+        with self._lock:
+            return self._tokens.get(token, 0) > time.time()
+
+    def _send_callback(self, url, merchant_id, checkout_id, amount, phone):
+        time.sleep(self.callback_delay)
+        body = {"Body": {"stkCallback": {
+            "MerchantRequestID": merchant_id,
+            "CheckoutRequestID": checkout_id,
+            "ResultCode": 0,
+            "ResultDesc": "The service request is processed successfully.",
+            "CallbackMetadata": {"Item": [
+                {"Name": "Amount", "Value": amount},
+                {"Name": "MpesaReceiptNumber", "Value": "S" + secrets.token_hex(5).upper()},
+                {"Name": "PhoneNumber", "Value": phone},
+            ]},
+        }}}
+        req = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(req, timeout=10).read()
+            self._count("callbacks")
+        except OSError:
+            pass
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if not self.path.startswith("/oauth/v1/generate"):
+                    return self._reply(404, {"errorMessage": "Not found"})
+                if not (self.headers.get("Authorization") or "").startswith("Basic "):
+                    return self._reply(400, {"errorMessage": "Invalid credentials"})
+                stub._count("token")
+                self._reply(200, {"access_token": stub._issue_token(),
+                                  "expires_in": str(stub.token_ttl)})
+
+            def do_POST(self):
+                payload = self._body()
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if self.path != "/mpesa/stkpush/v1/processrequest":
+                    return self._reply(404, {"errorMessage": "Not found"})
+                if not stub._valid(self.headers.get("Authorization")):
+                    stub._count("unauthorized")
+                    return self._reply(401, {"errorCode": "404.001.03",
+                                             "errorMessage": "Invalid Access Token"})
+                if stub.fail_rate and random.random() < stub.fail_rate:
+                    stub._count("failed")
+                    return self._reply(503, {"errorMessage": "Service unavailable"})
+                stub._count("stk")
+                merchant_id = f"{random.randint(10000, 99999)}-{secrets.token_hex(4)}"
+                checkout_id = f"ws_CO_{time.strftime('%d%m%Y%H%M%S')}{secrets.token_hex(6)}"
+                if stub.callback and payload.get("CallBackURL"):
+                    threading.Thread(
+                        target=stub._send_callback,
+                        args=(payload["CallBackURL"], merchant_id, checkout_id,
+                              payload.get("Amount"), payload.get("PhoneNumber")),
+                        daemon=True,
+                    ).start()
+                self._reply(200, {
+                    "MerchantRequestID": merchant_id,
+                    "CheckoutRequestID": checkout_id,
+                    "ResponseCode": "0",
+                    "ResponseDescription": "Success. Request accepted for processing",
+                    "CustomerMessage": "Success. Request accepted for processing",
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-ttl", type=int, default=3599)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of STK pushes that get a 503.")
+    parser.add_argument("--callback", action="store_true", help="POST a success callback after each STK push.")
+    parser.add_argument("--callback-delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    stub = StubDaraja(args.host, args.port, args.token_ttl, args.latency,
+                      args.callback, args.callback_delay, args.fail_rate)
+    print(f"Stub Daraja listening on {stub.url}  (MPESA_BASE_URL={stub.url})")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(stub.stats))
+
+
+if __name__ == "__main__":
+    main()
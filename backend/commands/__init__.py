@@ -0,0 +1,10 @@
+from .ledger_commands import ledger_cli
+from .analytics_commands import analytics_cli
+from .mpesa_commands import mpesa_cli
+from .seed_commands import seed_cli
+
+def register_commands(app):
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(mpesa_cli)
+    app.cli.add_command(seed_cli)
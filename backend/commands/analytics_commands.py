@@ -0,0 +1,16 @@
+# backend/commands/analytics_commands.py
+import click
+from flask.cli import AppGroup
+from services.analytics_service import AnalyticsService
+
+analytics_cli = AppGroup("analytics", help="Analytics rollup jobs.")
+
+
+@analytics_cli.command("rebuild")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), help="First day to rebuild.")
+@click.option("--until", type=click.DateTime(formats=["%Y-%m-%d"]), help="Last day to rebuild (inclusive).")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows fetched per round-trip.")
+def rebuild(since, until, chunk_size):
+    """Recompute hourly/daily rollups from the transaction table (catch-up/repair)."""
+    count = AnalyticsService.rebuild(since=since, until=until, chunk_size=chunk_size)
+    click.echo(f"Rebuilt {count} rollup row(s).")
@@ -0,0 +1,24 @@
+# backend/commands/ledger_commands.py
+import json
+import click
+from flask.cli import AppGroup
+from services.ledger_service import LedgerService
+
+ledger_cli = AppGroup("ledger", help="Ledger maintenance jobs.")
+
+
+@ledger_cli.command("checkpoint")
+def checkpoint():
+    """Snapshot every wallet that has entries since its last checkpoint."""
+    count = LedgerService.checkpoint_all()
+    click.echo(f"Checkpointed {count} wallet(s).")
+
+
+@ledger_cli.command("reconcile")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows fetched per round-trip.")
+def reconcile(chunk_size):
+    """Stream the ledger and verify snapshots and wallet balances against it."""
+    report = LedgerService.reconcile(chunk_size=chunk_size)
+    click.echo(json.dumps(report, indent=2))
+    if not report["ok"]:
+        raise SystemExit(1)
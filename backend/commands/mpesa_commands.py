@@ -0,0 +1,57 @@
+# backend/commands/mpesa_commands.py
+import datetime
+import json
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from extensions import db
+from models.transaction import Transaction
+from services.callback_inbox import CallbackInboxService
+
+mpesa_cli = AppGroup("mpesa", help="M-Pesa maintenance jobs.")
+
+
+@mpesa_cli.command("fail-stale")
+@click.option("--older-than", default=10, show_default=True, help="Minutes a push may stay queued.")
+def fail_stale(older_than):
+    """Fail deposits whose STK push was queued but never sent (e.g. worker restart)."""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(minutes=older_than)
+    stale = (Transaction.query
+             .filter(Transaction.dispatch_status == "queued",
+                     Transaction.status == "pending",
+                     Transaction.created_at < cutoff)
+             .all())
+    for tx in stale:
+        tx.status = "failed"
+        tx.dispatch_status = "failed"
+        tx.dispatch_error = "Dispatch lost (not sent before restart)"
+        tx.description = "STK Push could not be sent"
+    db.session.commit()
+    click.echo(f"Failed {len(stale)} stale deposit(s).")
+
+
+@mpesa_cli.command("drain")
+@click.option("--batch-size", default=None, type=int, help="Callbacks per DB transaction.")
+@click.option("--loop", is_flag=True, help="Keep draining (run as a worker process).")
+def drain(batch_size, loop):
+    """Settle queued M-Pesa callbacks from the inbox."""
+    interval = current_app.config["CALLBACK_DRAIN_INTERVAL"]
+    total = 0
+    while True:
+        taken = CallbackInboxService.drain(batch_size)
+        total += taken
+        if not taken:
+            if not loop:
+                break
+            time.sleep(interval)
+    click.echo(f"Drained {total} callback(s). {json.dumps(CallbackInboxService.stats())}")
+
+
+@mpesa_cli.command("replay")
+@click.argument("entry_ids", nargs=-1, type=int)
+@click.option("--failed", is_flag=True, help="Replay every failed callback.")
+def replay(entry_ids, failed):
+    """Queue inbox entries (by id, or --failed) for another pass."""
+    count = CallbackInboxService.replay(list(entry_ids) or None, failed=failed)
+    click.echo(f"Queued {count} callback(s) for replay; run `flask mpesa drain`.")
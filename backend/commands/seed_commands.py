@@ -0,0 +1,37 @@
+# backend/commands/seed_commands.py
+import json
+import click
+from flask.cli import AppGroup
+from database.db_init import seed_data
+from database import synthetic
+
+seed_cli = AppGroup("seed", help="Demo and synthetic data.")
+
+
+@seed_cli.command("demo")
+def demo():
+    """Create the two demo users (skipped if any user exists)."""
+    seed_data()
+
+
+@seed_cli.command("synthetic")
+@click.option("--users", default=1000, show_default=True, help="Users to add (each with a wallet).")
+@click.option("--transactions", default=100_000, show_default=True, help="Deposits and sends to generate.")
+@click.option("--seed", default=42, show_default=True, help="Random seed; same seed, same data.")
+@click.option("--days", default=90, show_default=True, help="Length of the history.")
+@click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), help="Day the history ends (default: 2025-01-01, fixed so a seed always gives the same data).")
+@click.option("--beneficiaries", default=3.0, show_default=True, help="Mean beneficiaries per user.")
+@click.option("--registered", default=0.6, show_default=True, help="Share of beneficiaries who are users.")
+@click.option("--deposit-share", default=0.35, show_default=True, help="Share of transactions that are deposits.")
+@click.option("--skew", default=1.1, show_default=True, help="Zipf exponent of account activity (0 = uniform).")
+@click.option("--batch-size", default=10_000, show_default=True, help="Rows per INSERT / COPY.")
+@click.option("--password", default="password123", show_default=True, help="Password of every synthetic user.")
+def synthetic_data(users, transactions, seed, days, end, beneficiaries, registered,
+                   deposit_share, skew, batch_size, password):
+    """Bulk-load users, wallets, beneficiaries and a ledger-consistent history."""
+    counts = synthetic.generate(
+        users, transactions, seed=seed, days=days, end=end, beneficiaries=beneficiaries,
+        registered=registered, deposit_share=deposit_share, skew=skew,
+        batch_size=batch_size, password=password, echo=click.echo,
+    )
+    click.echo(json.dumps(counts))
@@ -1,10 +1,78 @@
 import os
+import tempfile
 
 class Config:
     # ─── App & DB ─────────────────────────────────────────────────────────────────
     SECRET_KEY                  = os.environ.get('SECRET_KEY', 'a_very_secret_key_for_dev')
     SQLALCHEMY_DATABASE_URI     = os.environ.get('DATABASE_URL', 'sqlite:///money_transfer.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    FRONTEND_ORIGINS            = [
+        "http://localhost:5173",
+        "https://money-transfer-d.onrender.com",
+    ]
+
+    # ─── Socket.IO ────────────────────────────────────────────────────────────────
+    # 'eventlet' in production (see Dockerfile); 'threading' works with the dev server
+    SOCKETIO_ASYNC_MODE         = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+    # e.g. redis://... when running more than one worker, so every worker can emit to every room
+    SOCKETIO_MESSAGE_QUEUE      = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+
+    # ─── Auth tokens ──────────────────────────────────────────────────────────────
+    AUTH_TOKEN_TTL              = int(os.environ.get('AUTH_TOKEN_TTL', 24 * 3600))        # seconds
+    AUTH_TOKEN_CACHE_SIZE       = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000))     # verified signatures kept
+    AUTH_REVOCATION_REFRESH     = float(os.environ.get('AUTH_REVOCATION_REFRESH', 30))    # seconds between revocation syncs
+
+    # ─── Password hashing ─────────────────────────────────────────────────────────
+    # Full Werkzeug method string; older hashes are upgraded on the next login
+    PASSWORD_HASH_METHOD        = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS       = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))     # processes; 0 = hash inline
+    PASSWORD_HASH_QUEUE         = int(os.environ.get('PASSWORD_HASH_QUEUE', 32))      # waiting hash/verify calls
+    PASSWORD_HASH_WAIT          = float(os.environ.get('PASSWORD_HASH_WAIT', 5))      # seconds before HasherBusy
+
+    # ─── Rate limits ──────────────────────────────────────────────────────────────
+    # Per endpoint, per user (or per IP when not signed in); "" disables one
+    RATE_LIMIT_ENABLED          = os.environ.get('RATE_LIMIT_ENABLED', '1') not in ('0', 'false', 'False')
+    RATE_LIMITS = {
+        'auth_bp.login':             os.environ.get('RATE_LIMIT_LOGIN', '10/minute'),
+        'auth_bp.register':          os.environ.get('RATE_LIMIT_REGISTER', '5/minute'),
+        'transaction_bp.send_money': os.environ.get('RATE_LIMIT_SEND', '30/minute'),
+        'transaction_bp.send_batch': os.environ.get('RATE_LIMIT_SEND_BATCH', '10/minute'),
+        'wallet_bp.add_funds_mpesa': os.environ.get('RATE_LIMIT_DEPOSIT', '5/minute'),
+    }
+    # "memory" (per worker) or "sqlite:////path/ratelimits.db" (shared by the workers on a host)
+    RATE_LIMIT_STORAGE          = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    # Proxies in front of the app (cloudflared, nginx...) that append to X-Forwarded-For;
+    # anonymous clients are keyed by the entry the outermost one added. 0 = use the peer
+    # address ("true" still means 1)
+    RATE_LIMIT_TRUST_PROXY      = int(os.environ.get('RATE_LIMIT_TRUST_PROXY', '0').lower()
+                                      .replace('true', '1').replace('false', '0'))
+
+    # ─── Entity cache ─────────────────────────────────────────────────────────────
+    # Process-wide copies of wallet ids and users, for the callers that opt in
+    # (shared=True); those may see another worker's change this many seconds late
+    ENTITY_CACHE_TTL            = float(os.environ.get('ENTITY_CACHE_TTL', 10))      # seconds; 0 = per-request only
+    ENTITY_CACHE_MAX_ENTRIES    = int(os.environ.get('ENTITY_CACHE_MAX_ENTRIES', 50000))
+
+    # ─── Metrics ──────────────────────────────────────────────────────────────────
+    # Per-blueprint histograms in the Prometheus text format at /metrics (per worker).
+    # Off by default; enabling it requires METRICS_TOKEN (scrapers send "Bearer <token>")
+    METRICS_ENABLED             = os.environ.get('METRICS_ENABLED', '0') not in ('0', 'false', 'False')
+    METRICS_TOKEN               = os.environ.get('METRICS_TOKEN')
+    # db / db-slowest / serialize / app durations on every response
+    SERVER_TIMING_ENABLED       = os.environ.get('SERVER_TIMING_ENABLED', '1') not in ('0', 'false', 'False')
+    SLOW_QUERY_MS               = float(os.environ.get('SLOW_QUERY_MS', 250))   # log slower statements; 0 = off
+
+    # ─── Pagination ───────────────────────────────────────────────────────────────
+    TRANSACTIONS_PAGE_SIZE      = int(os.environ.get('TRANSACTIONS_PAGE_SIZE', 50))
+    TRANSACTIONS_MAX_PAGE_SIZE  = int(os.environ.get('TRANSACTIONS_MAX_PAGE_SIZE', 200))
+
+    # ─── Transfers ────────────────────────────────────────────────────────────────
+    TRANSFER_MAX_RETRIES        = int(os.environ.get('TRANSFER_MAX_RETRIES', 3))
+    # items accepted by one POST /api/transactions/send/batch
+    TRANSFER_BATCH_MAX_ITEMS    = int(os.environ.get('TRANSFER_BATCH_MAX_ITEMS', 500))
+
+    # ─── Ledger ───────────────────────────────────────────────────────────────────
+    LEDGER_SNAPSHOT_INTERVAL    = int(os.environ.get('LEDGER_SNAPSHOT_INTERVAL', 100))
 
     # ─── M‑Pesa Credentials & Settings ────────────────────────────────────────────
     MPESA_CONSUMER_KEY          = os.environ.get('MPESA_CONSUMER_KEY')
@@ -16,3 +84,32 @@ class Config:
         'MPESA_CALLBACK_URL',
         'http://localhost:5000/api/mpesa/callback'
     )
+    # Overrides the sandbox/production host, e.g. a local stub Daraja server
+    MPESA_BASE_URL              = os.environ.get('MPESA_BASE_URL')
+    # OAuth token cache shared by all workers on this host
+    MPESA_TOKEN_STORE           = os.environ.get(
+        'MPESA_TOKEN_STORE',
+        os.path.join(tempfile.gettempdir(), 'mpesa_token.json')
+    )
+    MPESA_TOKEN_REFRESH_MARGIN  = int(os.environ.get('MPESA_TOKEN_REFRESH_MARGIN', 60))  # seconds
+    # Pooled HTTP session
+    MPESA_POOL_SIZE             = int(os.environ.get('MPESA_POOL_SIZE', 10))
+    MPESA_CONNECT_TIMEOUT       = float(os.environ.get('MPESA_CONNECT_TIMEOUT', 3.05))
+    MPESA_READ_TIMEOUT          = float(os.environ.get('MPESA_READ_TIMEOUT', 10))
+
+    # ─── STK push dispatch ────────────────────────────────────────────────────────
+    STK_DISPATCH_WORKERS        = int(os.environ.get('STK_DISPATCH_WORKERS', 4))    # 0 = send inline
+    STK_DISPATCH_QUEUE          = int(os.environ.get('STK_DISPATCH_QUEUE', 100))    # waiting pushes
+    STK_DISPATCH_MAX_ATTEMPTS   = int(os.environ.get('STK_DISPATCH_MAX_ATTEMPTS', 3))
+    STK_DISPATCH_BACKOFF        = float(os.environ.get('STK_DISPATCH_BACKOFF', 0.5))  # seconds, doubled per retry
+    STK_BREAKER_THRESHOLD       = int(os.environ.get('STK_BREAKER_THRESHOLD', 5))   # consecutive failures
+    STK_BREAKER_RESET           = float(os.environ.get('STK_BREAKER_RESET', 30))    # seconds open
+
+    # ─── M‑Pesa callback inbox ────────────────────────────────────────────────────
+    # Drain in a background thread of each web worker; set to 0 and run
+    # `flask mpesa drain --loop` as a separate process instead if preferred
+    CALLBACK_INBOX_WORKER       = os.environ.get('CALLBACK_INBOX_WORKER', '1') not in ('0', 'false', 'False')
+    CALLBACK_DRAIN_BATCH        = int(os.environ.get('CALLBACK_DRAIN_BATCH', 200))
+    CALLBACK_DRAIN_INTERVAL     = float(os.environ.get('CALLBACK_DRAIN_INTERVAL', 1.0))  # seconds between idle polls
+    CALLBACK_MAX_ATTEMPTS       = int(os.environ.get('CALLBACK_MAX_ATTEMPTS', 5))
+    CALLBACK_RETRY_BACKOFF      = float(os.environ.get('CALLBACK_RETRY_BACKOFF', 2.0))   # seconds, doubled per retry
@@ -1,10 +1,19 @@
 from models.user import User
 from models.wallet import Wallet
 from models.transaction import Transaction
-from schemas.user_schema import user_schema, users_schema
+from schemas.user_schema import user_schema, users_projection
 from schemas.wallet_schema import wallet_schema
-from schemas.transaction_schema import transactions_schema, transaction_schema
+from schemas.transaction_schema import transactions_projection, transaction_schema
 from extensions import db
+from services.transfer_service import TransferService, InsufficientFundsError
+from services.ledger_service import LedgerService
+from services.analytics_service import AnalyticsService, GRANULARITIES
+from services.callback_inbox import CallbackInboxService
+from services.entity_cache import EntityCache
+from models.callback_inbox import CallbackInbox
+from schemas.callback_inbox_schema import callback_inbox_schema, callback_inbox_list_schema
+from utils.pagination import keyset_paginate
+from utils.filters import apply_transaction_filters
 from sqlalchemy import or_
 import datetime
 
@@ -12,8 +21,7 @@ def get_all_users():
     """
     Fetch all users for admin view.
     """
-    users = User.query.all()
-    return users_schema.dump(users)
+    return users_projection.dump_rows(db.session.execute(users_projection.select()))
 
 def get_user_details_for_admin(user_id):
     """
@@ -24,16 +32,18 @@ def get_user_details_for_admin(user_id):
         raise ValueError("User not found")
 
     wallet = Wallet.query.filter_by(user_id=user_id).first()
-    transactions = (
+    transactions = transactions_projection.apply(
         Transaction.query
         .filter_by(user_id=user_id)
         .order_by(Transaction.created_at.desc())
-        .all()
-    )
+    ).all()
 
     user_data = user_schema.dump(user)
     wallet_data = wallet_schema.dump(wallet) if wallet else None
-    transactions_data = transactions_schema.dump(transactions)
+    if wallet_data:
+        # audited balance (latest snapshot + tail) alongside the cached one
+        wallet_data["ledger_balance"] = float(LedgerService.balance(wallet.id))
+    transactions_data = transactions_projection.dump_rows(transactions)
 
     return {
         **user_data,
@@ -42,16 +52,92 @@ def get_user_details_for_admin(user_id):
     }
 
 
-def get_all_transactions():
+def get_all_transactions(filters=None, limit=50, cursor=None):
     """
-    Fetch all transactions (for admin monitoring dashboard).
+    Fetch one page of all transactions (for admin monitoring dashboard).
+    Returns (transactions, next_cursor).
     """
-    transactions = (
-        Transaction.query
-        .order_by(Transaction.created_at.desc())
-        .all()
-    )
-    return transactions_schema.dump(transactions)
+    query = apply_transaction_filters(Transaction.query, filters or {})
+    rows, next_cursor = keyset_paginate(transactions_projection.apply(query), Transaction, limit, cursor)
+    return transactions_projection.dump_rows(rows), next_cursor
+
+# Default look-back when a trends request has no 'from'
+TREND_WINDOWS = {"hour": datetime.timedelta(hours=48), "day": datetime.timedelta(days=30)}
+
+def get_analytics_summary(filters=None):
+    """
+    Totals by type/status and fee revenue, read from the daily rollups.
+    """
+    return AnalyticsService.summary(filters or {})
+
+def get_analytics_trends(granularity="day", filters=None):
+    """
+    Hourly or daily series of count, volume and fees, read from the rollups.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity '{granularity}'")
+    filters = dict(filters or {})
+    if "date_from" not in filters:
+        end = filters.get("date_to") or datetime.datetime.utcnow()
+        filters["date_from"] = end - TREND_WINDOWS[granularity]
+    return {
+        "granularity": granularity,
+        "points": AnalyticsService.trends(granularity, filters),
+    }
+
+def get_wallet_stats():
+    """
+    Global wallet stats (count, total/average/largest balance).
+    """
+    return AnalyticsService.wallet_stats()
+
+def get_cache_stats():
+    """
+    Entity cache size and hit/miss counters (this worker only).
+    """
+    return EntityCache.stats()
+
+INBOX_STATUSES = {"pending", "done", "failed"}
+
+def get_callback_inbox(status=None, limit=50, cursor=None):
+    """
+    One page of the M-Pesa callback inbox, newest first, plus per-status
+    counts. `cursor` is the last id of the previous page.
+    Returns (data, next_cursor).
+    """
+    if status and status not in INBOX_STATUSES:
+        raise ValueError(f"Invalid status '{status}'")
+    query = CallbackInbox.query
+    if status:
+        query = query.filter(CallbackInbox.status == status)
+    if cursor:
+        try:
+            query = query.filter(CallbackInbox.id < int(cursor))
+        except ValueError:
+            raise ValueError("Invalid cursor")
+    entries = query.order_by(CallbackInbox.id.desc()).limit(limit + 1).all()
+    next_cursor = str(entries[limit - 1].id) if len(entries) > limit else None
+    return {
+        "entries": callback_inbox_list_schema.dump(entries[:limit]),
+        "counts": CallbackInboxService.stats(),
+    }, next_cursor
+
+def get_callback_inbox_entry(entry_id):
+    """
+    One inbox entry including its raw payload.
+    """
+    entry = db.session.get(CallbackInbox, entry_id)
+    if not entry:
+        raise ValueError("Inbox entry not found")
+    return callback_inbox_schema.dump(entry)
+
+def replay_callbacks(entry_ids=None, failed=False):
+    """
+    Queue inbox entries (given ids, or every failed one) for another pass.
+    """
+    if entry_ids is not None and not entry_ids:
+        raise ValueError("No inbox entries given")
+    return CallbackInboxService.replay(entry_ids, failed=failed)
 
 def reverse_transaction(transaction_id):
     """
@@ -78,14 +164,12 @@ def reverse_transaction(transaction_id):
     if not recipient_user:
         raise ValueError(f"No registered user matches phone '{raw_phone}'")
 
-    # 1) Deduct from recipient
     recipient_wallet = Wallet.query.filter_by(user_id=recipient_user.id).first()
     if not recipient_wallet:
         raise ValueError("Recipient wallet not found")
-    if recipient_wallet.balance < tx.amount:
-        raise ValueError("Recipient has insufficient balance to reverse")
-    recipient_wallet.balance -= tx.amount
-    db.session.add(recipient_wallet)
+    sender_wallet = Wallet.query.filter_by(user_id=tx.user_id).first()
+    if not sender_wallet:
+        raise ValueError("Sender wallet not found")
 
     # Mark corresponding receive txn as reversed (best‑effort)
     recv_tx = (
@@ -103,18 +187,11 @@ def reverse_transaction(transaction_id):
         recv_tx.status = "reversed"
         db.session.add(recv_tx)
 
-    # 2) Refund sender (amount + fee)
-    sender_wallet = Wallet.query.filter_by(user_id=tx.user_id).first()
-    if not sender_wallet:
-        raise ValueError("Sender wallet not found")
-    sender_wallet.balance += (tx.amount + tx.fee)
-    db.session.add(sender_wallet)
-
-    # 3) Mark original send as reversed
+    # Mark original send as reversed
     tx.status = "reversed"
     db.session.add(tx)
 
-    # 4) Create a reversal transaction record
+    # Create a reversal transaction record
     reversal_tx = Transaction(
         user_id=tx.user_id,
         type="refund",
@@ -126,6 +203,16 @@ def reverse_transaction(transaction_id):
     )
     db.session.add(reversal_tx)
 
+    # Deduct from recipient and refund sender (amount + fee), atomically
+    try:
+        TransferService.apply([
+            (recipient_wallet.id, -tx.amount, recv_tx),
+            (sender_wallet.id, tx.amount + tx.fee, reversal_tx),
+        ])
+    except InsufficientFundsError:
+        db.session.rollback()
+        raise ValueError("Recipient has insufficient balance to reverse")
+
     # Commit all changes
     db.session.commit()
     return transaction_schema.dump(reversal_tx)
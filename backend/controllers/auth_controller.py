@@ -5,7 +5,8 @@ from schemas.user_schema import user_schema
 from schemas.wallet_schema import wallet_schema
 from schemas.transaction_schema import transactions_schema
 from extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.password_hasher import PasswordHasher
+from services.entity_cache import EntityCache
 import datetime
 
 def register_user(data):
@@ -17,7 +18,7 @@ def register_user(data):
     if User.query.filter_by(phone=phone).first():
         raise ValueError("Phone number already exists")
 
-    hashed_password = generate_password_hash(data['password'])
+    hashed_password = PasswordHasher.hash(data['password'])
     new_user = User(
         email=email,
         password_hash=hashed_password,
@@ -38,15 +39,20 @@ def register_user(data):
 
 def login_user(email, password):
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password_hash, password):
+    if not user or not PasswordHasher.verify(user.password_hash, password):
         raise ValueError("Invalid email or password")
+    if PasswordHasher.needs_rehash(user.password_hash):
+        # hash parameters changed since this one was made
+        user.password_hash = PasswordHasher.hash(password)
+        db.session.commit()
     return user_schema.dump(user)
 
 def get_current_user_profile(user_id):
-    user = User.query.get(user_id)
+    # request tier only: served under @user_etag, so never older than the version
+    user = EntityCache.user(user_id)
     if not user:
         raise ValueError("User not found")
-    return user_schema.dump(user)
+    return user
 
 def update_user_profile(user_id, data):
     user = User.query.get(user_id)
@@ -65,12 +71,12 @@ def change_user_password(user_id, old_password, new_password):
     if not user:
         raise ValueError("User not found")
 
-    if not check_password_hash(user.password_hash, old_password):
+    if not PasswordHasher.verify(user.password_hash, old_password):
         raise ValueError("Incorrect current password")
 
     if not new_password or len(new_password) < 6:
         raise ValueError("New password must be at least 6 characters")
 
-    user.password_hash = generate_password_hash(new_password)
+    user.password_hash = PasswordHasher.hash(new_password)
     db.session.commit()
     return {"message": "Password changed successfully"}
@@ -1,14 +1,14 @@
 import datetime
 from models.beneficiary import Beneficiary
-from schemas.beneficiary_schema import beneficiary_schema, beneficiaries_schema
+from schemas.beneficiary_schema import beneficiary_schema
 from extensions import db
+from services.entity_cache import EntityCache
 
 def get_beneficiaries(user_id):
     """
     Return list of all Beneficiaries for a given user.
     """
-    bens = Beneficiary.query.filter_by(user_id=user_id).all()
-    return beneficiaries_schema.dump(bens)
+    return EntityCache.beneficiaries(user_id)
 
 
 def add_beneficiary(user_id, data):
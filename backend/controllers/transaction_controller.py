@@ -1,11 +1,32 @@
 import re
 import datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import func, insert
 from extensions import db
-from models.transaction import Transaction
-from models.wallet import Wallet
 from models.beneficiary import Beneficiary
+from models.transaction import Transaction
+from models.money import Money
 from models.user import User
-from schemas.transaction_schema import transaction_schema, transactions_schema
+from models.wallet import Wallet
+from schemas.transaction_schema import transaction_schema, transactions_projection
+from services.transfer_service import TransferService
+from services.realtime import RealtimeService
+from services.analytics_service import AnalyticsService
+from services.entity_cache import EntityCache
+from utils.pagination import keyset_paginate
+from utils.filters import apply_transaction_filters
+
+FEE_RATE = Decimal("0.01")  # 1% fee
+BATCH_MODES = ("all_or_nothing", "best_effort")
+
+
+class BatchRejected(ValueError):
+    """An all_or_nothing batch had items that could not be paid; nothing was sent."""
+
+    def __init__(self, message, items):
+        super().__init__(message)
+        self.items = items
 
 def normalize_phone(raw):
     """
@@ -19,39 +40,74 @@ def normalize_phone(raw):
         digits = "254" + digits
     return "+" + digits
 
-def get_transactions(user_id):
-    transactions = (
-        Transaction.query
-        .filter_by(user_id=user_id)
-        .order_by(Transaction.created_at.desc())
-        .all()
+def get_transactions(user_id, filters=None, limit=50, cursor=None):
+    """
+    One page of a user's history, newest first.
+    Returns (transactions, next_cursor).
+    """
+    query = apply_transaction_filters(
+        Transaction.query.filter_by(user_id=user_id), filters or {}
     )
-    return transactions_schema.dump(transactions)
+    rows, next_cursor = keyset_paginate(transactions_projection.apply(query), Transaction, limit, cursor)
+    return transactions_projection.dump_rows(rows), next_cursor
+
+def get_summary(user_id, filters=None):
+    """
+    Totals over a user's whole (filtered) history, with one GROUP BY:
+    the row count and, per type, the count and completed volume.
+    """
+    query = apply_transaction_filters(
+        db.session.query(
+            Transaction.type,
+            func.count(Transaction.id),
+            func.coalesce(func.sum(Transaction.amount)
+                          .filter(Transaction.status == "completed"), 0),
+        ).filter(Transaction.user_id == user_id),
+        filters or {},
+    ).group_by(Transaction.type)
+    by_type = {type_: {"count": count, "volume": float(Money.of(volume))}
+               for type_, count, volume in query}
+    return {"count": sum(t["count"] for t in by_type.values()), "byType": by_type}
 
 def send_money(user_id, beneficiary_id, amount, description):
+    """
+    Debit sender (amount + 1% fee), credit a registered recipient and write
+    both ledger rows in one DB transaction, retried on lock conflicts.
+    """
+    return TransferService.run(
+        lambda: _send_money_once(user_id, beneficiary_id, amount, description),
+        retries=current_app.config["TRANSFER_MAX_RETRIES"],
+    )
+
+def _send_money_once(user_id, beneficiary_id, amount, description):
     # Fetch sender wallet
-    wallet = Wallet.query.filter_by(user_id=user_id).first()
-    if not wallet:
+    wallet_id = EntityCache.wallet_id(user_id, shared=True)
+    if wallet_id is None:
         raise ValueError("Wallet not found")
 
     # Fetch beneficiary
-    beneficiary = Beneficiary.query.get(beneficiary_id)
-    if not beneficiary or beneficiary.user_id != user_id:
+    beneficiary = EntityCache.beneficiary(beneficiary_id)
+    if not beneficiary or beneficiary["user_id"] != user_id:
         raise ValueError("Beneficiary not found or does not belong to you")
 
-    # Compute fee and total
-    fee = round(amount * 0.01, 2)  # 1% fee
+    # Compute fee and total (exact, in cents)
+    amount = Money.of(amount)
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    fee = amount * FEE_RATE
     total_amount = amount + fee
 
-    if wallet.balance < total_amount:
-        raise ValueError("Insufficient funds")
-
     # Normalize beneficiary phone
-    normalized_phone = normalize_phone(beneficiary.phone)
+    phone = beneficiary["phone"]
+    normalized_phone = normalize_phone(phone)
 
-    # Deduct from sender's wallet
-    wallet.balance -= total_amount
-    db.session.add(wallet)
+    # If the beneficiary is a registered user, credit their wallet
+    recipient_user_id = None
+    recipient_wallet_id = None
+    if phone:
+        recipient_user_id = EntityCache.user_id_by_phone(phone)
+    if recipient_user_id:
+        recipient_wallet_id = EntityCache.wallet_id(recipient_user_id, shared=True)
 
     # Create sender's transaction
     sender_transaction = Transaction(
@@ -61,40 +117,202 @@ def send_money(user_id, beneficiary_id, amount, description):
         fee=fee,
         status="completed",
         description=description,
-        recipient_name=beneficiary.name,
+        recipient_name=beneficiary["name"],
         recipient_phone=normalized_phone,
         created_at=datetime.datetime.utcnow()
     )
     db.session.add(sender_transaction)
+    movements = [(wallet_id, -total_amount, sender_transaction)]
 
-    # If the beneficiary is a registered user, credit their wallet
-   
-    recipient_user = None
-    if beneficiary.phone:
-        recipient_user = User.query.filter_by(phone=beneficiary.phone).first()
-
-    if recipient_user:
-        recipient_wallet = Wallet.query.filter_by(user_id=recipient_user.id).first()
-        if recipient_wallet:
-            # Credit recipient (full amount, no fee)
-            recipient_wallet.balance += amount
-            db.session.add(recipient_wallet)
-
-            recipient_transaction = Transaction(
-                user_id=recipient_user.id,
-                type="receive",
-                amount=amount,
-                fee=0,
-                status="completed",
-                description=f"Received from {wallet.user.first_name} {wallet.user.last_name}",
-                recipient_name=f"{wallet.user.first_name} {wallet.user.last_name}",
-                recipient_phone=normalize_phone(wallet.user.phone),
-                created_at=datetime.datetime.utcnow()
-            )
-            db.session.add(recipient_transaction)
+    if recipient_wallet_id:
+        sender = EntityCache.user(user_id, shared=True)  # only the name, for the receipt
+        recipient_transaction = Transaction(
+            user_id=recipient_user_id,
+            type="receive",
+            amount=amount,
+            fee=0,
+            status="completed",
+            description=f"Received from {sender['first_name']} {sender['last_name']}",
+            recipient_name=f"{sender['first_name']} {sender['last_name']}",
+            recipient_phone=normalize_phone(sender['phone']),
+            created_at=datetime.datetime.utcnow()
+        )
+        db.session.add(recipient_transaction)
+        movements.append((recipient_wallet_id, amount, recipient_transaction))
+
+    # Debit sender (guarded by balance >= total), credit recipient and post
+    # both ledger entries atomically
+    TransferService.apply(movements)
+
+    if recipient_wallet_id:
+        RealtimeService.notify(recipient_user_id, "incoming_transfer", {
+            "transactionId": recipient_transaction.id,
+            "amount": float(amount),
+            "from": recipient_transaction.recipient_name,
+            "description": description,
+        })
 
     # Commit all changes
     db.session.commit()
 
     # Return the sender's transaction object
     return transaction_schema.dump(sender_transaction)
+
+def send_batch(user_id, items, mode="all_or_nothing", description=None):
+    """
+    Pay many beneficiaries from the user's wallet in one DB transaction,
+    retried on lock conflicts. `items` are {"beneficiaryId", "amount"[,
+    "description"]} dicts; the result reports each item, in input order.
+
+    all_or_nothing raises BatchRejected (with the per-item report) unless
+    every item can be paid; best_effort pays the items that are valid and
+    fit the balance, in order, and reports the rest as failed.
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(BATCH_MODES)}")
+    return TransferService.run(
+        lambda: _send_batch_once(user_id, items, mode, description),
+        retries=current_app.config["TRANSFER_MAX_RETRIES"],
+    )
+
+def _insert_transactions(rows):
+    """Multi-row INSERT of Transaction rows; returns their ids in row order."""
+    table = Transaction.__table__
+    if db.session.connection().dialect.name == "sqlite":
+        # SQLite has no insert sentinel for an integer key, so ordered
+        # RETURNING would mean one INSERT per row; within our write lock
+        # rowids are handed out in VALUES order, so sorting restores it
+        return sorted(db.session.scalars(insert(table).returning(table.c.id), rows))
+    return db.session.scalars(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).all()
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _send_batch_once(user_id, items, mode, description):
+    wallet_id = EntityCache.wallet_id(user_id, shared=True)
+    if wallet_id is None:
+        raise ValueError("Wallet not found")
+
+    # Resolve all beneficiaries with one IN query
+    ids = {item.get("beneficiaryId") for item in items if _is_id(item.get("beneficiaryId"))}
+    beneficiaries = {}
+    if ids:
+        beneficiaries = {b.id: b for b in db.session.execute(
+            db.select(Beneficiary.id, Beneficiary.name, Beneficiary.phone)
+            .where(Beneficiary.user_id == user_id, Beneficiary.id.in_(ids)))}
+
+    results = []
+    payable = []  # (index, beneficiary, amount, fee)
+    for index, item in enumerate(items):
+        beneficiary_id, amount = item.get("beneficiaryId"), item.get("amount")
+        results.append({"index": index, "beneficiaryId": beneficiary_id, "amount": amount,
+                        "status": "failed"})
+        if not isinstance(amount, (int, float)) or isinstance(amount, bool) or amount <= 0:
+            results[index]["error"] = "A valid amount is required"
+            continue
+        beneficiary = beneficiaries.get(beneficiary_id) if _is_id(beneficiary_id) else None
+        if beneficiary is None:
+            results[index]["error"] = "Beneficiary not found or does not belong to you"
+            continue
+        amount = Money.of(amount)
+        if amount <= 0:
+            results[index]["error"] = "Amount must be positive"
+            continue
+        payable.append((index, beneficiary, amount, amount * FEE_RATE))
+
+    # Registered recipients (phone -> user id, wallet id) with one IN query
+    phones = {b.phone for _, b, _, _ in payable if b.phone}
+    recipients = {}
+    if phones:
+        recipients = {phone: (uid, wid) for phone, uid, wid in db.session.execute(
+            db.select(User.phone, User.id, Wallet.id)
+            .join(Wallet, Wallet.user_id == User.id)
+            .where(User.phone.in_(phones)))}
+
+    # Lock every wallet involved, in id order (same order as single
+    # transfers, so opposing batches cannot deadlock), and read the balance
+    wallet_ids = {wallet_id, *(wid for _, wid in recipients.values())}
+    balances = dict(db.session.execute(
+        db.select(Wallet.id, Wallet.balance)
+        .where(Wallet.id.in_(wallet_ids))
+        .order_by(Wallet.id)
+        .with_for_update()).all())
+
+    available = balances[wallet_id]
+    accepted = []
+    for entry in payable:
+        index, _, amount, fee = entry
+        if amount + fee > available:
+            results[index]["error"] = "Insufficient funds"
+            continue
+        available -= amount + fee
+        accepted.append(entry)
+
+    if mode == "all_or_nothing" and len(accepted) < len(items):
+        for result in results:
+            if "error" not in result:
+                result["status"] = "skipped"
+        raise BatchRejected("Batch rejected; no transfers were made", results)
+
+    # Bulk-insert both sides' Transaction rows, then move all balances and
+    # post all ledger entries in a fixed number of statements
+    now = datetime.datetime.utcnow()
+    sender = EntityCache.user(user_id, shared=True)  # only the name, for the receipts
+    sender_name = f"{sender['first_name']} {sender['last_name']}"
+    rows = []
+    owners = []  # wallet id and signed amount per row
+    incoming = []  # (row index, recipient user id, description)
+    for index, beneficiary, amount, fee in accepted:
+        item_description = items[index].get("description") or description
+        rows.append(dict(
+            user_id=user_id, type="send", amount=amount, fee=fee, status="completed",
+            description=item_description, recipient_name=beneficiary.name,
+            recipient_phone=normalize_phone(beneficiary.phone), created_at=now,
+        ))
+        owners.append((wallet_id, -(amount + fee)))
+        recipient = recipients.get(beneficiary.phone)
+        if recipient:
+            incoming.append((len(rows), recipient[0], item_description))
+            rows.append(dict(
+                user_id=recipient[0], type="receive", amount=amount, fee=Money(0),
+                status="completed", description=f"Received from {sender_name}",
+                recipient_name=sender_name, recipient_phone=normalize_phone(sender["phone"]),
+                created_at=now,
+            ))
+            owners.append((recipient[1], amount))
+
+    tx_ids = []
+    if rows:
+        tx_ids = _insert_transactions(rows)
+        TransferService.apply_bulk([(wid, delta, tx_id)
+                                    for (wid, delta), tx_id in zip(owners, tx_ids)])
+        AnalyticsService.record_inserts(rows)
+        for row_index, recipient_user_id, item_description in incoming:
+            RealtimeService.notify(recipient_user_id, "incoming_transfer", {
+                "transactionId": tx_ids[row_index],
+                "amount": float(rows[row_index]["amount"]),
+                "from": sender_name,
+                "description": item_description,
+            })
+
+    db.session.commit()
+
+    # Sender-side rows, in the same shape as send_money returns
+    sent = {}
+    if tx_ids:
+        sent_ids = [tx_id for tx_id, row in zip(tx_ids, rows) if row["type"] == "send"]
+        query = Transaction.query.filter(Transaction.id.in_(sent_ids))
+        sent = {t["id"]: t for t in transactions_projection.dump_rows(
+            transactions_projection.apply(query).all())}
+        for (index, *_), tx_id in zip(accepted, sent_ids):
+            results[index]["status"] = "completed"
+            results[index]["transaction"] = sent[tx_id]
+
+    return {
+        "mode": mode,
+        "completed": len(accepted),
+        "failed": len(items) - len(accepted),
+        "totalDebited": float(sum(amount + fee for _, _, amount, fee in accepted)),
+        "items": results,
+    }
@@ -1,8 +1,7 @@
-from models.user import User
-from schemas.user_schema import user_schema
+from services.entity_cache import EntityCache
 
 def get_user_by_id(user_id):
-    user = User.query.get(user_id)
+    user = EntityCache.user(user_id)
     if not user:
         raise ValueError("User not found")
-    return user_schema.dump(user)
+    return user
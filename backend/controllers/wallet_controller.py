@@ -1,9 +1,14 @@
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from extensions import db
 from models.wallet import Wallet
 from models.transaction import Transaction
+from models.money import Money
 from schemas.wallet_schema import wallet_schema
-from services.mpesa_service import MpesaService
+from services.stk_dispatcher import StkDispatcher
+from services.transfer_service import TransferService
+from services.callback_inbox import CallbackInboxService
+from services.entity_cache import EntityCache
 
 
 # ───────────── Helpers ─────────────
@@ -20,15 +25,15 @@ def get_wallet_balance(user_id: int):
   return wallet_schema.dump(wallet)
 
 
-def add_funds_to_wallet(user_id: int, amount: float):
+def add_funds_to_wallet(user_id: int, amount):
   """Manual/instant top‑up (no M‑Pesa)."""
+  amount = Money.of(amount)
+  if amount <= 0:
+    raise ValueError("Amount must be positive")
   wallet = Wallet.query.filter_by(user_id=user_id).first()
   if not wallet:
     raise ValueError("Wallet not found")
 
-  wallet.balance += amount
-  db.session.add(wallet)
-
   tx = Transaction(
     user_id=user_id,
     type="deposit",
@@ -39,6 +44,7 @@ def add_funds_to_wallet(user_id: int, amount: float):
     created_at=datetime.utcnow(),
   )
   db.session.add(tx)
+  TransferService.apply([(wallet.id, amount, tx)])
   db.session.commit()
 
   return wallet_schema.dump(wallet)
@@ -46,20 +52,18 @@ def add_funds_to_wallet(user_id: int, amount: float):
 
 # ───────────── STK Push Flow ─────────────
 def initiate_mpesa_deposit(user_id: int, phone: str, amount: int):
-  """Send STK push + create pending txn."""
+  """Create the pending deposit and queue its STK push.
+
+  Returns straight away with the transaction id; the push is sent by
+  StkDispatcher, which records 'sent' (with the checkout ids) or 'failed'
+  on the row. Poll /tx-status/<transactionId> for the outcome.
+  """
   if amount < 1:
     raise ValueError("Amount must be >= 1")
 
-  wallet = Wallet.query.filter_by(user_id=user_id).first()
-  if not wallet:
+  if EntityCache.wallet_id(user_id, shared=True) is None:
     raise ValueError("Wallet not found")
-
-  stk = MpesaService.lipa_na_mpesa(
-    phone_number=phone,
-    amount=amount,
-    account_reference=user_id,
-    transaction_desc="Wallet top-up"
-  )
+  StkDispatcher.check_available()
 
   tx = Transaction(
     user_id=user_id,
@@ -67,95 +71,56 @@ def initiate_mpesa_deposit(user_id: int, phone: str, amount: int):
     amount=amount,
     fee=0,
     status="pending",
-    description="STK Push - Awaiting Confirmation",
+    description="STK Push - Sending",
+    dispatch_status="queued",
     created_at=datetime.utcnow()
   )
-  _set_if_attr(tx, "checkout_request_id", stk.get("CheckoutRequestID"))
-  _set_if_attr(tx, "merchant_request_id", stk.get("MerchantRequestID"))
-
   db.session.add(tx)
   db.session.commit()
+  tx_id = tx.id
+
+  StkDispatcher.submit(tx_id, user_id, phone, amount)
 
   return {
-    "checkoutRequestID": stk.get("CheckoutRequestID"),
-    "customerMessage": stk.get("CustomerMessage"),
-    "transactionId": tx.id
+    "transactionId": tx_id,
+    "checkoutRequestID": None,
+    "dispatchStatus": "queued",
+    "customerMessage": "Check your phone to complete the payment",
   }
 
 
-def handle_mpesa_callback(payload: dict):
-  """Mark txn completed/failed + credit wallet."""
-  try:
-    stk_cb = payload["Body"]["stkCallback"]
-    result_code = stk_cb["ResultCode"]
-    result_desc = stk_cb["ResultDesc"]
-    checkout_id = stk_cb["CheckoutRequestID"]
-  except KeyError:
-    return {"ok": False, "reason": "invalid payload"}
-
-  # locate txn
-  tx = None
-  if hasattr(Transaction, "checkout_request_id"):
-    tx = Transaction.query.filter_by(checkout_request_id=checkout_id).first()
-  if not tx:
-    tx = (Transaction.query
-          .filter_by(type="deposit", status="pending")
-          .order_by(Transaction.created_at.desc())
-          .first())
-    if not tx:
-      return {"ok": True, "note": "txn not found"}
-
-  if result_code != 0:
-    tx.status = "failed"
-    tx.description = result_desc
-    db.session.add(tx)
-    db.session.commit()
-    return {"ok": True}
+def handle_mpesa_callback(payload: str):
+  """Durably queue a raw callback body; returns the inbox id.
 
-  # success path
-  items = stk_cb.get("CallbackMetadata", {}).get("Item", [])
-  meta = {i["Name"]: i.get("Value") for i in items}
+  Matching, crediting and dedupe happen in CallbackInboxService.drain(),
+  in batches, off the request thread.
+  """
+  return CallbackInboxService.append(payload)
 
-  amount  = float(meta.get("Amount", tx.amount))
-  receipt = meta.get("MpesaReceiptNumber")
-  phone   = meta.get("PhoneNumber")
-
-  tx.status = "completed"
-  tx.description = f"Deposit via M-Pesa ({receipt})"
-  _set_if_attr(tx, "mpesa_receipt", receipt)
-  _set_if_attr(tx, "phone", phone)
-  _set_if_attr(tx, "completed_at", datetime.utcnow())
-  db.session.add(tx)
-
-  wallet = Wallet.query.filter_by(user_id=tx.user_id).first()
-  wallet.balance += amount
-  db.session.add(wallet)
-
-  db.session.commit()
-  return {"ok": True}
-
-
-def get_transaction_status(checkout_id: str):
-  """Frontend polling endpoint."""
-  tx = None
-  if hasattr(Transaction, "checkout_request_id"):
-    tx = Transaction.query.filter_by(checkout_request_id=checkout_id).first()
-  if not tx:
-    tx = (Transaction.query
-          .filter_by(type="deposit", status="pending")
-          .order_by(Transaction.created_at.desc())
-          .first())
 
+def get_transaction_status(ref: str, user_id: int):
+  """
+  Frontend polling endpoint: one of the user's deposits, by checkout
+  request id or by transaction id. Other users' deposits are not found.
+  """
+  tx = Transaction.query.filter_by(checkout_request_id=ref, user_id=user_id).first()
+  if not tx and ref.isdigit():
+    tx = Transaction.query.filter_by(id=int(ref), user_id=user_id, type="deposit").first()
   if not tx:
     raise ValueError("Transaction not found")
 
-  return {"status": tx.status, "id": tx.id}
+  return {
+    "status": tx.status,
+    "id": tx.id,
+    "checkoutRequestID": tx.checkout_request_id,
+    "dispatchStatus": tx.dispatch_status,
+  }
 
 
 # ───────────── Utility (manual credit) ─────────────
 def credit_wallet_from_mpesa(
   user_id: int,
-  amount: float,
+  amount,
   receipt: str,
   phone: str,
   checkout_id: str = None,
@@ -164,14 +129,12 @@ def credit_wallet_from_mpesa(
 ):
   if not user_id:
     raise ValueError("user_id is required to credit wallet")
+  amount = Money.of(amount)
 
   wallet = Wallet.query.filter_by(user_id=user_id).first()
   if not wallet:
     raise ValueError("Wallet not found")
 
-  wallet.balance += amount
-  db.session.add(wallet)
-
   tx = Transaction(
     user_id=user_id,
     type="deposit",
@@ -181,13 +144,18 @@ def credit_wallet_from_mpesa(
     description="Deposit via M-Pesa",
     created_at=trans_time or datetime.utcnow(),
   )
-  _set_if_attr(tx, "mpesa_receipt", receipt)
+  tx.mpesa_receipt = receipt
+  tx.checkout_request_id = checkout_id
+  tx.merchant_request_id = merchant_id
   _set_if_attr(tx, "phone", phone)
-  _set_if_attr(tx, "checkout_request_id", checkout_id)
-  _set_if_attr(tx, "merchant_request_id", merchant_id)
 
   db.session.add(tx)
-  db.session.commit()
+  try:
+    TransferService.apply([(wallet.id, amount, tx)])
+    db.session.commit()
+  except IntegrityError:
+    db.session.rollback()
+    raise ValueError(f"M-Pesa receipt {receipt} already credited")
 
   return wallet_schema.dump(wallet)
 
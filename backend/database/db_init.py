@@ -3,13 +3,29 @@ from models.user import User
 from models.wallet import Wallet
 from models.beneficiary import Beneficiary
 from models.transaction import Transaction
-from werkzeug.security import generate_password_hash
+from services.transfer_service import TransferService
+from services.password_hasher import PasswordHasher
+from flask_migrate import upgrade, stamp
 import datetime
 
+# First migration: the tables create_all() made before migrations existed
+BASELINE_REVISION = "3c9a1f0b5e21"
+
 def init_db(app):
     with app.app_context():
-        db.create_all()
-        print("Database tables created.")
+        inspector = db.inspect(db.engine)
+        if inspector.has_table("user"):
+            if not inspector.has_table("alembic_version"):
+                # Created by create_all() before migrations existed
+                stamp(revision=BASELINE_REVISION)
+            # Existing database: apply any pending migrations
+            upgrade()
+            print("Database migrations applied.")
+        else:
+            # Fresh database: build the current schema and mark it as head
+            db.create_all()
+            stamp()
+            print("Database tables created.")
         seed_data()
 
 def seed_data():
@@ -20,7 +36,7 @@ def seed_data():
         # Demo Users
         admin_user = User(
             email="admin@example.com",
-            password_hash=generate_password_hash("admin123"),
+            password_hash=PasswordHasher.hash("admin123"),
             first_name="Admin",
             last_name="User",
             phone="+254712345678",
@@ -29,7 +45,7 @@ def seed_data():
         )
         john_doe = User(
             email="john@example.com",
-            password_hash=generate_password_hash("password123"),
+            password_hash=PasswordHasher.hash("password123"),
             first_name="John",
             last_name="Doe",
             phone="+254723456789",
@@ -40,9 +56,12 @@ def seed_data():
         db.session.commit()
 
         # Demo Wallets
-        admin_wallet = Wallet(user_id=admin_user.id, balance=50000, currency="KES")
-        john_wallet = Wallet(user_id=john_doe.id, balance=25000, currency="KES")
+        admin_wallet = Wallet(user_id=admin_user.id, balance=0, currency="KES")
+        john_wallet = Wallet(user_id=john_doe.id, balance=0, currency="KES")
         db.session.add_all([admin_wallet, john_wallet])
+        db.session.flush()
+        # Opening balances go through the ledger like any other movement
+        TransferService.apply([(admin_wallet.id, 50000), (john_wallet.id, 25000)])
         db.session.commit()
 
         # Demo Beneficiaries for John Doe
@@ -0,0 +1,285 @@
+import csv
+import datetime
+import io
+import math
+import random
+import time
+from array import array
+from bisect import bisect
+from itertools import accumulate
+
+from flask import current_app
+from sqlalchemy import bindparam, func, select, update
+from extensions import db
+from models.beneficiary import Beneficiary
+from models.ledger import BalanceSnapshot, LedgerEntry
+from models.money import Money, MoneyType
+from models.transaction import Transaction
+from models.user import User
+from models.wallet import Wallet
+from controllers.transaction_controller import FEE_RATE
+from services.analytics_service import AnalyticsService
+from services.password_hasher import PasswordHasher
+
+FIRST_NAMES = ("Amina", "Brian", "Wanjiku", "Otieno", "Akinyi", "Kamau", "Njeri", "Kiprop",
+               "Achieng", "Mwangi", "Fatuma", "Omondi", "Chebet", "Mutua", "Wairimu", "Hassan")
+LAST_NAMES = ("Odhiambo", "Kariuki", "Wafula", "Cheruiyot", "Njoroge", "Mohamed", "Onyango",
+              "Kiptoo", "Wambui", "Mutiso", "Ochieng", "Kimani", "Atieno", "Rotich", "Nyambura")
+SEND_DESCRIPTIONS = ("Rent", "School fees", "Groceries", "Payment for services",
+                     "Chama contribution", "Family support", None)
+DEPOSIT_STATUSES = (("completed", "Deposit via M-Pesa"), ("failed", "Request cancelled by user"),
+                    ("pending", "STK Push sent"))
+DEPOSIT_STATUS_WEIGHTS = (90, 7, 3)
+# Relative activity per hour of day (quiet nights, midday and evening peaks)
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 2, 4, 6, 8, 9, 9, 9, 10, 9, 8, 8, 9, 10, 10, 9, 7, 5, 3, 2)
+WEEKEND_WEIGHT = 0.8
+# Median transfer KES 500, long right tail, clamped to M-Pesa-like limits
+AMOUNT_MEDIAN_CENTS = 50_000
+AMOUNT_SIGMA = 1.1
+AMOUNT_RANGE_CENTS = (1_000, 15_000_000)
+
+
+def _name(n: int, salt: int):
+    h = (n * 2654435761 + salt) & 0xFFFFFFFF
+    return FIRST_NAMES[h % len(FIRST_NAMES)], LAST_NAMES[(h >> 8) % len(LAST_NAMES)]
+
+
+def _insert(connection, table, rows):
+    """
+    Bulk INSERT of same-keyed dicts: values go through the column types'
+    bind processors and straight to the driver's executemany, or to
+    COPY ... FROM STDIN on Postgres (psycopg2).
+    """
+    if not rows:
+        return
+    dialect = connection.dialect
+    columns = list(rows[0])
+    processors = [table.c[c].type.dialect_impl(dialect).bind_processor(dialect) for c in columns]
+    values = [tuple(p(row[c]) if p else row[c] for c, p in zip(columns, processors))
+              for row in rows]
+    quoted = ", ".join(dialect.identifier_preparer.quote(c) for c in columns)
+    name = dialect.identifier_preparer.format_table(table)
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(values)  # None -> empty unquoted field -> NULL
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY {name} ({quoted}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        marker = "?" if dialect.paramstyle == "qmark" else "%s"
+        connection.exec_driver_sql(
+            f"INSERT INTO {name} ({quoted}) VALUES ({', '.join([marker] * len(columns))})", values)
+    rows.clear()
+
+
+# Default end of the history: fixed, so a seed always gives the same dataset
+DEFAULT_END = datetime.datetime(2025, 1, 1)
+
+
+def generate(users, transactions, seed=42, days=90, end=None, beneficiaries=3.0,
+             registered=0.6, deposit_share=0.35, skew=1.1, batch_size=10_000,
+             password="password123", echo=None):
+    """
+    Append `users` users (each with a wallet and ~`beneficiaries`
+    beneficiaries, a `registered` share of them other synthetic users) and
+    `transactions` transfers/deposits spread over the `days` before `end`
+    (default: DEFAULT_END). Everything is drawn from random.Random(seed), so
+    the same arguments on the same starting database give the same rows
+    (apart from the salt of the shared password hash).
+
+    Activity is skewed towards hot accounts (Zipf with exponent `skew` over
+    a shuffled user order), follows a daily/weekly rhythm, and mixes
+    deposits (completed / failed / pending) with sends. The data is
+    ledger-consistent: every completed movement has its LedgerEntry,
+    BalanceSnapshots are written every LEDGER_SNAPSHOT_INTERVAL entries as
+    postings would, wallet balances equal their ledger totals and never go
+    negative (a send the sender cannot afford becomes a deposit), and the
+    analytics rollups are updated with each batch. A send to a registered
+    user also writes the recipient's receive row, so more than
+    `transactions` rows are created.
+
+    Rows go in with explicit ids through executemany (COPY on Postgres), in
+    `batch_size` chunks, inside one transaction. Returns row counts.
+    """
+    started = time.perf_counter()
+    echo = echo or (lambda message: None)
+    rng = random.Random(seed)
+    connection = db.session.connection()
+    interval = current_app.config["LEDGER_SNAPSHOT_INTERVAL"]
+    end = end or DEFAULT_END
+    start = end - datetime.timedelta(days=days)
+
+    def next_id(model):
+        return db.session.scalar(select(func.coalesce(func.max(model.id), 0))) + 1
+
+    first_user, first_wallet, first_beneficiary = next_id(User), next_id(Wallet), next_id(Beneficiary)
+    tx_id, entry_id, snapshot_id = next_id(Transaction), next_id(LedgerEntry), next_id(BalanceSnapshot)
+    if first_user + users > 10_000_000:
+        raise ValueError("Synthetic phone numbers allow at most 10,000,000 users")
+
+    def user_phone(i):
+        return f"+25479{first_user + i:07d}"
+
+    def user_name(i):
+        return _name(first_user + i, seed)
+
+    # ─── users and wallets ───
+    password_hash = PasswordHasher.hash(password)
+    user_rows, wallet_rows = [], []
+    for i in range(users):
+        first, last = user_name(i)
+        user_rows.append({
+            "id": first_user + i, "email": f"user{first_user + i}@example.com",
+            "password_hash": password_hash, "first_name": first, "last_name": last,
+            "phone": user_phone(i), "role": "user",
+            "created_at": start - datetime.timedelta(seconds=rng.randrange(365 * 86400)),
+        })
+        wallet_rows.append({"id": first_wallet + i, "user_id": first_user + i,
+                            "balance": Money(0), "currency": "KES", "entries_since_snapshot": 0})
+        if len(user_rows) >= batch_size or i == users - 1:
+            _insert(connection, User.__table__, user_rows)
+            _insert(connection, Wallet.__table__, wallet_rows)
+    echo(f"{users:,} users and wallets")
+
+    # ─── beneficiaries: user i owns ids ben_first[i] .. + ben_count[i] - 1 ───
+    ben_first, ben_count, ben_target = array("q"), array("H"), array("l")
+    bid = first_beneficiary
+    rows = []
+    for i in range(users):
+        count = min(int(rng.expovariate(1 / beneficiaries)) if beneficiaries else 0, 65_535)
+        ben_first.append(bid)
+        ben_count.append(count)
+        for _ in range(count):
+            target = rng.randrange(users) if users > 1 and rng.random() < registered else -1
+            if target == i:
+                target = (i + 1) % users
+            if target >= 0:
+                (first, last), phone = user_name(target), user_phone(target)
+            else:
+                (first, last), phone = _name(bid, seed + 1), f"+2541{bid:08d}"
+            ben_target.append(target)
+            rows.append({"id": bid, "user_id": first_user + i, "name": f"{first} {last}",
+                         "phone": phone, "created_at": start})
+            bid += 1
+            if len(rows) >= batch_size:
+                _insert(connection, Beneficiary.__table__, rows)
+    _insert(connection, Beneficiary.__table__, rows)
+    echo(f"{bid - first_beneficiary:,} beneficiaries")
+
+    # ─── transactions, ledger entries and snapshots, in time order ───
+    hot = list(range(users))
+    rng.shuffle(hot)
+    popularity = list(accumulate(1 / (rank + 1) ** skew for rank in range(users)))
+    balances, tails = array("q", bytes(8 * users)), array("q", bytes(8 * users))
+    tx_rows, entry_rows, snapshot_rows = [], [], []
+    counts = {"transactions": 0, "ledger_entries": 0, "balance_snapshots": 0}
+
+    def post(i, cents, transaction_id, created_at):
+        nonlocal entry_id, snapshot_id
+        entry_rows.append({"id": entry_id, "wallet_id": first_wallet + i,
+                           "transaction_id": transaction_id, "amount": Money(cents),
+                           "created_at": created_at})
+        balances[i] += cents
+        tails[i] += 1
+        if tails[i] >= interval:
+            snapshot_rows.append({"id": snapshot_id, "wallet_id": first_wallet + i,
+                                  "last_entry_id": entry_id, "balance": Money(balances[i]),
+                                  "created_at": created_at})
+            snapshot_id += 1
+            tails[i] = 0
+        entry_id += 1
+
+    def add(created_at, i, type_, cents, fee_cents=0, status="completed", **extra):
+        nonlocal tx_id
+        tx_rows.append({"id": tx_id, "user_id": first_user + i, "type": type_,
+                        "amount": Money(cents), "fee": Money(fee_cents), "status": status,
+                        "dispatch_attempts": 0, "created_at": created_at,
+                        "description": None, "recipient_name": None, "recipient_phone": None,
+                        "checkout_request_id": None, "merchant_request_id": None,
+                        "mpesa_receipt": None, "dispatch_status": None, **extra})
+        tx_id += 1
+        return tx_id - 1
+
+    def flush():
+        counts["transactions"] += len(tx_rows)
+        counts["ledger_entries"] += len(entry_rows)
+        counts["balance_snapshots"] += len(snapshot_rows)
+        AnalyticsService.record_inserts(tx_rows)
+        _insert(connection, Transaction.__table__, tx_rows)
+        _insert(connection, LedgerEntry.__table__, entry_rows)
+        _insert(connection, BalanceSnapshot.__table__, snapshot_rows)
+
+    hours = days * 24
+    weekend = [(start + datetime.timedelta(hours=h)).weekday() >= 5 for h in range(hours)]
+    weights = [HOUR_WEIGHTS[h % 24] * (WEEKEND_WEIGHT if weekend[h] else 1) for h in range(hours)]
+    cumulative = list(accumulate(weights))
+    mu = math.log(AMOUNT_MEDIAN_CENTS)
+    low, high = AMOUNT_RANGE_CENTS
+    made = 0
+    for hour in range(hours if users else 0):
+        due = round(transactions * cumulative[hour] / cumulative[-1]) - made
+        made += due
+        hour_start = start + datetime.timedelta(hours=hour)
+        for offset in sorted(rng.random() * 3600 for _ in range(due)):
+            created_at = hour_start + datetime.timedelta(seconds=offset)
+            i = hot[min(bisect(popularity, rng.random() * popularity[-1]), users - 1)]
+            cents = min(max(int(rng.lognormvariate(mu, AMOUNT_SIGMA)), low), high)
+            count = ben_count[i]
+            if count and rng.random() >= deposit_share:
+                fee = (Money(cents) * FEE_RATE).cents
+                if balances[i] >= cents + fee:
+                    b = ben_first[i] + rng.randrange(count) - first_beneficiary
+                    target = ben_target[b]
+                    if target >= 0:
+                        name, phone = " ".join(user_name(target)), user_phone(target)
+                    else:
+                        b += first_beneficiary
+                        name, phone = " ".join(_name(b, seed + 1)), f"+2541{b:08d}"
+                    description = SEND_DESCRIPTIONS[rng.randrange(len(SEND_DESCRIPTIONS))]
+                    sent = add(created_at, i, "send", cents, fee, description=description,
+                               recipient_name=name, recipient_phone=phone)
+                    post(i, -(cents + fee), sent, created_at)
+                    if target >= 0:
+                        sender = " ".join(user_name(i))
+                        received = add(created_at, target, "receive", cents,
+                                       description=f"Received from {sender}",
+                                       recipient_name=sender, recipient_phone=user_phone(i))
+                        post(target, cents, received, created_at)
+                    continue
+            # a deposit (also what an unaffordable send turns into)
+            status, description = rng.choices(DEPOSIT_STATUSES, DEPOSIT_STATUS_WEIGHTS)[0]
+            deposit = add(created_at, i, "deposit", cents, status=status, description=description,
+                          checkout_request_id=f"ws_CO_SYN{tx_id:012d}",
+                          merchant_request_id=f"SYN-{tx_id}",
+                          mpesa_receipt=f"SYN{tx_id:010d}" if status == "completed" else None,
+                          dispatch_status="sent", dispatch_attempts=1)
+            if status == "completed":
+                post(i, cents, deposit, created_at)
+        if len(tx_rows) >= batch_size:
+            flush()
+            echo(f"{counts['transactions']:,} transactions ({hour_start:%Y-%m-%d})")
+    flush()
+
+    # ─── wallet balances = ledger totals ───
+    wallet_table = Wallet.__table__
+    stmt = (update(wallet_table)
+            .where(wallet_table.c.id == bindparam("wallet_id"))
+            .values(balance=bindparam("new_balance", type_=MoneyType()),
+                    entries_since_snapshot=bindparam("tail")))
+    changed = [i for i in range(users) if balances[i] or tails[i]]
+    for k in range(0, len(changed), batch_size):
+        connection.execute(stmt, [
+            {"wallet_id": first_wallet + i, "new_balance": Money(balances[i]), "tail": tails[i]}
+            for i in changed[k:k + batch_size]
+        ])
+
+    if connection.dialect.name == "postgresql":
+        # explicit ids do not advance the serial sequences
+        for model in (User, Wallet, Beneficiary, Transaction, LedgerEntry, BalanceSnapshot):
+            name = model.__tablename__
+            connection.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('\"{name}\"', 'id'), "
+                f"(SELECT MAX(id) FROM \"{name}\"))")
+    db.session.commit()
+    return {"users": users, "beneficiaries": bid - first_beneficiary, **counts,
+            "seconds": round(time.perf_counter() - started, 1)}
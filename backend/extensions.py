@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_socketio import SocketIO
+from flask_migrate import Migrate
 
 db = SQLAlchemy()
 ma = Marshmallow()
+migrate = Migrate()
 socketio = SocketIO()
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""add user_version
+
+Per-user change counters used as ETags for user-scoped GETs. No backfill:
+a missing row reads as version 0 and the first change inserts version 1.
+
+Revision ID: 0940eed34fd6
+Revises: 78568a71aa91
+Create Date: 2026-10-18 07:17:10.701869
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0940eed34fd6'
+down_revision = '78568a71aa91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_version',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_version')
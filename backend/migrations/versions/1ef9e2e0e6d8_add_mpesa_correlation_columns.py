@@ -0,0 +1,39 @@
+"""add mpesa correlation columns
+
+Real columns for the STK push CheckoutRequestID / MerchantRequestID and the
+M-Pesa receipt, each behind a unique index.
+
+Revision ID: 1ef9e2e0e6d8
+Revises: 8d031ad2720e
+Create Date: 2026-10-18 06:47:34.909363
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1ef9e2e0e6d8'
+down_revision = '8d031ad2720e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transaction') as batch_op:
+        batch_op.add_column(sa.Column('checkout_request_id', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('merchant_request_id', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('mpesa_receipt', sa.String(length=32), nullable=True))
+        batch_op.create_index('ix_transaction_checkout_request_id', ['checkout_request_id'], unique=True)
+        batch_op.create_index('ix_transaction_merchant_request_id', ['merchant_request_id'], unique=True)
+        batch_op.create_index('ix_transaction_mpesa_receipt', ['mpesa_receipt'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('transaction') as batch_op:
+        batch_op.drop_index('ix_transaction_mpesa_receipt')
+        batch_op.drop_index('ix_transaction_merchant_request_id')
+        batch_op.drop_index('ix_transaction_checkout_request_id')
+        batch_op.drop_column('mpesa_receipt')
+        batch_op.drop_column('merchant_request_id')
+        batch_op.drop_column('checkout_request_id')
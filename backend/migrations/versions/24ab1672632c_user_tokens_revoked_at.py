@@ -0,0 +1,31 @@
+"""user tokens_revoked_at
+
+Adds user.tokens_revoked_at: bearer tokens issued before this stamp are
+rejected (set when an admin changes a user's role or deactivates them).
+
+Revision ID: 24ab1672632c
+Revises: 45694022a98f
+Create Date: 2026-10-18 07:08:17.795531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '24ab1672632c'
+down_revision = '45694022a98f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.add_column(sa.Column('tokens_revoked_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_user_tokens_revoked_at', ['tokens_revoked_at'])
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_index('ix_user_tokens_revoked_at')
+        batch_op.drop_column('tokens_revoked_at')
@@ -0,0 +1,82 @@
+"""baseline schema
+
+The tables as the app created them (db.create_all()) before migrations
+existed. Databases from that time have these tables but no alembic_version;
+init_db stamps them at this revision before upgrading.
+
+Revision ID: 3c9a1f0b5e21
+Revises: 
+Create Date: 2026-10-18 06:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1f0b5e21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('first_name', sa.String(length=80), nullable=False),
+        sa.Column('last_name', sa.String(length=80), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('phone'),
+    )
+    op.create_table(
+        'wallet',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('balance', sa.Float(), nullable=False),
+        sa.Column('currency', sa.String(length=10), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+    op.create_table(
+        'beneficiary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=True),
+        sa.Column('account_number', sa.String(length=50), nullable=True),
+        sa.Column('relationship', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'transaction',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('fee', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('recipient_name', sa.String(length=100), nullable=True),
+        sa.Column('recipient_phone', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('transaction')
+    op.drop_table('beneficiary')
+    op.drop_table('wallet')
+    op.drop_table('user')
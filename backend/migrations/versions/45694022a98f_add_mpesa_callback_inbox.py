@@ -0,0 +1,46 @@
+"""add mpesa callback inbox
+
+Creates mpesa_callback_inbox, where the callback endpoint appends raw
+Safaricom payloads before ACKing; a drainer settles them in batches.
+
+Revision ID: 45694022a98f
+Revises: f241e71f6edf
+Create Date: 2026-10-18 07:03:37.588360
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '45694022a98f'
+down_revision = 'f241e71f6edf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'mpesa_callback_inbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('checkout_request_id', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('result', sa.String(length=20), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.String(length=255), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_mpesa_callback_inbox_due', 'mpesa_callback_inbox',
+                    ['status', 'next_attempt_at', 'id'])
+    op.create_index('ix_mpesa_callback_inbox_checkout_request_id', 'mpesa_callback_inbox',
+                    ['checkout_request_id'])
+
+
+def downgrade():
+    op.drop_index('ix_mpesa_callback_inbox_checkout_request_id', table_name='mpesa_callback_inbox')
+    op.drop_index('ix_mpesa_callback_inbox_due', table_name='mpesa_callback_inbox')
+    op.drop_table('mpesa_callback_inbox')
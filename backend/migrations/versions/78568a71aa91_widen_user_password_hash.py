@@ -0,0 +1,35 @@
+"""widen user password_hash
+
+user.password_hash grows from 128 to 255 characters so scrypt hashes fit
+(PASSWORD_HASH_METHOD=scrypt:...).
+
+Revision ID: 78568a71aa91
+Revises: 24ab1672632c
+Create Date: 2026-10-18 07:10:10.047805
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '78568a71aa91'
+down_revision = '24ab1672632c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=128),
+                              type_=sa.String(length=255),
+                              existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=255),
+                              type_=sa.String(length=128),
+                              existing_nullable=False)
@@ -0,0 +1,71 @@
+"""add ledger and balance snapshots
+
+Creates the append-only ledger_entry and balance_snapshot tables and seeds
+one opening entry per wallet with a non-zero balance, so existing balances
+reconcile against the ledger from day one.
+
+Revision ID: 8a014d7b3eeb
+Revises: 95da794beb16
+Create Date: 2026-10-18 06:52:41.695147
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a014d7b3eeb'
+down_revision = '95da794beb16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ledger_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('wallet_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=True),
+        sa.Column('amount', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transaction.id']),
+        sa.ForeignKeyConstraint(['wallet_id'], ['wallet.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_ledger_entry_wallet_id_id', 'ledger_entry', ['wallet_id', 'id'])
+    op.create_index('ix_ledger_entry_transaction_id', 'ledger_entry', ['transaction_id'])
+
+    op.create_table(
+        'balance_snapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('wallet_id', sa.Integer(), nullable=False),
+        sa.Column('last_entry_id', sa.Integer(), nullable=False),
+        sa.Column('balance', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['last_entry_id'], ['ledger_entry.id']),
+        sa.ForeignKeyConstraint(['wallet_id'], ['wallet.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_balance_snapshot_wallet_entry', 'balance_snapshot',
+                    ['wallet_id', 'last_entry_id'])
+
+    with op.batch_alter_table('wallet') as batch_op:
+        batch_op.add_column(sa.Column('entries_since_snapshot', sa.Integer(),
+                                      server_default='0', nullable=False))
+
+    # Opening entries for existing balances
+    op.execute(
+        "INSERT INTO ledger_entry (wallet_id, amount, created_at) "
+        "SELECT id, balance, CURRENT_TIMESTAMP FROM wallet WHERE balance <> 0"
+    )
+    op.execute("UPDATE wallet SET entries_since_snapshot = 1 WHERE balance <> 0")
+
+
+def downgrade():
+    with op.batch_alter_table('wallet') as batch_op:
+        batch_op.drop_column('entries_since_snapshot')
+    op.drop_index('ix_balance_snapshot_wallet_entry', table_name='balance_snapshot')
+    op.drop_table('balance_snapshot')
+    op.drop_index('ix_ledger_entry_transaction_id', table_name='ledger_entry')
+    op.drop_index('ix_ledger_entry_wallet_id_id', table_name='ledger_entry')
+    op.drop_table('ledger_entry')
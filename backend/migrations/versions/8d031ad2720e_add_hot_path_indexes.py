@@ -0,0 +1,39 @@
+"""add hot path indexes
+
+Databases created before migrations existed only have the PK and unique
+indexes. Wallet.user_id and User.phone are already covered by their unique
+constraints; this adds the composite indexes the transaction and beneficiary
+queries need.
+
+Revision ID: 8d031ad2720e
+Revises: 3c9a1f0b5e21
+Create Date: 2026-10-18 06:44:20.103921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d031ad2720e'
+down_revision = '3c9a1f0b5e21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_transaction_user_created', 'transaction',
+                    ['user_id', 'created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_transaction_created', 'transaction',
+                    ['created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_transaction_type_status_created', 'transaction',
+                    ['type', 'status', 'created_at'], if_not_exists=True)
+    op.create_index('ix_beneficiary_user_id', 'beneficiary',
+                    ['user_id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_beneficiary_user_id', table_name='beneficiary')
+    op.drop_index('ix_transaction_type_status_created', table_name='transaction')
+    op.drop_index('ix_transaction_created', table_name='transaction')
+    op.drop_index('ix_transaction_user_created', table_name='transaction')
@@ -0,0 +1,60 @@
+"""store money as integer cents
+
+Converts wallet.balance, transaction.amount and transaction.fee from FLOAT
+(major units) to BIGINT minor units, rounding each existing value to the
+nearest cent.
+
+Revision ID: 95da794beb16
+Revises: 1ef9e2e0e6d8
+Create Date: 2026-10-18 06:50:26.272263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '95da794beb16'
+down_revision = '1ef9e2e0e6d8'
+branch_labels = None
+depends_on = None
+
+
+MONEY_COLUMNS = [
+    ('wallet', 'balance'),
+    ('transaction', 'amount'),
+    ('transaction', 'fee'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in MONEY_COLUMNS:
+            op.alter_column(table, column, existing_type=sa.Float(), type_=sa.BigInteger(),
+                            postgresql_using=f'round({column} * 100)::bigint')
+        return
+
+    # SQLite: rescale in place, then rebuild the tables with the new type
+    for table, column in MONEY_COLUMNS:
+        op.execute(f'UPDATE "{table}" SET {column} = CAST(ROUND({column} * 100) AS INTEGER)')
+    for table in ('wallet', 'transaction'):
+        with op.batch_alter_table(table) as batch_op:
+            for t, column in MONEY_COLUMNS:
+                if t == table:
+                    batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.BigInteger())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in MONEY_COLUMNS:
+            op.alter_column(table, column, existing_type=sa.BigInteger(), type_=sa.Float(),
+                            postgresql_using=f'{column} / 100.0')
+        return
+
+    for table in ('wallet', 'transaction'):
+        with op.batch_alter_table(table) as batch_op:
+            for t, column in MONEY_COLUMNS:
+                if t == table:
+                    batch_op.alter_column(column, existing_type=sa.BigInteger(), type_=sa.Float())
+    for table, column in MONEY_COLUMNS:
+        op.execute(f'UPDATE "{table}" SET {column} = {column} / 100.0')
@@ -0,0 +1,70 @@
+"""add transaction rollups
+
+Creates transaction_rollup (hourly/daily count, volume and fees per type and
+status) and backfills it from the existing transactions, so the admin
+analytics endpoints are correct straight after the upgrade. Large tables can
+instead be backfilled later with `flask analytics rebuild`.
+
+Revision ID: e0222fd191fc
+Revises: 8a014d7b3eeb
+Create Date: 2026-10-18 06:57:45.242311
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0222fd191fc'
+down_revision = '8a014d7b3eeb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    rollup = op.create_table(
+        'transaction_rollup',
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('tx_count', sa.BigInteger(), nullable=False),
+        sa.Column('volume', sa.BigInteger(), nullable=False),
+        sa.Column('fees', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'bucket_start', 'type', 'status'),
+    )
+
+    # Backfill: aggregate per bucket in Python so bucket_start is stored in
+    # the same DateTime format the ORM writes (matters on SQLite)
+    tx = sa.table(
+        'transaction',
+        sa.column('created_at', sa.DateTime()),
+        sa.column('type', sa.String()),
+        sa.column('status', sa.String()),
+        sa.column('amount', sa.BigInteger()),
+        sa.column('fee', sa.BigInteger()),
+    )
+    totals = defaultdict(lambda: [0, 0, 0])
+    result = op.get_bind().execute(
+        sa.select(tx.c.created_at, tx.c.type, tx.c.status, tx.c.amount, tx.c.fee)
+        .where(tx.c.created_at.isnot(None))
+    )
+    for created_at, type_, status, amount, fee in result:
+        hour = created_at.replace(minute=0, second=0, microsecond=0)
+        for key in (('hour', hour, type_, status), ('day', hour.replace(hour=0), type_, status)):
+            t = totals[key]
+            t[0] += 1
+            t[1] += amount or 0
+            t[2] += fee or 0
+    if totals:
+        op.bulk_insert(rollup, [
+            {'granularity': g, 'bucket_start': b, 'type': t, 'status': s,
+             'tx_count': n, 'volume': volume, 'fees': fees}
+            for (g, b, t, s), (n, volume, fees) in totals.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('transaction_rollup')
@@ -0,0 +1,37 @@
+"""add stk dispatch state
+
+Adds dispatch_status / dispatch_attempts / dispatch_error to transaction so
+the background STK dispatcher can record queued, sent and failed pushes.
+Existing rows keep a NULL dispatch_status (they predate the dispatcher).
+
+Revision ID: f241e71f6edf
+Revises: e0222fd191fc
+Create Date: 2026-10-18 07:01:29.450758
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f241e71f6edf'
+down_revision = 'e0222fd191fc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transaction') as batch_op:
+        batch_op.add_column(sa.Column('dispatch_status', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('dispatch_attempts', sa.Integer(),
+                                      server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('dispatch_error', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_transaction_dispatch_status', ['dispatch_status'])
+
+
+def downgrade():
+    with op.batch_alter_table('transaction') as batch_op:
+        batch_op.drop_index('ix_transaction_dispatch_status')
+        batch_op.drop_column('dispatch_error')
+        batch_op.drop_column('dispatch_attempts')
+        batch_op.drop_column('dispatch_status')
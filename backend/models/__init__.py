@@ -1,4 +1,9 @@
+from .money import Money, MoneyType
 from .user import User
 from .wallet import Wallet
 from .beneficiary import Beneficiary
 from .transaction import Transaction
+from .ledger import LedgerEntry, BalanceSnapshot
+from .analytics import TransactionRollup
+from .callback_inbox import CallbackInbox
+from .user_version import UserVersion
@@ -0,0 +1,22 @@
+from extensions import db
+from models.money import MoneyType
+
+class TransactionRollup(db.Model):
+    """
+    Pre-aggregated transaction counts and sums per time bucket, type and
+    status. Maintained incrementally on every flush (see
+    services/analytics_service.py) so admin analytics never scan the
+    transaction table.
+    """
+    __tablename__ = 'transaction_rollup'
+
+    granularity = db.Column(db.String(10), primary_key=True)  # 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    type = db.Column(db.String(20), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    tx_count = db.Column(db.BigInteger, default=0, nullable=False)
+    volume = db.Column(MoneyType, default=0, nullable=False)  # cents
+    fees = db.Column(MoneyType, default=0, nullable=False)    # cents
+
+    def __repr__(self):
+        return f'<TransactionRollup {self.granularity} {self.bucket_start} {self.type}/{self.status} n={self.tx_count}>'
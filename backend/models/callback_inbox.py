@@ -0,0 +1,28 @@
+from extensions import db
+import datetime
+
+class CallbackInbox(db.Model):
+    """
+    Raw M-Pesa callbacks, appended by the callback endpoint before it ACKs
+    and drained in batches by services/callback_inbox.py. Rows are kept
+    after processing so they can be inspected and replayed.
+    """
+    __tablename__ = 'mpesa_callback_inbox'
+    __table_args__ = (
+        # the drainer's "what's due" scan
+        db.Index('ix_mpesa_callback_inbox_due', 'status', 'next_attempt_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    payload = db.Column(db.Text, nullable=False)  # body exactly as received
+    checkout_request_id = db.Column(db.String(64), index=True, nullable=True)
+    status = db.Column(db.String(10), default='pending', nullable=False)  # 'pending', 'done', 'failed'
+    result = db.Column(db.String(20), nullable=True)  # 'credited', 'declined', 'duplicate', 'unmatched', ...
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.String(255), nullable=True)
+    received_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<CallbackInbox {self.id} {self.status} {self.checkout_request_id}>'
@@ -0,0 +1,56 @@
+from extensions import db
+from models.money import MoneyType
+from sqlalchemy import event
+import datetime
+
+class LedgerEntry(db.Model):
+    """
+    One signed balance movement on a wallet. Append-only: rows are never
+    updated or deleted, so the ledger is the auditable source of truth and
+    Wallet.balance is a materialized cache of its per-wallet sum.
+    """
+    __tablename__ = 'ledger_entry'
+    __table_args__ = (
+        db.Index('ix_ledger_entry_wallet_id_id', 'wallet_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallet.id'), nullable=False)
+    # NULL for opening balances / manual adjustments
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'), nullable=True, index=True)
+    amount = db.Column(MoneyType, nullable=False)  # cents, signed
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    transaction = db.relationship('Transaction')
+
+    def __repr__(self):
+        return f'<LedgerEntry {self.id} wallet:{self.wallet_id} {self.amount}>'
+
+
+class BalanceSnapshot(db.Model):
+    """
+    Checkpointed wallet balance: the sum of all of the wallet's ledger
+    entries with id <= last_entry_id. Reading a balance costs the latest
+    snapshot plus the (bounded) tail of entries after it.
+    """
+    __tablename__ = 'balance_snapshot'
+    __table_args__ = (
+        db.Index('ix_balance_snapshot_wallet_entry', 'wallet_id', 'last_entry_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallet.id'), nullable=False)
+    last_entry_id = db.Column(db.Integer, db.ForeignKey('ledger_entry.id'), nullable=False)
+    balance = db.Column(MoneyType, nullable=False)  # cents
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BalanceSnapshot wallet:{self.wallet_id} @{self.last_entry_id} {self.balance}>'
+
+
+def _reject_mutation(mapper, connection, target):
+    raise ValueError(f"{type(target).__name__} rows are append-only")
+
+for _model in (LedgerEntry, BalanceSnapshot):
+    event.listen(_model, 'before_update', _reject_mutation)
+    event.listen(_model, 'before_delete', _reject_mutation)
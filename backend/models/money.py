@@ -0,0 +1,126 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+from sqlalchemy.types import TypeDecorator, BigInteger
+
+CENT = Decimal("0.01")
+MAX_CENTS = 2 ** 63 - 1  # BIGINT
+
+
+@total_ordering
+class Money:
+    """
+    An exact KES amount held as integer minor units (cents).
+
+    Arithmetic and comparisons accept other Money values or plain numbers
+    (int, float, str, Decimal), which are converted with Money.of().
+    """
+    __slots__ = ("cents",)
+
+    def __init__(self, cents=0):
+        self.cents = int(cents)
+
+    @classmethod
+    def of(cls, value):
+        """
+        Convert a major-unit amount (e.g. 12.5) to Money, rounding half up to
+        the cent. ValueError if it is not a finite number or does not fit in
+        a BIGINT of cents.
+        """
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, bool) or value is None:
+            raise ValueError(f"Invalid amount {value!r}")
+        try:
+            # str() first so floats convert by their shortest repr (0.1 -> "0.1")
+            amount = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount {value!r}")
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount {value!r}")
+        try:
+            cents = int(amount.quantize(CENT, ROUND_HALF_UP).scaleb(2))
+        except InvalidOperation:  # more digits than the context allows
+            raise ValueError(f"Amount out of range {value!r}")
+        if abs(cents) > MAX_CENTS:
+            raise ValueError(f"Amount out of range {value!r}")
+        return cls(cents)
+
+    @property
+    def amount(self) -> Decimal:
+        """The value in major units, always with two decimal places."""
+        return Decimal(self.cents).scaleb(-2)
+
+    # ─── arithmetic ───
+    def __add__(self, other):
+        return Money(self.cents + Money.of(other).cents)
+
+    __radd__ = __add__  # lets sum() start from 0
+
+    def __sub__(self, other):
+        return Money(self.cents - Money.of(other).cents)
+
+    def __rsub__(self, other):
+        return Money(Money.of(other).cents - self.cents)
+
+    def __mul__(self, factor):
+        """Scale by a rate, e.g. Money.of(500) * Decimal("0.01"); rounds half up."""
+        if isinstance(factor, Money):
+            raise TypeError("Cannot multiply Money by Money")
+        product = Decimal(self.cents) * Decimal(str(factor))
+        return Money(product.quantize(Decimal(1), ROUND_HALF_UP))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    # ─── comparison ───
+    def __eq__(self, other):
+        try:
+            return self.cents == Money.of(other).cents
+        except (ValueError, TypeError):
+            return NotImplemented
+
+    def __lt__(self, other):
+        return self.cents < Money.of(other).cents
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    def __bool__(self):
+        return self.cents != 0
+
+    # ─── conversion ───
+    def __float__(self):
+        return self.cents / 100
+
+    def __str__(self):
+        return str(self.amount)
+
+    def __format__(self, spec):
+        return format(self.amount, spec)
+
+    def __repr__(self):
+        return f"Money('{self.amount}')"
+
+
+class MoneyType(TypeDecorator):
+    """
+    Stores Money as a BIGINT count of cents. Bound values may be Money or
+    plain numbers in major units; loaded values are always Money.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return Money.of(value).cents
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Money(value)
@@ -1,16 +1,35 @@
 from extensions import db
+from models.money import MoneyType
 import datetime
 
 class Transaction(db.Model):
+    __table_args__ = (
+        # per-user history, newest first (keyset on created_at, id)
+        db.Index('ix_transaction_user_created', 'user_id', 'created_at', 'id'),
+        # admin listing / date-range exports
+        db.Index('ix_transaction_created', 'created_at', 'id'),
+        # "pending deposits" style scans
+        db.Index('ix_transaction_type_status_created', 'type', 'status', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     type = db.Column(db.String(20), nullable=False) # 'send', 'receive', 'deposit'
-    amount = db.Column(db.Float, nullable=False)
-    fee = db.Column(db.Float, default=0.0, nullable=False)
+    amount = db.Column(MoneyType, nullable=False)  # cents
+    fee = db.Column(MoneyType, default=0, nullable=False)  # cents
     status = db.Column(db.String(20), default='completed', nullable=False) # 'completed', 'pending', 'failed'
     description = db.Column(db.String(255), nullable=True)
     recipient_name = db.Column(db.String(100), nullable=True)
     recipient_phone = db.Column(db.String(20), nullable=True)
+    # M-Pesa correlation IDs; unique so callbacks match in one index lookup
+    # and a replayed callback cannot be applied twice
+    checkout_request_id = db.Column(db.String(64), unique=True, index=True, nullable=True)
+    merchant_request_id = db.Column(db.String(64), unique=True, index=True, nullable=True)
+    mpesa_receipt = db.Column(db.String(32), unique=True, index=True, nullable=True)
+    # STK push dispatch state (deposits only): 'queued' -> 'sent' | 'failed'
+    dispatch_status = db.Column(db.String(10), index=True, nullable=True)
+    dispatch_attempts = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    dispatch_error = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
     def __repr__(self):
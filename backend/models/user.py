@@ -4,12 +4,14 @@ import datetime
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)  # scrypt hashes exceed 128
     first_name = db.Column(db.String(80), nullable=False)
     last_name = db.Column(db.String(80), nullable=False)
     phone = db.Column(db.String(20), unique=True, nullable=False)
     role = db.Column(db.String(20), default='user', nullable=False) # 'user' or 'admin'
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    # tokens issued before this are rejected (set on deactivation / role change)
+    tokens_revoked_at = db.Column(db.DateTime, index=True, nullable=True)
 
     wallets = db.relationship('Wallet', backref='user', lazy=True, uselist=False)
     beneficiaries = db.relationship('Beneficiary', backref='user', lazy=True)
@@ -0,0 +1,16 @@
+from extensions import db
+
+class UserVersion(db.Model):
+    """
+    Per-user change counter, bumped in the same DB transaction as any change
+    to the user's profile, wallet balance, beneficiaries or transactions
+    (see services/user_version.py). Routes use it as the ETag of
+    user-scoped GETs. A missing row means version 0.
+    """
+    __tablename__ = 'user_version'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.BigInteger, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<UserVersion user={self.user_id} v{self.version}>'
@@ -1,10 +1,13 @@
 from extensions import db
+from models.money import MoneyType
 
 class Wallet(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, nullable=False)
-    balance = db.Column(db.Float, default=0.0, nullable=False)
+    balance = db.Column(MoneyType, default=0, nullable=False)  # cents
     currency = db.Column(db.String(10), default='KES', nullable=False)
+    # ledger entries posted since the last BalanceSnapshot
+    entries_since_snapshot = db.Column(db.Integer, default=0, server_default='0', nullable=False)
 
     def __repr__(self):
         return f'<Wallet UserID:{self.user_id} Balance:{self.balance}>'
@@ -7,6 +7,7 @@ from .wallet_routes import wallet_bp
 from .beneficiary_routes import beneficiary_bp
 from .transaction_routes import transaction_bp
 from .admin_routes import admin_bp
+from . import socket_events  # registers the Socket.IO handlers
 
 def register_blueprints(app):
     app.register_blueprint(auth_bp)
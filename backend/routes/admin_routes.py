@@ -1,22 +1,36 @@
 # backend/routes/admin_routes.py
-from flask import Blueprint, jsonify, g, current_app, request
+from flask import Blueprint, jsonify, g, current_app, request, Response, stream_with_context
 from functools import wraps
 
 from extensions import db
 from models.user import User
-from schemas.user_schema import user_schema, users_schema
+from schemas.user_schema import user_schema
 from controllers import admin_controller
 from routes.auth_routes import login_required
+from services.token_service import TokenService
+from utils.pagination import parse_limit
+from utils.filters import parse_transaction_filters
+from utils.json_response import json_response
+from services.export_service import EXPORT_FORMATS, gzip_chunks
 
 admin_bp = Blueprint('admin_bp', __name__, url_prefix='/api/admin')
 
+def _parse_admin_filters():
+    filters = parse_transaction_filters(request.args)
+    if request.args.get("userId"):
+        try:
+            filters["user_id"] = int(request.args["userId"])
+        except ValueError:
+            raise ValueError(f"Invalid userId '{request.args['userId']}'")
+    return filters
+
 # Admin‑only decorator
 def admin_required(f):
     @login_required
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        user = User.query.get(g.user_id)
-        if not user or user.role != 'admin':
+        # role comes from the signed token; no DB lookup
+        if g.role != 'admin':
             return jsonify({"error": "Admin access required"}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -26,7 +40,7 @@ def admin_required(f):
 def get_all_users():
     try:
         users = admin_controller.get_all_users()
-        return jsonify({"users": users}), 200
+        return json_response({"users": users})
     except Exception as e:
         current_app.logger.error(f"[get_all_users] {e}")
         return jsonify({"error": str(e)}), 500
@@ -57,7 +71,10 @@ def update_user_status(user_id):
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        user.role = new_role
+        if user.role != new_role:
+            user.role = new_role
+            # existing tokens carry the old role (or let a deactivated user in)
+            TokenService.revoke(user)
         db.session.commit()
 
         return jsonify(user_schema.dump(user)), 200
@@ -69,12 +86,136 @@ def update_user_status(user_id):
 @admin_required
 def get_all_transactions():
     try:
-        transactions = admin_controller.get_all_transactions()
-        return jsonify({"transactions": transactions}), 200
+        filters = _parse_admin_filters()
+        limit = parse_limit(
+            request.args.get("limit"),
+            current_app.config["TRANSACTIONS_PAGE_SIZE"],
+            current_app.config["TRANSACTIONS_MAX_PAGE_SIZE"],
+        )
+        transactions, next_cursor = admin_controller.get_all_transactions(
+            filters, limit, request.args.get("cursor")
+        )
+        return json_response({"transactions": transactions, "nextCursor": next_cursor})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"[get_all_transactions] {e}")
         return jsonify({"error": str(e)}), 500
 
+@admin_bp.route('/transactions/export', methods=['GET'])
+@admin_required
+def export_transactions():
+    """
+    Stream every matching transaction as ?format=csv (default), ndjson or
+    columnar (MTXC, see services/export_service.py). Accepts the same
+    filters as /transactions; gzipped when the client accepts it.
+    """
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Invalid format '{fmt}'"}), 400
+    try:
+        filters = _parse_admin_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    exporter, mimetype, ext = EXPORT_FORMATS[fmt]
+    body = exporter(filters)
+    headers = {
+        "Content-Disposition": f"attachment; filename=transactions.{ext}",
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.accept_encodings:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
+
+@admin_bp.route('/analytics/summary', methods=['GET'])
+@admin_required
+def analytics_summary():
+    try:
+        filters = parse_transaction_filters(request.args)
+        return jsonify(admin_controller.get_analytics_summary(filters)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"[analytics_summary] {e}")
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/analytics/trends', methods=['GET'])
+@admin_required
+def analytics_trends():
+    try:
+        filters = parse_transaction_filters(request.args)
+        trends = admin_controller.get_analytics_trends(
+            request.args.get("granularity", "day"), filters
+        )
+        return jsonify(trends), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"[analytics_trends] {e}")
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/analytics/wallets', methods=['GET'])
+@admin_required
+def analytics_wallets():
+    try:
+        return jsonify(admin_controller.get_wallet_stats()), 200
+    except Exception as e:
+        current_app.logger.error(f"[analytics_wallets] {e}")
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/cache', methods=['GET'])
+@admin_required
+def cache_stats():
+    return jsonify(admin_controller.get_cache_stats()), 200
+
+@admin_bp.route('/mpesa/inbox', methods=['GET'])
+@admin_required
+def callback_inbox():
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            current_app.config["TRANSACTIONS_PAGE_SIZE"],
+            current_app.config["TRANSACTIONS_MAX_PAGE_SIZE"],
+        )
+        data, next_cursor = admin_controller.get_callback_inbox(
+            request.args.get("status"), limit, request.args.get("cursor")
+        )
+        return jsonify({**data, "nextCursor": next_cursor}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"[callback_inbox] {e}")
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/mpesa/inbox/<int:entry_id>', methods=['GET'])
+@admin_required
+def callback_inbox_entry(entry_id):
+    try:
+        return jsonify(admin_controller.get_callback_inbox_entry(entry_id)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+@admin_bp.route('/mpesa/inbox/replay', methods=['POST'])
+@admin_required
+def replay_callbacks():
+    """
+    Body: {"ids": [..]} to replay specific entries, or {"failed": true}.
+    """
+    data = request.get_json() or {}
+    try:
+        ids = data.get("ids")
+        if ids is not None and not all(isinstance(i, int) for i in ids):
+            raise ValueError("ids must be a list of integers")
+        count = admin_controller.replay_callbacks(ids, failed=bool(data.get("failed")))
+        return jsonify({"replayed": count}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"[replay_callbacks] {e}")
+        return jsonify({"error": str(e)}), 500
+
 @admin_bp.route('/transactions/<int:transaction_id>/reverse', methods=['POST'])
 @admin_required
 def reverse_transaction(transaction_id):
@@ -2,10 +2,20 @@
 from flask import Blueprint, request, jsonify, g, current_app
 from controllers import auth_controller
 from functools import wraps
+from services.token_service import TokenService, InvalidToken
+from services.password_hasher import HasherBusy
+from utils.etag import user_etag
 
 auth_bp = Blueprint('auth_bp', __name__, url_prefix='/api/auth')
 
-# Simple authentication decorator (for demo purposes)
+def resolve_token(token):
+    """
+    Map a bearer token to (user_id, role); raises ValueError if it is
+    invalid, expired or revoked. No DB access (see TokenService).
+    Shared by login_required and the Socket.IO connect handler.
+    """
+    return TokenService.verify(token)
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -18,8 +28,9 @@ def login_required(f):
             if token_type.lower() != 'bearer':
                 return jsonify({"error": "Invalid token type"}), 401
             
-            user_id = int(token)  # Assuming token is user ID for simplicity
-            g.user_id = user_id
+            g.user_id, g.role = resolve_token(token)
+        except InvalidToken as e:
+            return jsonify({"error": str(e)}), 401
         except (ValueError, IndexError):
             return jsonify({"error": "Invalid token format"}), 401
         
@@ -31,7 +42,10 @@ def register():
     data = request.get_json()
     try:
         user = auth_controller.register_user(data)
-        return jsonify({"user": user, "token": user['id']}), 201
+        token = TokenService.issue(user['id'], user['role'])
+        return jsonify({"user": user, "token": token}), 201
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
@@ -45,7 +59,10 @@ def login():
         # Block deactivated accounts
         if user.get('role') == 'deactivated':
             return jsonify({"error": "Your account has been deactivated"}), 403
-        return jsonify({"user": user, "token": user['id']}), 200
+        token = TokenService.issue(user['id'], user['role'])
+        return jsonify({"user": user, "token": token}), 200
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503
     except ValueError as e:
         return jsonify({"error": str(e)}), 401
 
@@ -56,6 +73,7 @@ def logout():
 
 @auth_bp.route('/profile', methods=['GET'])
 @login_required
+@user_etag
 def get_profile():
     try:
         user = auth_controller.get_current_user_profile(g.user_id)
@@ -88,5 +106,7 @@ def change_password():
     try:
         result = auth_controller.change_user_password(g.user_id, old_password, new_password)
         return jsonify(result), 200
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
@@ -1,15 +1,18 @@
 from flask import Blueprint, request, jsonify, g
 from controllers import beneficiary_controller
 from routes.auth_routes import login_required
+from utils.etag import user_etag
+from utils.json_response import json_response
 
 beneficiary_bp = Blueprint('beneficiary_bp', __name__, url_prefix='/api/beneficiaries')
 
 @beneficiary_bp.route('/', methods=['GET'])
 @login_required
+@user_etag
 def get_all_beneficiaries():
     try:
         bens = beneficiary_controller.get_beneficiaries(g.user_id)
-        return jsonify({"beneficiaries": bens}), 200
+        return json_response({"beneficiaries": bens})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,35 @@
+# backend/routes/socket_events.py
+from flask import request
+from flask_socketio import join_room
+
+from extensions import socketio
+from routes.auth_routes import resolve_token
+from services.realtime import user_room
+
+
+def _token(auth):
+    """Token from the Socket.IO auth payload, ?token= or an Authorization header."""
+    if isinstance(auth, dict) and auth.get("token"):
+        return str(auth["token"])
+    if request.args.get("token"):
+        return request.args["token"]
+    header = request.headers.get("Authorization", "")
+    if header.lower().startswith("bearer "):
+        return header.split(" ", 1)[1]
+    return None
+
+
+@socketio.on("connect")
+def on_connect(auth=None):
+    """
+    Authenticate the socket and put it in the user's private room. No DB
+    access: an idle connection costs nothing after this.
+    """
+    token = _token(auth)
+    if not token:
+        raise ConnectionRefusedError("Authorization token missing")
+    try:
+        user_id, _ = resolve_token(token)
+    except ValueError:
+        raise ConnectionRefusedError("Invalid token")
+    join_room(user_room(user_id))
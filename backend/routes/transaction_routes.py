@@ -1,17 +1,40 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, current_app
 from controllers import transaction_controller
+from utils.pagination import parse_limit
+from utils.filters import parse_transaction_filters
 from routes.auth_routes import login_required # Re-use login_required
+from utils.etag import user_etag
+from utils.json_response import json_response
 
 transaction_bp = Blueprint('transaction_bp', __name__, url_prefix='/api/transactions')
 
 @transaction_bp.route('/', methods=['GET'])
 @login_required
+@user_etag
 def get_user_transactions():
     try:
-        transactions = transaction_controller.get_transactions(g.user_id)
-        return jsonify({"transactions": transactions}), 200
+        filters = parse_transaction_filters(request.args)
+        limit = parse_limit(
+            request.args.get("limit"),
+            current_app.config["TRANSACTIONS_PAGE_SIZE"],
+            current_app.config["TRANSACTIONS_MAX_PAGE_SIZE"],
+        )
+        transactions, next_cursor = transaction_controller.get_transactions(
+            g.user_id, filters, limit, request.args.get("cursor")
+        )
+        return json_response({"transactions": transactions, "nextCursor": next_cursor})
     except ValueError as e:
-        return jsonify({"error": str(e)}), 00
+        return jsonify({"error": str(e)}), 400
+
+@transaction_bp.route('/summary', methods=['GET'])
+@login_required
+@user_etag
+def get_transaction_summary():
+    try:
+        filters = parse_transaction_filters(request.args)
+        return jsonify(transaction_controller.get_summary(g.user_id, filters)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @transaction_bp.route('/send', methods=['POST'])
 @login_required
@@ -22,10 +45,31 @@ def send_money():
     description = data.get('description')
 
     if not beneficiary_id or not amount or not isinstance(amount, (int, float)) or amount <= 0:
-        return jsonify({"error": "Beneficiary ID and valid amount are required"}), 00
+        return jsonify({"error": "Beneficiary ID and valid amount are required"}), 400
 
     try:
         transaction = transaction_controller.send_money(g.user_id, beneficiary_id, amount, description)
         return jsonify({"transaction": transaction}), 200
     except ValueError as e:
-        return jsonify({"error": str(e)}), 00
+        return jsonify({"error": str(e)}), 400
+
+@transaction_bp.route('/send/batch', methods=['POST'])
+@login_required
+def send_batch():
+    data = request.get_json() or {}
+    items = data.get('items')
+    mode = data.get('mode', 'all_or_nothing')
+    max_items = current_app.config["TRANSFER_BATCH_MAX_ITEMS"]
+
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        return jsonify({"error": "items must be a non-empty list of {beneficiaryId, amount}"}), 400
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} items per batch"}), 400
+
+    try:
+        result = transaction_controller.send_batch(g.user_id, items, mode, data.get('description'))
+        return jsonify(result), 200
+    except transaction_controller.BatchRejected as e:
+        return jsonify({"error": str(e), "items": e.items}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
@@ -1,5 +1,6 @@
-from flask import Blueprint, request, jsonify, g, make_response
+from flask import Blueprint, request, jsonify, g, Response, stream_with_context, current_app
 from routes.auth_routes import login_required
+from utils.etag import user_etag
 from controllers.wallet_controller import (
     get_wallet_balance,
     add_funds_to_wallet,
@@ -7,14 +8,16 @@ from controllers.wallet_controller import (
     handle_mpesa_callback,
     get_transaction_status,
 )
-from models.transaction import Transaction
-import csv, io
+from services.export_service import statement_csv, gzip_chunks
+from services.stk_dispatcher import DispatchUnavailable
+from utils.filters import parse_transaction_filters
 
 wallet_bp = Blueprint("wallet_bp", __name__, url_prefix="/api/wallet")
 
 # ─────────────── Wallet Balance ───────────────
 @wallet_bp.get("/balance")
 @login_required
+@user_etag
 def balance():
     try:
         data = get_wallet_balance(g.user_id)
@@ -31,7 +34,7 @@ def add_funds_manual():
     if not isinstance(amount, (int, float)) or amount <= 0:
         return jsonify({"error": "Invalid amount"}), 400
     try:
-        data = add_funds_to_wallet(g.user_id, float(amount))
+        data = add_funds_to_wallet(g.user_id, amount)
         return jsonify({"message": "Funds added", "wallet": data}), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
@@ -51,7 +54,11 @@ def add_funds_mpesa():
 
     try:
         resp = initiate_mpesa_deposit(g.user_id, phone, int(amount))
-        return jsonify({"message": "STK Push initiated", **resp}), 200
+        return jsonify({"message": "STK Push initiated", **resp}), 202
+    except DispatchUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -59,14 +66,14 @@ def add_funds_mpesa():
 @wallet_bp.post("/mpesa/callback")
 def mpesa_callback():
     """
-    Safaricom posts here. Always ACK.
+    Safaricom posts here. ACK once the raw body is safely in the inbox;
+    if that fails, let Safaricom retry.
     """
-    payload = request.get_json() or {}
     try:
-        handle_mpesa_callback(payload)
-    except Exception:
-        # avoid retry storms
-        pass
+        handle_mpesa_callback(request.get_data(as_text=True))
+    except Exception as e:
+        current_app.logger.error(f"[mpesa_callback] could not queue callback: {e}")
+        return jsonify({"ResultCode": 1, "ResultDesc": "Temporarily unavailable"}), 503
     return jsonify({"ResultCode": 0, "ResultDesc": "Accepted"}), 200
 
 # ─────────────── Poll TX Status ───────────────
@@ -74,7 +81,7 @@ def mpesa_callback():
 @login_required
 def tx_status(checkout_id):
     try:
-        data = get_transaction_status(checkout_id)
+        data = get_transaction_status(checkout_id, g.user_id)
         return jsonify(data), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
@@ -83,25 +90,23 @@ def tx_status(checkout_id):
 @wallet_bp.get("/statement")
 @login_required
 def download_statement():
-    txs = (Transaction.query
-           .filter_by(user_id=g.user_id)
-           .order_by(Transaction.created_at)
-           .all())
+    """
+    Streams the statement (optionally ?from=&to=, same filters as
+    /api/transactions/) with constant memory; gzipped when the client
+    accepts it.
+    """
+    try:
+        filters = parse_transaction_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    si = io.StringIO()
-    cw = csv.writer(si)
-    cw.writerow(["ID", "Type", "Amount", "Fee", "Status", "Date"])
-    for t in txs:
-        cw.writerow([
-            t.id,
-            t.type,
-            t.amount,
-            t.fee,
-            t.status,
-            t.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        ])
+    body = statement_csv(g.user_id, filters)
+    headers = {
+        "Content-Disposition": "attachment; filename=statement.csv",
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.accept_encodings:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
 
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=statement.csv"
-    output.headers["Content-Type"] = "text/csv"
-    return output
\ No newline at end of file
+    return Response(stream_with_context(body), mimetype="text/csv", headers=headers)
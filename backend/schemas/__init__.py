@@ -2,3 +2,4 @@ from .user_schema import user_schema, users_schema
 from .wallet_schema import wallet_schema
 from .beneficiary_schema import beneficiary_schema, beneficiaries_schema
 from .transaction_schema import transaction_schema, transactions_schema
+from .callback_inbox_schema import callback_inbox_schema, callback_inbox_list_schema
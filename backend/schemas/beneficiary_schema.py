@@ -1,5 +1,6 @@
 from extensions import ma
 from models.beneficiary import Beneficiary
+from schemas.projection import Projection
 
 class BeneficiarySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -8,3 +9,4 @@ class BeneficiarySchema(ma.SQLAlchemyAutoSchema):
 
 beneficiary_schema = BeneficiarySchema()
 beneficiaries_schema = BeneficiarySchema(many=True)
+beneficiaries_projection = Projection(BeneficiarySchema, Beneficiary)
@@ -0,0 +1,11 @@
+from extensions import ma
+from models.callback_inbox import CallbackInbox
+
+class CallbackInboxSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = CallbackInbox
+        load_instance = True
+
+callback_inbox_schema = CallbackInboxSchema()
+# listings leave out the raw body
+callback_inbox_list_schema = CallbackInboxSchema(many=True, exclude=("payload",))
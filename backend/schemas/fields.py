@@ -0,0 +1,22 @@
+from marshmallow import fields
+from models.money import Money
+
+
+class MoneyField(fields.Field):
+    """
+    Serialize Money as a JSON number in major units (e.g. 25000.0), matching
+    the payloads clients already consume; deserialize numbers into Money.
+    """
+
+    default_error_messages = {"invalid": "Not a valid amount."}
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        return float(value)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            return Money.of(value)
+        except ValueError as e:
+            raise self.make_error("invalid") from e
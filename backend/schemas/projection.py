@@ -0,0 +1,84 @@
+from marshmallow import fields
+from sqlalchemy import BigInteger, type_coerce
+from extensions import db
+from schemas.fields import MoneyField
+
+# How each dump field type is rendered, as an expression over the raw column
+# value {v}, mirroring what the marshmallow field would produce
+_CONVERTERS = (
+    (MoneyField, "{v} / 100"),        # cents (selected raw), same float as float(Money)
+    (fields.DateTime, "{v}.isoformat()"),
+    (fields.Float, "float({v})"),
+    (fields.Boolean, "bool({v})"),
+    (fields.Integer, None),           # DB value already is the int / str
+    (fields.String, None),
+)
+
+
+class Projection:
+    """
+    Column-projected twin of a marshmallow schema, for list endpoints.
+
+    Selects only the columns the schema dumps (no ORM instances are built)
+    and turns rows into dicts with a function generated once from the
+    schema's fields, producing exactly what schema.dump(many=True) would.
+    Method fields are not introspectable, so each must be supplied in
+    `computed` as name -> (columns, fn(*values)); `outerjoins` are added
+    for columns of other tables. A field type without a known rendering
+    raises at import, so a schema change cannot silently change payloads.
+
+        rows = projection.apply(query).all()    # or db.session.execute(projection.select())
+        data = projection.dump_rows(rows)
+    """
+
+    def __init__(self, schema, model, computed=None, outerjoins=()):
+        computed = computed or {}
+        self.outerjoins = outerjoins
+        self.columns = []
+        env = {}
+        items = []
+        for name, field in schema().dump_fields.items():
+            if name in computed:
+                cols, fn = computed[name]
+                args = ", ".join(f"r[{self._add(col.label(f'_{name}_{k}'))}]"
+                                 for k, col in enumerate(cols))
+                env[f"_f_{name}"] = fn
+                items.append(f"{name!r}: _f_{name}({args})")
+                continue
+            if isinstance(field, fields.Method):
+                raise TypeError(f"{schema.__name__}.{name}: Method fields need a `computed` entry")
+            column = getattr(model, field.attribute or name)
+            expr = self._render(schema, name, field)
+            if isinstance(field, MoneyField):
+                column = type_coerce(column, BigInteger)
+            i = self._add(column.label(name))
+            if expr is None:
+                items.append(f"{name!r}: r[{i}]")
+            else:
+                items.append(f"{name!r}: (None if r[{i}] is None else {expr.format(v=f'r[{i}]')})")
+        source = "def dump_rows(rows):\n    return [{" + ", ".join(items) + "} for r in rows]\n"
+        exec(compile(source, f"<projection {schema.__name__}>", "exec"), env)
+        self.dump_rows = env["dump_rows"]
+
+    def _add(self, column) -> int:
+        self.columns.append(column)
+        return len(self.columns) - 1
+
+    @staticmethod
+    def _render(schema, name, field):
+        for field_type, expr in _CONVERTERS:
+            if isinstance(field, field_type):
+                return expr
+        raise TypeError(f"{schema.__name__}.{name}: no projection for {type(field).__name__}")
+
+    def apply(self, query):
+        """Restrict an ORM query (filters, pagination) to the projected columns."""
+        for target, onclause in self.outerjoins:
+            query = query.outerjoin(target, onclause)
+        return query.with_entities(*self.columns)
+
+    def select(self):
+        stmt = db.select(*self.columns)
+        for target, onclause in self.outerjoins:
+            stmt = stmt.outerjoin(target, onclause)
+        return stmt
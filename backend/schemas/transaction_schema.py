@@ -1,10 +1,16 @@
 from extensions import ma
 from models.transaction import Transaction
 from models.user import User
-from marshmallow import fields
+from marshmallow import fields, pre_dump
+from schemas.fields import MoneyField
+from schemas.projection import Projection
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
 
 class TransactionSchema(ma.SQLAlchemyAutoSchema):
     user_id = fields.Integer()  # <-- add this line
+    amount = MoneyField()
+    fee = MoneyField()
     user_name = fields.Method("get_user_name")
     user_email = fields.Method("get_user_email")
     created_at_formatted = fields.Method("get_created_at_formatted")
@@ -12,13 +18,29 @@ class TransactionSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Transaction
         load_instance = True
+        exclude = ("dispatch_attempts", "dispatch_error")
+
+    @pre_dump(pass_many=True)
+    def prefetch_users(self, data, many, **kwargs):
+        """
+        Load the owning users of every transaction in one IN-list query,
+        so dumping N transactions costs a constant number of queries.
+        """
+        items = data if many else [data]
+        unloaded = [t for t in items if "user" in inspect(t).unloaded]
+        user_ids = {t.user_id for t in unloaded}
+        if user_ids:
+            users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))}
+            for t in unloaded:
+                set_committed_value(t, "user", users.get(t.user_id))
+        return data
 
     def get_user_name(self, obj):
-        user = User.query.get(obj.user_id)
+        user = obj.user
         return f"{user.first_name} {user.last_name}" if user else "Unknown"
 
     def get_user_email(self, obj):
-        user = User.query.get(obj.user_id)
+        user = obj.user
         return user.email if user else ""
 
     def get_created_at_formatted(self, obj):
@@ -26,3 +48,17 @@ class TransactionSchema(ma.SQLAlchemyAutoSchema):
 
 transaction_schema = TransactionSchema()
 transactions_schema = TransactionSchema(many=True)
+
+# Same payload as transactions_schema, straight from a column-projected query
+transactions_projection = Projection(
+    TransactionSchema, Transaction,
+    computed={
+        "user_name": ((User.id, User.first_name, User.last_name),
+                      lambda uid, first, last: f"{first} {last}" if uid is not None else "Unknown"),
+        "user_email": ((User.id, User.email),
+                       lambda uid, email: email if uid is not None else ""),
+        "created_at_formatted": ((Transaction.created_at,),
+                                 lambda ts: ts.strftime("%Y-%m-%d %H:%M:%S") if ts else ""),
+    },
+    outerjoins=[(User, User.id == Transaction.user_id)],
+)
@@ -1,11 +1,13 @@
 from extensions import ma
 from models.user import User
+from schemas.projection import Projection
 
 class UserSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = User
         load_instance = True
-        exclude = ("password_hash",) # Exclude password hash from serialization
+        exclude = ("password_hash", "tokens_revoked_at") # Exclude password hash from serialization
 
 user_schema = UserSchema()
 users_schema = UserSchema(many=True)
+users_projection = Projection(UserSchema, User)
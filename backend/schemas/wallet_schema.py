@@ -1,9 +1,13 @@
 from extensions import ma
 from models.wallet import Wallet
+from schemas.fields import MoneyField
 
 class WalletSchema(ma.SQLAlchemyAutoSchema):
+    balance = MoneyField()
+
     class Meta:
         model = Wallet
         load_instance = True
+        exclude = ("entries_since_snapshot",)
 
 wallet_schema = WalletSchema()
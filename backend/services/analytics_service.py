@@ -0,0 +1,266 @@
+# backend/services/analytics_service.py
+import datetime
+from collections import defaultdict
+
+from sqlalchemy import event, func, inspect, select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models.analytics import TransactionRollup
+from models.money import Money
+from models.transaction import Transaction
+from models.wallet import Wallet
+
+_PENDING = "analytics_deltas"  # session.info: rollup deltas not yet written
+
+GRANULARITIES = ("hour", "day")
+_TRACKED = ("type", "status", "amount", "fee", "created_at")
+_UPSERT_BATCH = 500
+
+
+def bucket_start(ts: datetime.datetime, granularity: str) -> datetime.datetime:
+    """Truncate a timestamp to the start of its hour or day."""
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == "day" else ts
+
+
+class AnalyticsService:
+    """
+    Hourly and daily transaction rollups (count, volume, fees by type and
+    status).
+
+    Every flush that inserts, changes or deletes Transactions turns into
+    per-bucket deltas, which collect on the session until before_commit
+    upserts them into transaction_rollup in one statement, so the rollups
+    commit or roll back together with the rows they summarise. Writing them
+    last keeps the (hot, shared) rollup rows locked only for the commit and
+    always after the wallet rows, whatever order the request touched them
+    in. Bulk Core INSERTs bypass the ORM and must call record_inserts()
+    themselves; rebuild() repairs anything else.
+    """
+
+    @classmethod
+    def init_app(cls, app):
+        for name, fn in (("after_flush", cls._after_flush),
+                         ("before_commit", cls._before_commit),
+                         ("after_soft_rollback", cls._after_rollback)):
+            if not event.contains(db.session, name, fn):
+                event.listen(db.session, name, fn)
+
+    # ─── Incremental maintenance ─────────────────────────────────────────────
+
+    @staticmethod
+    def _add(deltas, values, sign):
+        if values["created_at"] is None:
+            return
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(values["created_at"], granularity),
+                   values["type"], values["status"])
+            d = deltas[key]
+            d[0] += sign
+            d[1] += sign * Money.of(values["amount"] or 0).cents
+            d[2] += sign * Money.of(values["fee"] or 0).cents
+
+    @staticmethod
+    def _values(tx, previous=False):
+        """Current (or pre-flush) values of the tracked columns."""
+        state = inspect(tx)
+        values = {}
+        for key in _TRACKED:
+            deleted = state.attrs[key].history.deleted if previous else ()
+            values[key] = deleted[0] if deleted else state.dict.get(key)
+        return values
+
+    @staticmethod
+    def _pending(session):
+        deltas = session.info.get(_PENDING)
+        if deltas is None:
+            deltas = session.info[_PENDING] = defaultdict(lambda: [0, 0, 0])
+        return deltas
+
+    @classmethod
+    def _after_flush(cls, session, flush_context):
+        deltas = cls._pending(session)
+        for obj in session.new:
+            if isinstance(obj, Transaction):
+                cls._add(deltas, cls._values(obj), +1)
+        for obj in session.dirty:
+            if not isinstance(obj, Transaction):
+                continue
+            state = inspect(obj)
+            if any(state.attrs[k].history.has_changes() for k in _TRACKED):
+                cls._add(deltas, cls._values(obj, previous=True), -1)
+                cls._add(deltas, cls._values(obj), +1)
+        for obj in session.deleted:
+            if isinstance(obj, Transaction):
+                cls._add(deltas, cls._values(obj, previous=True), -1)
+
+    @classmethod
+    def _before_commit(cls, session):
+        if session.in_nested_transaction():
+            return
+        session.flush()
+        deltas = session.info.pop(_PENDING, None)
+        if deltas:
+            cls._upsert(session.connection(), deltas)
+
+    @staticmethod
+    def _after_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(_PENDING, None)
+
+    @classmethod
+    def record_inserts(cls, rows):
+        """
+        Account for Transactions inserted with a bulk INSERT (which the flush
+        hook cannot see). `rows` are the inserted column-value dicts.
+        """
+        deltas = cls._pending(db.session)
+        for values in rows:
+            cls._add(deltas, values, +1)
+
+    @staticmethod
+    def _upsert(connection, deltas):
+        rows = [
+            {"granularity": g, "bucket_start": b, "type": t, "status": s,
+             "tx_count": n, "volume": Money(volume), "fees": Money(fees)}
+            for (g, b, t, s), (n, volume, fees) in sorted(deltas.items())
+            if n or volume or fees
+        ]
+        if not rows:
+            return
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            raise RuntimeError(f"Rollup upsert not supported on {dialect}")
+        table = TransactionRollup.__table__
+        # multi-row VALUES in batches (keeps under SQLite's bind-param limit)
+        for i in range(0, len(rows), _UPSERT_BATCH):
+            stmt = insert(table).values(rows[i:i + _UPSERT_BATCH])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.granularity, table.c.bucket_start,
+                                table.c.type, table.c.status],
+                set_={
+                    "tx_count": table.c.tx_count + stmt.excluded.tx_count,
+                    "volume": table.c.volume + stmt.excluded.volume,
+                    "fees": table.c.fees + stmt.excluded.fees,
+                },
+            )
+            connection.execute(stmt)
+
+    # ─── Catch-up job ────────────────────────────────────────────────────────
+
+    @classmethod
+    def rebuild(cls, since=None, until=None, chunk_size=5000) -> int:
+        """
+        Recompute the rollups for whole days in [since, until) from the
+        transaction table (everything when no bounds are given). Streams the
+        rows and aggregates in memory per bucket, then replaces the affected
+        rollup rows. Returns the number of rows written.
+        """
+        since = bucket_start(since, "day") if since else None
+        until = bucket_start(until, "day") + datetime.timedelta(days=1) if until else None
+
+        stmt = select(Transaction.created_at, Transaction.type, Transaction.status,
+                      Transaction.amount, Transaction.fee)
+        purge = delete(TransactionRollup)
+        if since:
+            stmt = stmt.where(Transaction.created_at >= since)
+            purge = purge.where(TransactionRollup.bucket_start >= since)
+        if until:
+            stmt = stmt.where(Transaction.created_at < until)
+            purge = purge.where(TransactionRollup.bucket_start < until)
+
+        deltas = defaultdict(lambda: [0, 0, 0])
+        rows = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+        for created_at, type_, status, amount, fee in rows:
+            cls._add(deltas, {"created_at": created_at, "type": type_, "status": status,
+                              "amount": amount, "fee": fee}, +1)
+
+        db.session.execute(purge)
+        db.session.flush()
+        db.session.info.pop(_PENDING, None)  # already counted by the scan above
+        cls._upsert(db.session.connection(), deltas)
+        db.session.commit()
+        return len(deltas)
+
+    # ─── Queries ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _filtered(query, filters):
+        """Apply the type/status/date keys of parse_transaction_filters()."""
+        if "type" in filters:
+            query = query.where(TransactionRollup.type == filters["type"])
+        if "status" in filters:
+            query = query.where(TransactionRollup.status == filters["status"])
+        if "date_from" in filters:
+            query = query.where(TransactionRollup.bucket_start >= filters["date_from"])
+        if "date_to" in filters:
+            query = query.where(TransactionRollup.bucket_start < filters["date_to"])
+        return query
+
+    @classmethod
+    def trends(cls, granularity: str, filters: dict):
+        """One point per bucket: count, volume and fees (summed over type/status)."""
+        stmt = cls._filtered(
+            select(TransactionRollup.bucket_start,
+                   func.sum(TransactionRollup.tx_count),
+                   func.coalesce(func.sum(TransactionRollup.volume), 0),
+                   func.coalesce(func.sum(TransactionRollup.fees), 0))
+            .where(TransactionRollup.granularity == granularity),
+            filters,
+        ).group_by(TransactionRollup.bucket_start).order_by(TransactionRollup.bucket_start)
+        return [
+            {"bucket": bucket.isoformat(), "count": int(count),
+             "volume": float(Money.of(volume)), "fees": float(Money.of(fees))}
+            for bucket, count, volume, fees in db.session.execute(stmt)
+        ]
+
+    @classmethod
+    def summary(cls, filters: dict):
+        """Totals by type and status, plus fee revenue from completed sends."""
+        stmt = cls._filtered(
+            select(TransactionRollup.type, TransactionRollup.status,
+                   func.sum(TransactionRollup.tx_count),
+                   func.coalesce(func.sum(TransactionRollup.volume), 0),
+                   func.coalesce(func.sum(TransactionRollup.fees), 0))
+            .where(TransactionRollup.granularity == "day"),
+            filters,
+        ).group_by(TransactionRollup.type, TransactionRollup.status)
+
+        breakdown, fee_revenue = [], Money(0)
+        total_count, total_volume = 0, Money(0)
+        for type_, status, count, volume, fees in db.session.execute(stmt):
+            volume, fees = Money.of(volume), Money.of(fees)
+            breakdown.append({"type": type_, "status": status, "count": int(count),
+                              "volume": float(volume), "fees": float(fees)})
+            total_count += int(count)
+            total_volume += volume
+            if status == "completed":
+                fee_revenue += fees
+        return {
+            "count": total_count,
+            "volume": float(total_volume),
+            "feeRevenue": float(fee_revenue),
+            "breakdown": breakdown,
+        }
+
+    @staticmethod
+    def wallet_stats():
+        """Global wallet figures (one aggregate over the wallet table)."""
+        count, total, largest, funded = db.session.execute(
+            select(func.count(Wallet.id),
+                   func.coalesce(func.sum(Wallet.balance), 0),
+                   func.coalesce(func.max(Wallet.balance), 0),
+                   func.count(Wallet.id).filter(Wallet.balance > 0))
+        ).one()
+        total = Money.of(total)
+        return {
+            "wallets": count,
+            "fundedWallets": funded,
+            "totalBalance": float(total),
+            "averageBalance": float(Money(total.cents // count)) if count else 0.0,
+            "largestBalance": float(Money.of(largest)),
+        }
@@ -0,0 +1,287 @@
+# backend/services/callback_inbox.py
+import datetime
+import json
+import logging
+import threading
+
+from extensions import db
+from models.callback_inbox import CallbackInbox
+from models.money import Money
+from models.transaction import Transaction
+from models.wallet import Wallet
+from services.transfer_service import TransferService
+from services.realtime import RealtimeService
+
+log = logging.getLogger(__name__)
+
+
+class InvalidCallback(ValueError):
+    pass
+
+
+def _parse(payload: str) -> dict:
+    """Pull what the drainer needs out of a raw stkCallback body."""
+    try:
+        stk = json.loads(payload)["Body"]["stkCallback"]
+        parsed = {
+            "result_code": int(stk["ResultCode"]),
+            "result_desc": stk.get("ResultDesc"),
+            "checkout_id": stk["CheckoutRequestID"],
+        }
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCallback("invalid payload")
+    items = (stk.get("CallbackMetadata") or {}).get("Item") or []
+    meta = {i.get("Name"): i.get("Value") for i in items if isinstance(i, dict)}
+    parsed["amount"] = meta.get("Amount")
+    parsed["receipt"] = meta.get("MpesaReceiptNumber")
+    return parsed
+
+
+def _checkout_id(payload: str):
+    try:
+        return str(json.loads(payload)["Body"]["stkCallback"]["CheckoutRequestID"])[:64]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class CallbackInboxService:
+    """
+    Durable inbox for M-Pesa callbacks.
+
+    The endpoint only appends the raw body and commits, then ACKs. drain()
+    takes due rows in id order (SKIP LOCKED on Postgres, so several workers
+    can share the inbox) and settles a whole batch in one DB transaction:
+    one IN-list lookup each for transactions, receipts and wallets, one
+    TransferService.apply() for all credits. Receipts are deduped against
+    the table and within the batch. If the batch fails it is retried row by
+    row so one bad callback cannot block the rest; failing rows back off
+    exponentially and end up 'failed' (replayable) after
+    CALLBACK_MAX_ATTEMPTS. Callbacks that arrive before their transaction
+    has a checkout id ('unmatched') are retried the same way.
+    """
+    _app = None
+    _wakeup = None
+    _thread = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._app = app
+
+    # ─── producer side ───
+
+    @classmethod
+    def append(cls, payload: str) -> int:
+        entry = CallbackInbox(payload=payload, checkout_request_id=_checkout_id(payload))
+        db.session.add(entry)
+        db.session.commit()
+        cls.notify()
+        return entry.id
+
+    @classmethod
+    def notify(cls):
+        """Wake the in-process drainer (started on first use)."""
+        if not cls._app or not cls._app.config["CALLBACK_INBOX_WORKER"]:
+            return
+        if cls._thread is None:
+            with cls._lock:
+                if cls._thread is None:
+                    cls._wakeup = threading.Event()
+                    cls._thread = threading.Thread(
+                        target=cls._run, name="mpesa-inbox", daemon=True)
+                    cls._thread.start()
+        cls._wakeup.set()
+
+    @classmethod
+    def _run(cls):
+        interval = cls._app.config["CALLBACK_DRAIN_INTERVAL"]
+        while True:
+            cls._wakeup.wait(interval)
+            cls._wakeup.clear()
+            try:
+                with cls._app.app_context():
+                    while cls.drain():
+                        pass
+            except Exception:
+                log.exception("M-Pesa inbox drain failed")
+
+    # ─── consumer side ───
+
+    @classmethod
+    def drain(cls, batch_size: int = None) -> int:
+        """Settle up to one batch of due callbacks. Returns how many were taken."""
+        batch_size = batch_size or cls._app.config["CALLBACK_DRAIN_BATCH"]
+        now = datetime.datetime.utcnow()
+        entries = (CallbackInbox.query
+                   .filter(CallbackInbox.status == "pending",
+                           CallbackInbox.next_attempt_at <= now)
+                   .order_by(CallbackInbox.id)
+                   .limit(batch_size)
+                   .with_for_update(skip_locked=True)
+                   .all())
+        if not entries:
+            db.session.rollback()
+            return 0
+        ids = [e.id for e in entries]
+        try:
+            cls._settle(entries)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(ids) == 1:
+                cls._record_failure(ids[0], e)
+            else:
+                log.warning("Inbox batch of %s failed (%s); retrying one by one", len(ids), e)
+                for entry_id in ids:
+                    cls._settle_one(entry_id)
+        return len(ids)
+
+    @classmethod
+    def _settle_one(cls, entry_id: int):
+        entry = (CallbackInbox.query
+                 .filter_by(id=entry_id, status="pending")
+                 .with_for_update(skip_locked=True)
+                 .first())
+        if not entry:
+            db.session.rollback()
+            return
+        try:
+            cls._settle([entry])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            cls._record_failure(entry_id, e)
+
+    @classmethod
+    def _settle(cls, entries):
+        now = datetime.datetime.utcnow()
+        parsed = {}
+        for entry in entries:
+            try:
+                parsed[entry.id] = _parse(entry.payload)
+            except InvalidCallback as e:
+                cls._finish(entry, "failed", "invalid", now, error=str(e))
+
+        checkout_ids = {p["checkout_id"] for p in parsed.values()}
+        txs = {}
+        if checkout_ids:
+            txs = {t.checkout_request_id: t for t in
+                   Transaction.query
+                   .filter(Transaction.checkout_request_id.in_(checkout_ids))
+                   .order_by(Transaction.id)
+                   .with_for_update()}
+
+        receipts = {p["receipt"] for p in parsed.values() if p["receipt"]}
+        used_receipts = set()
+        if receipts:
+            used_receipts = {r for (r,) in db.session.query(Transaction.mpesa_receipt)
+                             .filter(Transaction.mpesa_receipt.in_(receipts))}
+
+        user_ids = {t.user_id for t in txs.values()}
+        wallets = {}
+        if user_ids:
+            wallets = {w.user_id: w.id for w in Wallet.query.filter(Wallet.user_id.in_(user_ids))}
+
+        movements = []
+        for entry in entries:
+            cb = parsed.get(entry.id)
+            if cb is None:
+                continue
+            tx = txs.get(cb["checkout_id"])
+            if tx is None:
+                cls._retry_later(entry, "unmatched", "No transaction with this CheckoutRequestID", now)
+            elif tx.status != "pending":
+                cls._finish(entry, "done", "duplicate", now)
+            elif cb["result_code"] != 0:
+                tx.status = "failed"
+                tx.description = cb["result_desc"]
+                cls._finish(entry, "done", "declined", now)
+                cls._notify(tx)
+            elif cb["receipt"] and cb["receipt"] in used_receipts:
+                cls._finish(entry, "done", "duplicate", now)
+            else:
+                if tx.user_id not in wallets:
+                    raise ValueError(f"Wallet not found for user {tx.user_id}")
+                amount = Money.of(cb["amount"] if cb["amount"] is not None else tx.amount)
+                tx.status = "completed"
+                tx.mpesa_receipt = cb["receipt"]
+                tx.description = f"Deposit via M-Pesa ({cb['receipt']})"
+                used_receipts.add(cb["receipt"])
+                movements.append((wallets[tx.user_id], amount, tx))
+                cls._finish(entry, "done", "credited", now)
+                cls._notify(tx, amount)
+
+        if movements:
+            TransferService.apply(movements)
+
+    @staticmethod
+    def _notify(tx, amount=None):
+        RealtimeService.notify(tx.user_id, "deposit_status", {
+            "transactionId": tx.id,
+            "checkoutRequestID": tx.checkout_request_id,
+            "status": tx.status,
+            "amount": float(amount if amount is not None else tx.amount),
+        })
+
+    @staticmethod
+    def _finish(entry, status, result, now, error=None):
+        entry.status = status
+        entry.result = result
+        entry.attempts += 1
+        entry.last_error = error
+        entry.processed_at = now
+
+    @classmethod
+    def _retry_later(cls, entry, result, error, now):
+        config = cls._app.config
+        entry.attempts += 1
+        entry.result = result
+        entry.last_error = error[:255]
+        if entry.attempts >= config["CALLBACK_MAX_ATTEMPTS"]:
+            entry.status = "failed"
+            entry.processed_at = now
+        else:
+            delay = config["CALLBACK_RETRY_BACKOFF"] * 2 ** (entry.attempts - 1)
+            entry.next_attempt_at = now + datetime.timedelta(seconds=delay)
+
+    @classmethod
+    def _record_failure(cls, entry_id, exc):
+        log.warning("M-Pesa callback %s failed: %s", entry_id, exc)
+        entry = db.session.get(CallbackInbox, entry_id)
+        if entry is None:
+            return
+        cls._retry_later(entry, "error", str(exc), datetime.datetime.utcnow())
+        db.session.commit()
+
+    # ─── inspection / replay ───
+
+    @classmethod
+    def replay(cls, entry_ids=None, failed=False) -> int:
+        """
+        Queue entries for another pass (by id, or every 'failed' one).
+        Safe for already-settled entries: they come back as 'duplicate'.
+        """
+        query = CallbackInbox.query
+        if entry_ids is not None:
+            query = query.filter(CallbackInbox.id.in_(entry_ids))
+        elif failed:
+            query = query.filter(CallbackInbox.status == "failed")
+        else:
+            return 0
+        count = query.update({
+            "status": "pending",
+            "attempts": 0,
+            "result": None,
+            "last_error": None,
+            "processed_at": None,
+            "next_attempt_at": datetime.datetime.utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+        cls.notify()
+        return count
+
+    @staticmethod
+    def stats() -> dict:
+        rows = (db.session.query(CallbackInbox.status, db.func.count(CallbackInbox.id))
+                .group_by(CallbackInbox.status))
+        return {status: count for status, count in rows}
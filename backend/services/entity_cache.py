@@ -0,0 +1,218 @@
+# backend/services/entity_cache.py
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from extensions import db
+from models.beneficiary import Beneficiary
+from models.user import User
+from models.wallet import Wallet
+from schemas.beneficiary_schema import beneficiaries_projection
+from schemas.user_schema import user_schema
+
+_REQUEST = "entity_cache"           # session.info: request tier
+_TOUCHED = "entity_cache_touched"   # session.info: keys written by this transaction
+_MISSING = object()
+
+# Cached entities. Only those in _SHARED may use the process tier, and only
+# when the caller asks for it (shared=True): another worker's write shows up
+# there up to ENTITY_CACHE_TTL late. Beneficiaries and phone -> user decide
+# where a transfer's money goes, so they are never shared.
+WALLET_ID = "wallet_id"              # user id -> wallet id (or None)
+USER = "user"                        # user id -> user_schema dump
+USER_ID_BY_PHONE = "user_id_by_phone"  # phone -> user id (or None)
+BENEFICIARY = "beneficiary"          # beneficiary id -> {id, user_id, name, phone}
+BENEFICIARIES = "beneficiaries"      # user id -> beneficiaries_schema-shaped list
+_SHARED = {WALLET_ID, USER}
+
+
+def _user_keys(user):
+    phones = {user.phone, *db.inspect(user).attrs.phone.history.deleted}
+    return [(USER, user.id)] + [(USER_ID_BY_PHONE, p) for p in phones if p]
+
+
+def _beneficiary_keys(beneficiary):
+    return [(BENEFICIARY, beneficiary.id), (BENEFICIARIES, beneficiary.user_id)]
+
+
+def _wallet_keys(wallet):
+    return [(WALLET_ID, wallet.user_id)]
+
+
+class EntityCache:
+    """
+    Read-through cache for small, read-mostly lookups, keyed by (entity, key).
+
+    Two tiers: a per-request dict on the session, emptied at every commit
+    and rollback (so one unit of work never loads the same thing twice),
+    and a process-wide dict with a short TTL (ENTITY_CACHE_TTL) shared by
+    all requests in the worker. The process tier is opt-in per call
+    (shared=True) for callers that can live with a value up to the TTL
+    old; everything else reads through the request tier only. Misses
+    (None) are never shared. Values are plain ids and dicts, never ORM
+    objects, and must not be mutated. Balances are never cached.
+
+    Invalidation follows the session: after_flush records the keys of every
+    User/Beneficiary/Wallet written (Wallets only when created or deleted;
+    balance updates do not matter here) and after_commit evicts them from
+    the process tier. Until it commits, a transaction that wrote a key
+    reads it from the DB. Other workers see the change when their copy
+    expires, so keep the TTL short.
+
+    Hit/miss counters per entity and tier are in stats().
+    """
+    _ttl = 0
+    _max_entries = 0
+    _store = {}           # (entity, key) -> (expires_at, value)
+    _epoch = 0            # bumped by every eviction; stale loads are not stored
+    _lock = threading.Lock()
+    _rules = {}
+    _counts = Counter()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._ttl = app.config["ENTITY_CACHE_TTL"]
+        cls._max_entries = app.config["ENTITY_CACHE_MAX_ENTRIES"]
+        cls._rules = {
+            User: (_user_keys, True),
+            Beneficiary: (_beneficiary_keys, True),
+            Wallet: (_wallet_keys, False),
+        }
+        cls.clear()
+        for name, fn in (("after_flush", cls._after_flush),
+                         ("after_commit", cls._after_commit),
+                         ("after_soft_rollback", cls._after_rollback)):
+            if not event.contains(db.session, name, fn):
+                event.listen(db.session, name, fn)
+
+    @classmethod
+    def get(cls, entity: str, key, loader, shared=False):
+        """
+        Return the cached value for (entity, key), calling loader() on a miss.
+        shared=True also uses the process tier (if the entity allows it).
+        """
+        info = db.session.info
+        local = info.setdefault(_REQUEST, {})
+        cache_key = (entity, key)
+        value = local.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            cls._counts[entity, "request", "hit"] += 1
+            return value
+
+        shared = (shared and entity in _SHARED and cls._ttl > 0
+                  and cache_key not in info.get(_TOUCHED, ()))
+        if shared:
+            entry = cls._store.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                cls._counts[entity, "process", "hit"] += 1
+                local[cache_key] = entry[1]
+                return entry[1]
+            epoch = cls._epoch
+
+        cls._counts[entity, "process" if shared else "request", "miss"] += 1
+        value = loader()
+        local[cache_key] = value
+        if shared and value is not None:
+            cls._put(cache_key, value, epoch)
+        return value
+
+    # ─── lookups ───
+
+    @classmethod
+    def wallet_id(cls, user_id: int, shared=False):
+        return cls.get(WALLET_ID, user_id, lambda: db.session.scalar(
+            db.select(Wallet.id).filter_by(user_id=user_id)), shared)
+
+    @classmethod
+    def user(cls, user_id: int, shared=False):
+        def load():
+            user = db.session.get(User, user_id)
+            return user_schema.dump(user) if user else None
+        return cls.get(USER, user_id, load, shared)
+
+    @classmethod
+    def user_id_by_phone(cls, phone: str):
+        return cls.get(USER_ID_BY_PHONE, phone, lambda: db.session.scalar(
+            db.select(User.id).filter_by(phone=phone)))
+
+    @classmethod
+    def beneficiary(cls, beneficiary_id: int):
+        def load():
+            b = db.session.get(Beneficiary, beneficiary_id)
+            if not b:
+                return None
+            return {"id": b.id, "user_id": b.user_id, "name": b.name, "phone": b.phone}
+        return cls.get(BENEFICIARY, beneficiary_id, load)
+
+    @classmethod
+    def beneficiaries(cls, user_id: int):
+        return cls.get(BENEFICIARIES, user_id, lambda: beneficiaries_projection.dump_rows(
+            db.session.execute(beneficiaries_projection.select().filter_by(user_id=user_id))))
+
+    @classmethod
+    def _put(cls, cache_key, value, epoch):
+        now = time.monotonic()
+        with cls._lock:
+            if epoch != cls._epoch:
+                return  # something was invalidated while we loaded
+            if len(cls._store) >= cls._max_entries:
+                cls._store = {k: v for k, v in cls._store.items() if v[0] > now}
+                if len(cls._store) >= cls._max_entries:
+                    cls._store = {}
+            cls._store[cache_key] = (now + cls._ttl, value)
+
+    @classmethod
+    def invalidate(cls, keys):
+        """Drop [(entity, key), ...] from the process tier."""
+        with cls._lock:
+            cls._epoch += 1
+            for cache_key in keys:
+                cls._store.pop(cache_key, None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._epoch += 1
+            cls._store = {}
+            cls._counts = Counter()
+
+    @classmethod
+    def stats(cls) -> dict:
+        out = {}
+        for (entity, tier, outcome), n in cls._counts.items():
+            out.setdefault(entity, {}).setdefault(tier, {"hit": 0, "miss": 0})[outcome] = n
+        return {"entries": len(cls._store), "ttl": cls._ttl, "entities": out}
+
+    # ─── session events ───
+
+    @classmethod
+    def _after_flush(cls, session, flush_context):
+        touched = set()
+        for obj in (*session.new, *session.deleted):
+            rule = cls._rules.get(type(obj))
+            if rule:
+                touched.update(rule[0](obj))
+        for obj in session.dirty:
+            rule = cls._rules.get(type(obj))
+            if rule and rule[1] and session.is_modified(obj):
+                touched.update(rule[0](obj))
+        if touched:
+            session.info.setdefault(_TOUCHED, set()).update(touched)
+            local = session.info.get(_REQUEST)
+            if local:
+                for cache_key in touched:
+                    local.pop(cache_key, None)
+
+    @classmethod
+    def _after_commit(cls, session):
+        session.info.pop(_REQUEST, None)
+        touched = session.info.pop(_TOUCHED, None)
+        if touched:
+            cls.invalidate(touched)
+
+    @staticmethod
+    def _after_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(_TOUCHED, None)
+            session.info.pop(_REQUEST, None)
@@ -0,0 +1,323 @@
+# backend/services/export_service.py
+import csv
+import datetime
+import io
+import json
+import struct
+import sys
+import zlib
+from array import array
+from sqlalchemy import select
+from extensions import db
+from models.transaction import Transaction
+from utils.filters import apply_transaction_filters
+
+# Flush the CSV buffer to the client once it holds this many characters
+CHUNK_CHARS = 64 * 1024
+
+
+def stream_rows(stmt, chunk_size=1000):
+    """
+    Execute `stmt` with a server-side cursor (yield_per) and yield rows one
+    at a time, so only `chunk_size` rows are ever held in memory.
+    """
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+def csv_chunks(header, rows, format_row):
+    """
+    Yield CSV text in ~64KB chunks. The header is yielded on its own first
+    so the client receives bytes before the query has even run.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+
+    for row in rows:
+        writer.writerow(format_row(row))
+        if buf.tell() >= CHUNK_CHARS:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Incrementally gzip a stream of str or bytes chunks."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ───────────── Per-user statement ─────────────
+STATEMENT_HEADER = ["ID", "Type", "Amount", "Fee", "Status", "Date"]
+
+
+def _format_statement_row(row):
+    return [
+        row.id,
+        row.type,
+        row.amount,
+        row.fee,
+        row.status,
+        row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else "",
+    ]
+
+
+def statement_csv(user_id, filters=None):
+    """Column-projected, oldest-first CSV statement for one user."""
+    stmt = apply_transaction_filters(
+        select(Transaction.id, Transaction.type, Transaction.amount,
+               Transaction.fee, Transaction.status, Transaction.created_at)
+        .where(Transaction.user_id == user_id),
+        filters or {},
+    ).order_by(Transaction.created_at, Transaction.id)
+
+    # generator: the query only runs once the header has been sent
+    def rows():
+        yield from stream_rows(stmt)
+
+    return csv_chunks(STATEMENT_HEADER, rows(), _format_statement_row)
+
+
+# ───────────── Admin bulk export ─────────────
+EXPORT_COLUMNS = [
+    Transaction.id, Transaction.user_id, Transaction.type, Transaction.status,
+    Transaction.amount, Transaction.fee, Transaction.description,
+    Transaction.recipient_name, Transaction.recipient_phone,
+    Transaction.mpesa_receipt, Transaction.created_at,
+]
+EXPORT_HEADER = [c.key for c in EXPORT_COLUMNS]
+EXPORT_CHUNK_ROWS = 10_000  # rows per columnar block
+
+
+def _export_stmt(filters):
+    stmt = apply_transaction_filters(select(*EXPORT_COLUMNS), filters)
+    return stmt.order_by(Transaction.created_at, Transaction.id)
+
+
+def _export_rows(filters):
+    # fetched 1000 at a time like the statement, so CSV/NDJSON memory stays
+    # flat whatever the table size (a columnar block still holds its rows)
+    yield from stream_rows(_export_stmt(filters))
+
+
+def _format_export_row(row):
+    return [
+        row.id, row.user_id, row.type, row.status, row.amount, row.fee,
+        row.description, row.recipient_name, row.recipient_phone,
+        row.mpesa_receipt, row.created_at.isoformat() if row.created_at else "",
+    ]
+
+
+def export_csv(filters):
+    return csv_chunks(EXPORT_HEADER, _export_rows(filters), _format_export_row)
+
+
+def export_ndjson(filters):
+    """One JSON object per line; amounts are JSON numbers like the API."""
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    parts = []
+    size = 0
+    for row in _export_rows(filters):
+        line = encode({
+            "id": row.id, "user_id": row.user_id, "type": row.type,
+            "status": row.status, "amount": float(row.amount), "fee": float(row.fee),
+            "description": row.description, "recipient_name": row.recipient_name,
+            "recipient_phone": row.recipient_phone, "mpesa_receipt": row.mpesa_receipt,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_CHARS:
+            yield "".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts)
+
+
+# ───────────── Columnar binary ("MTXC") ─────────────
+# Layout (all integers little-endian):
+#   b"MTXC" | u8 version | u32 schema_len | schema JSON (utf-8)
+#   then blocks:  u32 row_count | one encoded column per schema entry
+#   and a final  u32 0  terminator.
+# Column encodings:
+#   i64    row_count signed 64-bit values (ids, cents, epoch microseconds;
+#          nulls are written as i64 min)
+#   dict   u8 dict_size | dict_size × (u8 len | utf-8 bytes) | row_count × u8 code
+#          (at most DICT_MAX_SIZE words of up to 255 bytes; a block whose
+#          values do not fit writes u8 DICT_AS_STR and then the str encoding.
+#          Version 1 streams have no such marker)
+#   str    row_count × u8 validity | (row_count + 1) × u32 offsets | utf-8 data
+COLUMNAR_MAGIC = b"MTXC"
+COLUMNAR_VERSION = 2
+DICT_MAX_SIZE = 254
+DICT_AS_STR = 255
+COLUMNAR_SCHEMA = [
+    {"name": "id", "encoding": "i64"},
+    {"name": "user_id", "encoding": "i64"},
+    {"name": "created_at", "encoding": "i64", "unit": "epoch_us"},
+    {"name": "amount", "encoding": "i64", "unit": "cents"},
+    {"name": "fee", "encoding": "i64", "unit": "cents"},
+    {"name": "type", "encoding": "dict"},
+    {"name": "status", "encoding": "dict"},
+    {"name": "description", "encoding": "str"},
+    {"name": "recipient_name", "encoding": "str"},
+    {"name": "recipient_phone", "encoding": "str"},
+    {"name": "mpesa_receipt", "encoding": "str"},
+]
+I64_NULL = -(2 ** 63)
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _epoch_us(value):
+    if value is None:
+        return I64_NULL
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _packed(typecode, values):
+    col = array(typecode, values)
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col.tobytes()
+
+
+def _i64(values):
+    return _packed("q", values)
+
+
+def _u32(values):
+    return _packed("I", values)
+
+
+def _encode_dict(values):
+    dictionary = {}
+    codes = bytearray()
+    for v in values:
+        code = dictionary.setdefault(v or "", len(dictionary))
+        if code >= DICT_MAX_SIZE:
+            return bytes([DICT_AS_STR]) + _encode_str(values)
+        codes.append(code)
+    out = bytearray([len(dictionary)])
+    for v in dictionary:
+        raw = v.encode("utf-8")
+        if len(raw) > 255:
+            return bytes([DICT_AS_STR]) + _encode_str(values)
+        out += bytes([len(raw)]) + raw
+    return bytes(out + codes)
+
+
+def _encode_str(values):
+    validity = bytearray()
+    offsets = [0]
+    data = bytearray()
+    for v in values:
+        validity.append(v is not None)
+        if v is not None:
+            data += v.encode("utf-8")
+        offsets.append(len(data))
+    return bytes(validity) + _u32(offsets) + bytes(data)
+
+
+def _encode_block(rows):
+    return b"".join([
+        struct.pack("<I", len(rows)),
+        _i64([r.id for r in rows]),
+        _i64([r.user_id for r in rows]),
+        _i64([_epoch_us(r.created_at) for r in rows]),
+        _i64([r.amount.cents for r in rows]),
+        _i64([r.fee.cents for r in rows]),
+        _encode_dict([r.type for r in rows]),
+        _encode_dict([r.status for r in rows]),
+        _encode_str([r.description for r in rows]),
+        _encode_str([r.recipient_name for r in rows]),
+        _encode_str([r.recipient_phone for r in rows]),
+        _encode_str([r.mpesa_receipt for r in rows]),
+    ])
+
+
+def export_columnar(filters):
+    """Stream the MTXC columnar format, one block per EXPORT_CHUNK_ROWS rows."""
+    schema = json.dumps(COLUMNAR_SCHEMA).encode("utf-8")
+    yield COLUMNAR_MAGIC + struct.pack("<BI", COLUMNAR_VERSION, len(schema)) + schema
+
+    block = []
+    for row in _export_rows(filters):
+        block.append(row)
+        if len(block) == EXPORT_CHUNK_ROWS:
+            yield _encode_block(block)
+            block = []
+    if block:
+        yield _encode_block(block)
+    yield struct.pack("<I", 0)
+
+
+def read_columnar(fp):
+    """
+    Decode an MTXC stream back into a list of dicts per block (generator).
+    Reference reader for consumers and round-trip checks.
+    """
+    def read(n):
+        data = fp.read(n)
+        if len(data) != n:
+            raise ValueError("truncated MTXC stream")
+        return data
+
+    if read(4) != COLUMNAR_MAGIC:
+        raise ValueError("not an MTXC stream")
+    version, schema_len = struct.unpack("<BI", read(5))
+    if version not in (1, COLUMNAR_VERSION):
+        raise ValueError(f"unsupported MTXC version {version}")
+    schema = json.loads(read(schema_len))
+
+    def read_str(n):
+        validity = read(n)
+        offsets = struct.unpack(f"<{n + 1}I", read(4 * (n + 1)))
+        data = read(offsets[-1])
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") if validity[i] else None
+                for i in range(n)]
+
+    while True:
+        (n,) = struct.unpack("<I", read(4))
+        if n == 0:
+            return
+        columns = {}
+        for col in schema:
+            if col["encoding"] == "i64":
+                values = list(struct.unpack(f"<{n}q", read(8 * n)))
+                columns[col["name"]] = [None if v == I64_NULL else v for v in values]
+            elif col["encoding"] == "dict":
+                size = read(1)[0]
+                if size == DICT_AS_STR and version >= 2:
+                    columns[col["name"]] = read_str(n)
+                    continue
+                words = []
+                for _ in range(size):
+                    length = read(1)[0]
+                    words.append(read(length).decode("utf-8"))
+                columns[col["name"]] = [words[c] for c in read(n)]
+            else:
+                columns[col["name"]] = read_str(n)
+        yield [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+EXPORT_FORMATS = {
+    "csv": (export_csv, "text/csv", "csv"),
+    "ndjson": (export_ndjson, "application/x-ndjson", "ndjson"),
+    "columnar": (export_columnar, "application/vnd.moneytransfer.mtxc", "mtxc"),
+}
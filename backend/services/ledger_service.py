@@ -0,0 +1,184 @@
+# backend/services/ledger_service.py
+from flask import current_app
+from sqlalchemy import func, insert, select, update
+from extensions import db
+from models.ledger import LedgerEntry, BalanceSnapshot
+from models.money import Money
+from models.wallet import Wallet
+
+
+class LedgerService:
+    """
+    Append-only ledger with periodic per-wallet balance checkpoints.
+
+    TransferService posts one entry per wallet movement in the same DB
+    transaction as the balance UPDATE. Every LEDGER_SNAPSHOT_INTERVAL entries
+    a wallet gets a new BalanceSnapshot, so balance() never sums more than
+    one interval's worth of entries.
+    """
+
+    @staticmethod
+    def post(wallet_id: int, amount, transaction=None, tail: int = None) -> LedgerEntry:
+        """
+        Append an entry. `tail` is the wallet's entries_since_snapshot after
+        this posting (as returned by the balance UPDATE); once it reaches the
+        interval a checkpoint is written.
+        """
+        entry = LedgerEntry(wallet_id=wallet_id, amount=amount, transaction=transaction)
+        db.session.add(entry)
+        if tail is not None and tail >= current_app.config["LEDGER_SNAPSHOT_INTERVAL"]:
+            LedgerService.checkpoint(wallet_id)
+        return entry
+
+    @staticmethod
+    def post_many(movements, tails) -> None:
+        """
+        Bulk post(): append [(wallet_id, amount, transaction_id), ...] with
+        one executemany INSERT. `tails` maps each wallet id to its
+        entries_since_snapshot after these postings; wallets at the interval
+        are checkpointed.
+        """
+        db.session.execute(insert(LedgerEntry), [
+            {"wallet_id": wallet_id, "amount": amount, "transaction_id": transaction_id}
+            for wallet_id, amount, transaction_id in movements
+        ])
+        interval = current_app.config["LEDGER_SNAPSHOT_INTERVAL"]
+        for wallet_id in sorted(w for w, tail in tails.items() if tail >= interval):
+            LedgerService.checkpoint(wallet_id)
+
+    @staticmethod
+    def _latest_snapshot(wallet_id: int):
+        return (BalanceSnapshot.query
+                .filter_by(wallet_id=wallet_id)
+                .order_by(BalanceSnapshot.last_entry_id.desc())
+                .first())
+
+    @staticmethod
+    def _tail(wallet_id: int, after_entry_id: int):
+        return (db.session.query(func.count(LedgerEntry.id),
+                                 func.coalesce(func.sum(LedgerEntry.amount), 0),
+                                 func.max(LedgerEntry.id))
+                .filter(LedgerEntry.wallet_id == wallet_id,
+                        LedgerEntry.id > after_entry_id)
+                .one())
+
+    @classmethod
+    def balance(cls, wallet_id: int) -> Money:
+        """Ledger balance: latest snapshot + sum of the entries after it."""
+        snap = cls._latest_snapshot(wallet_id)
+        _, tail_sum, _ = cls._tail(wallet_id, snap.last_entry_id if snap else 0)
+        return (snap.balance if snap else Money(0)) + Money.of(tail_sum)
+
+    @classmethod
+    def checkpoint(cls, wallet_id: int):
+        """
+        Snapshot the wallet's ledger balance as of its newest entry. Must run
+        while the wallet row is locked (i.e. after its balance UPDATE).
+        """
+        db.session.flush()
+        snap = cls._latest_snapshot(wallet_id)
+        count, tail_sum, last_id = cls._tail(wallet_id, snap.last_entry_id if snap else 0)
+        if not count:
+            return None
+        new_snap = BalanceSnapshot(
+            wallet_id=wallet_id,
+            last_entry_id=last_id,
+            balance=(snap.balance if snap else Money(0)) + Money.of(tail_sum),
+        )
+        db.session.add(new_snap)
+        db.session.execute(
+            update(Wallet)
+            .where(Wallet.id == wallet_id)
+            .values(entries_since_snapshot=0)
+            .execution_options(synchronize_session=False)
+        )
+        return new_snap
+
+    @classmethod
+    def checkpoint_all(cls, batch_size: int = 500) -> int:
+        """Periodic job: snapshot every wallet with un-checkpointed entries."""
+        done = 0
+        while True:
+            ids = db.session.scalars(
+                select(Wallet.id)
+                .where(Wallet.entries_since_snapshot > 0)
+                .order_by(Wallet.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                return done
+            for wallet_id in ids:
+                # lock the wallet row like a posting would
+                db.session.execute(
+                    update(Wallet).where(Wallet.id == wallet_id)
+                    .values(entries_since_snapshot=Wallet.entries_since_snapshot)
+                    .execution_options(synchronize_session=False)
+                )
+                cls.checkpoint(wallet_id)
+            db.session.commit()
+            done += len(ids)
+
+    @staticmethod
+    def reconcile(chunk_size: int = 5000) -> dict:
+        """
+        Stream the whole ledger once, in (wallet_id, id) order, and verify
+        that every snapshot equals the running sum at its last_entry_id and
+        that every Wallet.balance equals its ledger total. Memory use is
+        independent of ledger size.
+        """
+        conn = db.session.connection()
+        if conn.dialect.name == "postgresql":
+            # one consistent view across the three streams
+            conn.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+
+        def stream(stmt):
+            return iter(db.session.execute(stmt.execution_options(yield_per=chunk_size)))
+
+        entries = stream(select(LedgerEntry.wallet_id, LedgerEntry.id, LedgerEntry.amount)
+                         .order_by(LedgerEntry.wallet_id, LedgerEntry.id))
+        snapshots = stream(select(BalanceSnapshot.wallet_id, BalanceSnapshot.last_entry_id,
+                                  BalanceSnapshot.balance)
+                           .order_by(BalanceSnapshot.wallet_id, BalanceSnapshot.last_entry_id))
+        wallets = stream(select(Wallet.id, Wallet.balance).order_by(Wallet.id))
+
+        report = {"wallets": 0, "entries": 0, "snapshots": 0,
+                  "snapshot_mismatches": [], "balance_mismatches": []}
+        entry = next(entries, None)
+        snap = next(snapshots, None)
+
+        for wallet_id, wallet_balance in wallets:
+            running = Money(0)
+            while entry is not None and entry.wallet_id < wallet_id:
+                entry = next(entries, None)  # orphaned entries; FK makes this unreachable
+            while snap is not None and snap.wallet_id < wallet_id:
+                snap = next(snapshots, None)
+
+            def check_snapshots(upto):
+                nonlocal snap
+                while (snap is not None and snap.wallet_id == wallet_id
+                       and (upto is None or snap.last_entry_id <= upto)):
+                    report["snapshots"] += 1
+                    if upto is None or snap.balance != running:
+                        report["snapshot_mismatches"].append({
+                            "walletId": wallet_id, "lastEntryId": snap.last_entry_id,
+                            "snapshot": float(snap.balance), "ledger": float(running),
+                        })
+                    snap = next(snapshots, None)
+
+            while entry is not None and entry.wallet_id == wallet_id:
+                running += entry.amount
+                report["entries"] += 1
+                check_snapshots(entry.id)
+                entry = next(entries, None)
+            # snapshots pointing past the wallet's last entry are dangling
+            check_snapshots(None)
+
+            report["wallets"] += 1
+            if wallet_balance != running:
+                report["balance_mismatches"].append({
+                    "walletId": wallet_id, "wallet": float(wallet_balance),
+                    "ledger": float(running),
+                })
+
+        report["ok"] = not (report["snapshot_mismatches"] or report["balance_mismatches"])
+        return report
@@ -0,0 +1,141 @@
+# backend/services/mpesa_auth.py
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, per-worker cache still works
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    OAuth access-token cache for the Daraja API.
+
+    - Honours `expires_in`; a token is refreshed `refresh_margin` seconds
+      before it expires. Inside that window callers keep the current token
+      while one background thread fetches the next one.
+    - Single-flight: at most one fetch per process at a time (a lock), and
+      across gunicorn workers (an flock on `<store>.lock`), so N workers and
+      M threads still cost one OAuth round-trip per token lifetime.
+    - Shared: the token is kept in a small JSON file (`store_path`), written
+      atomically, which every worker checks before fetching.
+
+    `fetch` is a callable returning (access_token, expires_in_seconds).
+    """
+
+    def __init__(self, fetch, key: str, store_path: str = None, refresh_margin: int = 60):
+        self._fetch = fetch
+        self._key = hashlib.sha256(key.encode()).hexdigest()[:16]
+        self._store_path = store_path
+        self._margin = refresh_margin
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+        self._refreshing = False
+        self.fetches = 0  # OAuth round-trips made by this process
+
+    # ─── public ───
+
+    def get(self) -> str:
+        now = time.time()
+        token, expires_at = self._token, self._expires_at
+        if token and now < expires_at - self._margin:
+            return token
+        if token and now < expires_at:
+            self._refresh_in_background()
+            return token
+        with self._lock:
+            # another thread may have refreshed while we waited
+            if self._token and time.time() < self._expires_at - self._margin:
+                return self._token
+            self._refresh()
+            return self._token
+
+    def invalidate(self, token: str = None):
+        """Drop a token the API rejected (only if it is still the current one)."""
+        with self._lock:
+            if token is None or token == self._token:
+                self._token, self._expires_at = None, 0.0
+                self._write_store(None, 0.0)
+
+    # ─── internals ───
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._lock:
+                    if time.time() < self._expires_at - self._margin:
+                        return
+                    self._refresh()
+            except Exception:
+                log.exception("Background M-Pesa token refresh failed")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="mpesa-token-refresh", daemon=True).start()
+
+    def _refresh(self):
+        """Called with self._lock held."""
+        with self._store_lock():
+            token, expires_at = self._read_store()
+            if not token or time.time() >= expires_at - self._margin:
+                token, expires_in = self._fetch()
+                self.fetches += 1
+                expires_at = time.time() + float(expires_in)
+                self._write_store(token, expires_at)
+        self._token, self._expires_at = token, expires_at
+
+    @contextmanager
+    def _store_lock(self):
+        if not self._store_path or fcntl is None:
+            yield
+            return
+        with open(self._store_path + ".lock", "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _read_store(self):
+        if not self._store_path:
+            return None, 0.0
+        try:
+            with open(self._store_path) as fh:
+                entry = json.load(fh).get(self._key) or {}
+            return entry.get("token"), float(entry.get("expires_at", 0))
+        except (OSError, ValueError):
+            return None, 0.0
+
+    def _write_store(self, token, expires_at):
+        if not self._store_path:
+            return
+        try:
+            try:
+                with open(self._store_path) as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                data = {}
+            data[self._key] = {"token": token, "expires_at": expires_at}
+            directory = os.path.dirname(os.path.abspath(self._store_path))
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".mpesa-token-")
+            with os.fdopen(fd, "w") as fh:
+                json.dump(data, fh)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self._store_path)
+        except OSError:
+            log.warning("Could not write M-Pesa token store %s", self._store_path)
@@ -1,13 +1,23 @@
 # backend/services/mpesa_service.py
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import base64
 import datetime
 import json
+import logging
+import threading
 from config import Config
+from services.mpesa_auth import TokenCache
+
+log = logging.getLogger(__name__)
 
 
 class MpesaService:
+    _session = None
+    _token_cache = None
+    _init_lock = threading.Lock()
+
     @staticmethod
     def _normalize_phone(phone: str) -> str:
         """
@@ -32,19 +42,68 @@ class MpesaService:
 
     @staticmethod
     def _base_url(path: str) -> str:
+        if getattr(Config, "MPESA_BASE_URL", None):
+            return Config.MPESA_BASE_URL.rstrip("/") + path
         if getattr(Config, "MPESA_ENVIRONMENT", "sandbox") == "production":
             return f"https://api.safaricom.co.ke{path}"
         return f"https://sandbox.safaricom.co.ke{path}"
 
     @staticmethod
-    def get_access_token() -> str:
-        url = MpesaService._base_url("/oauth/v1/generate?grant_type=client_credentials")
-        res = requests.get(
+    def _timeout():
+        return (Config.MPESA_CONNECT_TIMEOUT, Config.MPESA_READ_TIMEOUT)
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """Process-wide keep-alive session (one TLS handshake per pooled connection)."""
+        if cls._session is None:
+            with cls._init_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.MPESA_POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def token_cache(cls) -> TokenCache:
+        if cls._token_cache is None:
+            with cls._init_lock:
+                if cls._token_cache is None:
+                    cls._token_cache = TokenCache(
+                        cls._fetch_access_token,
+                        key=f"{cls._base_url('')}|{Config.MPESA_CONSUMER_KEY}",
+                        store_path=Config.MPESA_TOKEN_STORE,
+                        refresh_margin=Config.MPESA_TOKEN_REFRESH_MARGIN,
+                    )
+        return cls._token_cache
+
+    @classmethod
+    def reset(cls):
+        """Drop the pooled session and token cache (after config changes)."""
+        with cls._init_lock:
+            if cls._session is not None:
+                cls._session.close()
+            cls._session = None
+            cls._token_cache = None
+
+    @classmethod
+    def _fetch_access_token(cls):
+        """One OAuth round-trip -> (access_token, expires_in seconds)."""
+        url = cls._base_url("/oauth/v1/generate?grant_type=client_credentials")
+        res = cls.session().get(
             url,
-            auth=HTTPBasicAuth(Config.MPESA_CONSUMER_KEY, Config.MPESA_CONSUMER_SECRET)
+            auth=HTTPBasicAuth(Config.MPESA_CONSUMER_KEY, Config.MPESA_CONSUMER_SECRET),
+            timeout=cls._timeout(),
         )
         res.raise_for_status()
-        return res.json().get("access_token")
+        data = res.json()
+        # Daraja returns expires_in as a string ("3599")
+        return data.get("access_token"), int(data.get("expires_in", 3599))
+
+    @classmethod
+    def get_access_token(cls) -> str:
+        return cls.token_cache().get()
 
     @classmethod
     def lipa_na_mpesa(cls, phone_number: str, amount: int, account_reference, transaction_desc: str):
@@ -55,8 +114,6 @@ class MpesaService:
         phone = cls._normalize_phone(phone_number)
         timestamp = cls._timestamp()
         password = cls._password(Config.MPESA_SHORTCODE, Config.MPESA_PASSKEY, timestamp)
-        token = cls.get_access_token()
-
         url = cls._base_url("/mpesa/stkpush/v1/processrequest")
 
         payload = {
@@ -73,15 +130,9 @@ class MpesaService:
             "TransactionDesc": transaction_desc
         }
 
-        # For debugging
-        print("STK PUSH PAYLOAD →", json.dumps(payload, indent=2))
+        log.debug("STK PUSH PAYLOAD → %s", json.dumps(payload, indent=2))
 
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
-        res = requests.post(url, json=payload, headers=headers)
+        res = cls._post_authorized(url, payload)
         res.raise_for_status()
         data = res.json()
 
@@ -93,3 +144,19 @@ class MpesaService:
             "ResponseDescription": data.get("ResponseDescription"),
             "CustomerMessage": data.get("CustomerMessage"),
         }
+
+    @classmethod
+    def _post_authorized(cls, url: str, payload: dict):
+        """POST with the cached token; on 401 drop it and retry once with a fresh one."""
+        for attempt in range(2):
+            token = cls.get_access_token()
+            res = cls.session().post(
+                url,
+                json=payload,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=cls._timeout(),
+            )
+            if res.status_code != 401 or attempt:
+                return res
+            cls.token_cache().invalidate(token)
+        return res
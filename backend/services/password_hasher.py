@@ -0,0 +1,90 @@
+# backend/services/password_hasher.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(ValueError):
+    """Every hashing slot is taken and none freed up in time."""
+
+
+class PasswordHasher:
+    """
+    Password hashing with a configurable method and cost, run off the
+    request worker.
+
+    PASSWORD_HASH_METHOD is a full Werkzeug method string, exactly as it
+    appears at the start of a stored hash, e.g. "pbkdf2:sha256:600000" or
+    "scrypt:32768:8:1". Hashes made with any other method still verify, and
+    login_user() re-hashes them with the current one (needs_rehash), so
+    raising the cost needs no migration.
+
+    Hashing and verification run in a small process pool so a burst of
+    logins burns those CPUs instead of blocking the web worker (under the
+    eventlet worker, a PBKDF2 call would otherwise stall every connection).
+    The pool plus PASSWORD_HASH_QUEUE waiting calls is the bound; a caller
+    that cannot get a slot within PASSWORD_HASH_WAIT seconds gets HasherBusy.
+    PASSWORD_HASH_WORKERS=0 hashes inline.
+    """
+    _method = None
+    _workers = 0
+    _wait = None
+    _executor = None
+    _slots = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._method = app.config["PASSWORD_HASH_METHOD"]
+        cls._workers = app.config["PASSWORD_HASH_WORKERS"]
+        cls._wait = app.config["PASSWORD_HASH_WAIT"]
+        cls._slots = threading.BoundedSemaphore(
+            max(cls._workers, 1) + app.config["PASSWORD_HASH_QUEUE"])
+
+    @classmethod
+    def _pool(cls):
+        # created lazily, and again after a fork (gunicorn --preload): an
+        # executor inherited from the parent has no live processes
+        if cls._executor is None or cls._pid != os.getpid():
+            with cls._lock:
+                if cls._executor is None or cls._pid != os.getpid():
+                    # spawn: the children must not inherit the worker's DB
+                    # connections and threads
+                    cls._executor = ProcessPoolExecutor(
+                        cls._workers, mp_context=multiprocessing.get_context("spawn"))
+                    cls._pid = os.getpid()
+        return cls._executor
+
+    @classmethod
+    def _run(cls, fn, *args):
+        if not cls._workers:
+            return fn(*args)
+        if not cls._slots.acquire(timeout=cls._wait):
+            raise HasherBusy("Too many sign-ins in progress, please try again shortly")
+        try:
+            return cls._pool().submit(fn, *args).result()
+        finally:
+            cls._slots.release()
+
+    @classmethod
+    def hash(cls, password: str) -> str:
+        return cls._run(generate_password_hash, password, cls._method)
+
+    @classmethod
+    def verify(cls, stored: str, password: str) -> bool:
+        return cls._run(check_password_hash, stored, password)
+
+    @classmethod
+    def needs_rehash(cls, stored: str) -> bool:
+        return stored.split("$", 1)[0] != cls._method
+
+    @classmethod
+    def shutdown(cls, wait=True):
+        with cls._lock:
+            if cls._executor is not None and cls._pid == os.getpid():
+                cls._executor.shutdown(wait=wait)
+            cls._executor = None
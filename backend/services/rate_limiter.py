@@ -0,0 +1,202 @@
+# backend/services/rate_limiter.py
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import jsonify, request
+
+from services.token_service import TokenService
+
+log = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(spec: str):
+    """"10/minute" -> (capacity 10, refill rate in tokens per second)."""
+    count, _, period = spec.partition("/")
+    try:
+        count = int(count)
+        seconds = _PERIODS[period.strip().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '10/minute'")
+    if count < 1:
+        raise ValueError(f"Invalid rate limit {spec!r}; count must be at least 1")
+    return count, count / seconds
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in a dict, private to this process.
+
+    Buckets are (tokens, stamp, full_at) tuples, kept in least recently
+    used order. Updates take one of `stripes` locks picked by key hash, so
+    unrelated clients never wait on each other for the refill arithmetic;
+    writing the bucket back and moving it to the end take one short shared
+    lock, the same one eviction holds. A new key arriving when the dict
+    holds `max_keys` buckets evicts the `evict_batch` least recently used
+    ones (usually refilled long ago, and a full bucket is the same as
+    none), so eviction costs O(1) per take amortised and never scans.
+    """
+
+    def __init__(self, stripes=64, max_keys=100_000, evict_batch=None):
+        self._buckets = OrderedDict()
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._order_lock = threading.Lock()
+        self._max_keys = max_keys
+        self._evict_batch = evict_batch or max(1, max_keys // 100)
+
+    def take(self, key, capacity, rate):
+        """Take one token. Returns (allowed, seconds until one is available)."""
+        now = time.monotonic()
+        with self._locks[hash(key) % len(self._locks)]:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            with self._order_lock:
+                if bucket is None and len(self._buckets) >= self._max_keys:
+                    self._evict()
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+                self._buckets.move_to_end(key)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def _evict(self):
+        # caller holds _order_lock
+        for _ in range(self._evict_batch):
+            try:
+                self._buckets.popitem(last=False)
+            except KeyError:
+                return
+
+
+class SqliteBucketStore:
+    """
+    Token buckets in a SQLite file, shared by every gunicorn worker on the
+    host. Each take() is a single atomic UPSERT ... RETURNING, so there is
+    no read-modify-write race between processes. Connections are per
+    thread (and per process, so forked workers open their own).
+    """
+
+    _TAKE = """
+        INSERT INTO rate_buckets (key, tokens, stamp, allowed)
+        VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = min(:capacity, tokens + max(0, :now - stamp) * :rate)
+                     - (min(:capacity, tokens + max(0, :now - stamp) * :rate) >= 1),
+            allowed = min(:capacity, tokens + max(0, :now - stamp) * :rate) >= 1,
+            stamp = :now
+        RETURNING allowed, tokens
+    """
+
+    def __init__(self, path, idle_after, prune_every=1000):
+        self._path = path
+        self._idle_after = idle_after
+        self._prune_every = prune_every
+        self._takes = 0
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_buckets ("
+                         "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                         "stamp REAL NOT NULL, allowed INTEGER NOT NULL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def take(self, key, capacity, rate):
+        now = time.time()
+        conn = self._conn()
+        allowed, tokens = conn.execute(self._TAKE, {
+            "key": key, "capacity": capacity, "rate": rate, "now": now,
+        }).fetchone()
+        self._takes += 1
+        if self._takes % self._prune_every == 0:
+            # idle this long means full again, whatever the limit
+            conn.execute("DELETE FROM rate_buckets WHERE stamp < ?", (now - self._idle_after,))
+        return bool(allowed), 0 if allowed else (1 - tokens) / rate
+
+
+class RateLimiter:
+    """
+    Per-route token-bucket limits, checked in a before_request hook.
+
+    RATE_LIMITS maps endpoint names to "count/period" ("10/minute"): a
+    client may burst `count` requests and then gets one more every
+    period/count. Clients are identified by user id when the request
+    carries a valid bearer token (verified in memory, see TokenService) and
+    by IP otherwise. Behind RATE_LIMIT_TRUST_PROXY proxies the IP is the
+    X-Forwarded-For entry the outermost trusted proxy appended (counted
+    from the right, like werkzeug's ProxyFix); entries to its left are
+    whatever the client sent and are ignored. Over the limit the request is answered with 429 and
+    Retry-After before the view runs.
+
+    RATE_LIMIT_STORAGE is "memory" (per worker) or "sqlite:///<path>" to
+    share the buckets between the workers on one host. If the store fails
+    the request is let through.
+    """
+    _limits = {}
+    _store = None
+    _proxy_hops = 0
+
+    @classmethod
+    def init_app(cls, app):
+        cls._limits = {endpoint: parse_limit(spec)
+                       for endpoint, spec in app.config["RATE_LIMITS"].items() if spec}
+        cls._proxy_hops = app.config["RATE_LIMIT_TRUST_PROXY"]
+        storage = app.config["RATE_LIMIT_STORAGE"]
+        if storage == "memory":
+            cls._store = MemoryBucketStore()
+        elif storage.startswith("sqlite:///"):
+            idle_after = max((c / r for c, r in cls._limits.values()), default=0)
+            cls._store = SqliteBucketStore(storage[len("sqlite:///"):], idle_after)
+        else:
+            raise ValueError(f"Unsupported RATE_LIMIT_STORAGE {storage!r}")
+        if app.config["RATE_LIMIT_ENABLED"] and cls._limits:
+            app.before_request(cls._check)
+
+    @classmethod
+    def _client(cls):
+        header = request.headers.get("Authorization", "")
+        if header[:7].lower() == "bearer ":
+            try:
+                user_id, _ = TokenService.verify(header[7:])
+                return f"u{user_id}"
+            except ValueError:
+                pass
+        if cls._proxy_hops:
+            forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",")]
+            if len(forwarded) >= cls._proxy_hops and forwarded[-cls._proxy_hops]:
+                return forwarded[-cls._proxy_hops]
+        return request.remote_addr
+
+    @classmethod
+    def _check(cls):
+        limit = cls._limits.get(request.endpoint)
+        if limit is None or request.method == "OPTIONS":
+            return None
+        key = f"{request.endpoint}:{cls._client()}"
+        try:
+            allowed, retry_after = cls._store.take(key, *limit)
+        except Exception:
+            log.exception("Rate limit store failed; letting %s through", key)
+            return None
+        if allowed:
+            return None
+        response = jsonify({"error": "Too many requests, please slow down"})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
@@ -0,0 +1,72 @@
+# backend/services/realtime.py
+import logging
+
+from sqlalchemy import event
+from extensions import db, socketio
+
+log = logging.getLogger(__name__)
+
+_PENDING = "realtime_events"
+
+
+def user_room(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class RealtimeService:
+    """
+    Pushes per-user Socket.IO events once the DB change behind them is
+    committed.
+
+    Code that changes state calls notify() inside its unit of work; the event
+    is parked on the session and emitted from after_commit (dropped on
+    rollback), so a client never hears about a deposit or transfer that
+    did not happen. Events go to the user's private room, joined on an
+    authenticated connect (routes/socket_events.py).
+
+    Events: deposit_status, incoming_transfer, balance_changed.
+    """
+
+    @classmethod
+    def init_app(cls, app):
+        socketio.init_app(
+            app,
+            async_mode=app.config["SOCKETIO_ASYNC_MODE"],
+            message_queue=app.config["SOCKETIO_MESSAGE_QUEUE"],
+            cors_allowed_origins=app.config["FRONTEND_ORIGINS"],
+        )
+        for name, fn in (("after_commit", cls._after_commit),
+                         ("after_soft_rollback", cls._after_rollback)):
+            if not event.contains(db.session, name, fn):
+                event.listen(db.session, name, fn)
+
+    @staticmethod
+    def notify(user_id: int, name: str, data: dict, key=None):
+        """
+        Queue `name` for `user_id` until commit. Events sharing a `key`
+        (e.g. successive balance updates in one transaction) collapse to
+        the last one.
+        """
+        pending = db.session.info.setdefault(_PENDING, {})
+        pending[key or (user_id, name, len(pending))] = (user_id, name, data)
+
+    @staticmethod
+    def notify_balance(user_id: int, balance):
+        RealtimeService.notify(user_id, "balance_changed", {"balance": float(balance)},
+                               key=(user_id, "balance_changed"))
+
+    @staticmethod
+    def _after_commit(session):
+        pending = session.info.pop(_PENDING, None)
+        if not pending:
+            return
+        for user_id, name, data in pending.values():
+            try:
+                socketio.emit(name, data, to=user_room(user_id))
+            except Exception:
+                log.exception("Could not emit %s to user %s", name, user_id)
+
+    @staticmethod
+    def _after_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(_PENDING, None)
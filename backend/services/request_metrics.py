@@ -0,0 +1,221 @@
+# backend/services/request_metrics.py
+import hmac
+import logging
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+_STATS = "request_metrics"  # g: this request's RequestStats
+
+# Histogram upper bounds (Prometheus "le"), +Inf is implied
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "db_seconds", "slowest", "slowest_statement",
+                 "serialize_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+        self.serialize_seconds = 0.0
+
+
+class _Histogram:
+    """Cumulative-bucket histogram per label tuple, in the Prometheus text format."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, values, amount):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if amount <= bound:
+                series[i] += 1
+        series[-2] += amount
+        series[-1] += 1
+
+    def render(self, lines):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for values, series in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, values))
+            for bound, n in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+
+
+class _TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with jsonify()'s encoding time counted as serialize time."""
+
+    def dumps(self, obj, **kwargs):
+        return RequestMetrics.timed_serialize(super().dumps, obj, **kwargs)
+
+
+class RequestMetrics:
+    """
+    Per-request SQL and timing instrumentation.
+
+    Engine cursor events count every statement and its time; when they run
+    inside a request the totals (and the slowest statement) go on the
+    request, anywhere else only the slow-query log sees them. Statements
+    slower than SLOW_QUERY_MS are logged with the endpoint that ran them.
+    JSON encoding is timed through timed_serialize() (jsonify() and
+    json_response() use it).
+
+    Each response gets a Server-Timing header (db, db-slowest, serialize,
+    app; the db entry's description is "queries=<statements>"), and the
+    totals feed per-blueprint histograms served at /metrics in the
+    Prometheus text format when METRICS_ENABLED is set; the route needs
+    "Authorization: Bearer <METRICS_TOKEN>" and is not registered without
+    a token. Histograms are per worker process. Statements
+    run while a streamed body is being sent happen after the response is
+    finished and are not included.
+    """
+    _lock = threading.Lock()
+    _slow_seconds = 0.0
+    _server_timing = True
+    _token = None
+    _slow_queries = {}  # blueprint -> count
+    _histograms = ()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._slow_seconds = app.config["SLOW_QUERY_MS"] / 1000
+        cls._server_timing = app.config["SERVER_TIMING_ENABLED"]
+        cls._token = app.config["METRICS_TOKEN"]
+        if not cls._histograms:
+            labels = ("blueprint", "method")
+            cls._histograms = (
+                _Histogram("http_request_duration_seconds", "Time to build the response.",
+                           labels, SECONDS_BUCKETS),
+                _Histogram("http_request_db_seconds", "SQL time per request.",
+                           labels, SECONDS_BUCKETS),
+                _Histogram("http_request_queries", "SQL statements per request.",
+                           labels, QUERY_BUCKETS),
+                _Histogram("http_request_serialize_seconds", "JSON encoding time per request.",
+                           labels, SECONDS_BUCKETS),
+            )
+        for name, fn in (("before_cursor_execute", cls._before_cursor_execute),
+                         ("after_cursor_execute", cls._after_cursor_execute)):
+            if not event.contains(Engine, name, fn):
+                event.listen(Engine, name, fn)
+        if type(app.json) is DefaultJSONProvider:
+            app.json = _TimedJSONProvider(app)
+        app.before_request(cls._before_request)
+        app.after_request(cls._after_request)
+        if app.config["METRICS_ENABLED"]:
+            if not cls._token:
+                raise ValueError("METRICS_ENABLED needs METRICS_TOKEN; /metrics is never public")
+            app.add_url_rule("/metrics", "metrics", cls._metrics_view)
+
+    @staticmethod
+    def current():
+        """This request's RequestStats, or None outside a request."""
+        return g.get(_STATS) if has_request_context() else None
+
+    @classmethod
+    def timed_serialize(cls, fn, *args, **kwargs):
+        """fn(*args, **kwargs), with its time added to the request's serialize total."""
+        stats = cls.current()
+        if stats is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.serialize_seconds += time.perf_counter() - start
+
+    @classmethod
+    def render(cls) -> str:
+        lines = []
+        with cls._lock:
+            for histogram in cls._histograms:
+                histogram.render(lines)
+            lines.append("# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.")
+            lines.append("# TYPE db_slow_queries_total counter")
+            for blueprint, n in sorted(cls._slow_queries.items()):
+                lines.append(f'db_slow_queries_total{{blueprint="{blueprint}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    # ─── engine events ───
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @classmethod
+    def _after_cursor_execute(cls, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats = cls.current()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if elapsed > stats.slowest:
+                stats.slowest, stats.slowest_statement = elapsed, statement
+        if cls._slow_seconds and elapsed >= cls._slow_seconds:
+            blueprint = (request.blueprint or "none") if stats is not None else "background"
+            with cls._lock:
+                cls._slow_queries[blueprint] = cls._slow_queries.get(blueprint, 0) + 1
+            log.warning("Slow query (%.1f ms%s) in %s: %s", elapsed * 1000,
+                        ", executemany" if executemany else "",
+                        request.endpoint if stats is not None else "background",
+                        " ".join(statement.split())[:2000])
+
+    # ─── request hooks ───
+
+    @staticmethod
+    def _before_request():
+        g.setdefault(_STATS, RequestStats())
+
+    @classmethod
+    def _after_request(cls, response):
+        stats = g.get(_STATS)
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        labels = (request.blueprint or "none", request.method)
+        with cls._lock:
+            duration, db_time, queries, serialize = cls._histograms
+            duration.observe(labels, total)
+            db_time.observe(labels, stats.db_seconds)
+            queries.observe(labels, stats.queries)
+            serialize.observe(labels, stats.serialize_seconds)
+        if cls._server_timing:
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="queries={stats.queries}", '
+                f"db-slowest;dur={stats.slowest * 1000:.1f}, "
+                f"serialize;dur={stats.serialize_seconds * 1000:.1f}, "
+                f"app;dur={total * 1000:.1f}")
+        return response
+
+    @classmethod
+    def _metrics_view(cls):
+        header = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(header.encode(), f"Bearer {cls._token}".encode()):
+            return current_app.response_class("Unauthorized\n", status=401,
+                                              mimetype="text/plain")
+        return current_app.response_class(cls.render(),
+                                          mimetype="text/plain; version=0.0.4")
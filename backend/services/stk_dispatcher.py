@@ -0,0 +1,209 @@
+# backend/services/stk_dispatcher.py
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from extensions import db
+from models.transaction import Transaction
+from services.mpesa_service import MpesaService
+from services.realtime import RealtimeService
+
+log = logging.getLogger(__name__)
+
+
+class DispatchUnavailable(ValueError):
+    """The dispatcher cannot take another push right now (queue full / breaker open)."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. After `threshold` failures in a row it opens
+    for `reset_timeout` seconds, then lets a single trial call through
+    (half-open); that call's outcome closes or re-opens it.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures, self._opened_at, self._trial = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+
+def _retryable(exc) -> bool:
+    """Network errors, timeouts, 429 and 5xx are worth another attempt; other 4xx are not."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, requests.RequestException)
+
+
+class StkDispatcher:
+    """
+    Sends STK pushes off the request thread.
+
+    The deposit endpoint commits a pending Transaction (dispatch_status
+    'queued') and hands its id to a bounded thread pool; a worker sends the
+    push with retry/backoff and records the outcome on the row ('sent' with
+    the checkout ids, or 'failed' with the error). A circuit breaker stops
+    hammering Daraja while it is down. STK_DISPATCH_WORKERS=0 sends inline.
+    """
+    _app = None
+    _executor = None
+    _slots = None
+    _breaker = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._app = app
+        cls._breaker = CircuitBreaker(app.config["STK_BREAKER_THRESHOLD"],
+                                      app.config["STK_BREAKER_RESET"])
+
+    @classmethod
+    def _pool(cls):
+        # created lazily so gunicorn workers fork before any thread exists
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    workers = cls._app.config["STK_DISPATCH_WORKERS"]
+                    cls._slots = threading.BoundedSemaphore(
+                        workers + cls._app.config["STK_DISPATCH_QUEUE"])
+                    cls._executor = ThreadPoolExecutor(workers, thread_name_prefix="stk-dispatch")
+        return cls._executor
+
+    @classmethod
+    def check_available(cls):
+        """Fail fast before creating a deposit that could not be dispatched."""
+        if cls._breaker.state == "open":
+            raise DispatchUnavailable("M-Pesa is temporarily unavailable, please try again shortly")
+
+    @classmethod
+    def submit(cls, tx_id: int, user_id: int, phone: str, amount):
+        """Queue the push for a committed 'queued' transaction."""
+        if not cls._app.config["STK_DISPATCH_WORKERS"]:
+            cls._dispatch(tx_id, user_id, phone, amount)
+            return
+        pool = cls._pool()
+        if not cls._slots.acquire(blocking=False):
+            cls._finish(tx_id, error="Dispatch queue full")
+            raise DispatchUnavailable("Too many pending M-Pesa requests, please try again shortly")
+
+        def job():
+            try:
+                with cls._app.app_context():
+                    cls._dispatch(tx_id, user_id, phone, amount)
+            finally:
+                cls._slots.release()
+
+        pool.submit(job)
+
+    @classmethod
+    def shutdown(cls, wait=True):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=wait)
+            cls._executor = None
+
+    # ─── worker side ───
+
+    @classmethod
+    def _dispatch(cls, tx_id: int, user_id: int, phone: str, amount):
+        config = cls._app.config
+        max_attempts = config["STK_DISPATCH_MAX_ATTEMPTS"]
+        error = None
+        for attempt in range(1, max_attempts + 1):
+            if not cls._breaker.allow():
+                error = "Circuit open: M-Pesa unavailable"
+                break
+            try:
+                stk = MpesaService.lipa_na_mpesa(
+                    phone_number=phone,
+                    amount=int(amount),
+                    account_reference=user_id,
+                    transaction_desc="Wallet top-up",
+                )
+            except Exception as e:
+                retryable = _retryable(e)
+                # only upstream trouble counts against the breaker
+                if retryable:
+                    cls._breaker.record_failure()
+                else:
+                    cls._breaker.record_success()
+                error = str(e)
+                log.warning("STK push for tx %s failed (attempt %s/%s): %s",
+                            tx_id, attempt, max_attempts, e)
+                cls._record_attempt(tx_id, attempt, error)
+                if not retryable or attempt == max_attempts:
+                    break
+                backoff = config["STK_DISPATCH_BACKOFF"] * 2 ** (attempt - 1)
+                time.sleep(backoff * random.uniform(0.5, 1.5))
+                continue
+            cls._breaker.record_success()
+            cls._finish(tx_id, stk=stk, attempts=attempt)
+            return
+        cls._finish(tx_id, error=error)
+
+    @staticmethod
+    def _record_attempt(tx_id, attempt, error):
+        tx = db.session.get(Transaction, tx_id)
+        tx.dispatch_attempts = attempt
+        tx.dispatch_error = (error or "")[:255]
+        db.session.commit()
+
+    @staticmethod
+    def _finish(tx_id, stk=None, error=None, attempts=None):
+        tx = db.session.get(Transaction, tx_id)
+        if attempts is not None:
+            tx.dispatch_attempts = attempts
+        if stk:
+            tx.dispatch_status = "sent"
+            tx.dispatch_error = None
+            tx.checkout_request_id = stk.get("CheckoutRequestID")
+            tx.merchant_request_id = stk.get("MerchantRequestID")
+            tx.description = "STK Push - Awaiting Confirmation"
+        else:
+            tx.dispatch_status = "failed"
+            tx.dispatch_error = (error or "")[:255]
+            tx.status = "failed"
+            tx.description = "STK Push could not be sent"
+        RealtimeService.notify(tx.user_id, "deposit_status", {
+            "transactionId": tx.id,
+            "checkoutRequestID": tx.checkout_request_id,
+            "status": tx.status,
+            "dispatchStatus": tx.dispatch_status,
+            "amount": float(tx.amount),
+        })
+        db.session.commit()
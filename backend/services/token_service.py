@@ -0,0 +1,110 @@
+# backend/services/token_service.py
+import base64
+import datetime
+import functools
+import hashlib
+import hmac
+import threading
+import time
+
+from extensions import db
+from models.user import User
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class TokenService:
+    """
+    Stateless bearer tokens: "<user_id>.<role>.<issued_ms>.<expires>.<sig>",
+    where sig is HMAC-SHA256 over the first four fields with SECRET_KEY.
+
+    verify() needs no DB access: the signature check is constant-time
+    (hmac.compare_digest) and memoised per token in an LRU, and the expiry
+    and revocation checks are in-memory comparisons. Revocation is per
+    user: update_user_status stamps user.tokens_revoked_at, which rejects
+    every token issued before it. Each worker keeps the recent stamps in a
+    dict, updated directly by revoke() and re-read from the DB at most every
+    AUTH_REVOCATION_REFRESH seconds so other workers' revocations arrive too.
+    """
+    _secret = None
+    _ttl = None
+    _refresh_every = None
+    _revoked = {}          # user_id -> revoked-at, ms since epoch
+    _next_refresh = 0.0
+    _check_signature = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._secret = app.config["SECRET_KEY"].encode()
+        cls._ttl = app.config["AUTH_TOKEN_TTL"]
+        cls._refresh_every = app.config["AUTH_REVOCATION_REFRESH"]
+        cls._revoked = {}
+        cls._next_refresh = 0.0
+        cls._check_signature = functools.lru_cache(app.config["AUTH_TOKEN_CACHE_SIZE"])(
+            cls._signed_claims)
+
+    @classmethod
+    def _sign(cls, payload: str) -> str:
+        return _b64(hmac.new(cls._secret, payload.encode(), hashlib.sha256).digest())
+
+    @classmethod
+    def issue(cls, user_id: int, role: str) -> str:
+        issued_ms = int(time.time() * 1000)
+        payload = f"{user_id}.{role}.{issued_ms}.{issued_ms // 1000 + cls._ttl}"
+        return f"{payload}.{cls._sign(payload)}"
+
+    @classmethod
+    def _signed_claims(cls, token: str):
+        payload, _, sig = token.rpartition(".")
+        if not payload or not hmac.compare_digest(sig, cls._sign(payload)):
+            raise InvalidToken("Invalid token")
+        try:
+            user_id, role, issued_ms, expires = payload.split(".")
+            return int(user_id), role, int(issued_ms), int(expires)
+        except ValueError:
+            raise InvalidToken("Invalid token")
+
+    @classmethod
+    def verify(cls, token: str):
+        """Return (user_id, role) for a valid token; raise InvalidToken otherwise."""
+        user_id, role, issued_ms, expires = cls._check_signature(token)
+        if time.time() >= expires:
+            raise InvalidToken("Token expired")
+        if time.monotonic() >= cls._next_refresh:
+            cls._refresh_revocations()
+        revoked_ms = cls._revoked.get(user_id)
+        if revoked_ms is not None and issued_ms <= revoked_ms:
+            raise InvalidToken("Token revoked")
+        return user_id, role
+
+    @classmethod
+    def revoke(cls, user: User):
+        """Invalidate every token issued to `user` so far (caller commits)."""
+        now = datetime.datetime.utcnow()
+        user.tokens_revoked_at = now
+        cls._revoked[user.id] = cls._to_ms(now)
+
+    @staticmethod
+    def _to_ms(ts: datetime.datetime) -> int:
+        return int(ts.replace(tzinfo=datetime.timezone.utc).timestamp() * 1000)
+
+    @classmethod
+    def _refresh_revocations(cls):
+        # only stamps younger than the token lifetime can still reject anything
+        with cls._lock:
+            if time.monotonic() < cls._next_refresh:
+                return
+            cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=cls._ttl)
+            rows = db.session.execute(
+                db.select(User.id, User.tokens_revoked_at)
+                .where(User.tokens_revoked_at > cutoff)
+            )
+            cls._revoked = {user_id: cls._to_ms(at) for user_id, at in rows}
+            cls._next_refresh = time.monotonic() + cls._refresh_every
@@ -0,0 +1,157 @@
+# backend/services/transfer_service.py
+import random
+import time
+from collections import Counter, defaultdict
+from sqlalchemy import BigInteger, case, type_coerce, update
+from sqlalchemy.exc import DBAPIError
+from extensions import db
+from models.money import Money
+from models.wallet import Wallet
+from services.ledger_service import LedgerService
+from services.realtime import RealtimeService
+from services.user_version import UserVersionService
+
+# Postgres serialization_failure / deadlock_detected
+RETRYABLE_PGCODES = {"40001", "40P01"}
+
+
+class InsufficientFundsError(ValueError):
+    pass
+
+
+class TransferService:
+    """
+    Atomic wallet balance movements.
+
+    Balances are never read into Python and written back; every change is a
+    single `UPDATE wallet SET balance = balance ± :x` and debits carry a
+    `WHERE balance >= :x` guard, so concurrent workers can neither lose an
+    update nor overdraw. Each movement also appends a LedgerEntry, queues a
+    balance_changed event for the owner (sent on commit) and marks their
+    UserVersion for a bump. Callers add their Transaction rows to the same
+    session and commit once; apply_bulk() does the same for a whole batch
+    in a fixed number of statements.
+    """
+
+    @staticmethod
+    def _update_balance(wallet_id: int, delta, guard=None):
+        stmt = (update(Wallet)
+                .where(Wallet.id == wallet_id)
+                .values(balance=Wallet.balance + delta,
+                        entries_since_snapshot=Wallet.entries_since_snapshot + 1)
+                .returning(Wallet.entries_since_snapshot, Wallet.user_id, Wallet.balance)
+                .execution_options(synchronize_session=False))
+        if guard is not None:
+            stmt = stmt.where(guard)
+        row = db.session.execute(stmt).one_or_none()
+        if row is None:
+            return None
+        tail, user_id, balance = row
+        RealtimeService.notify_balance(user_id, balance)
+        UserVersionService.touch(user_id)
+        return tail
+
+    @classmethod
+    def credit(cls, wallet_id: int, amount, transaction=None) -> None:
+        tail = cls._update_balance(wallet_id, amount)
+        if tail is None:
+            raise ValueError("Wallet not found")
+        LedgerService.post(wallet_id, amount, transaction, tail)
+
+    @classmethod
+    def debit(cls, wallet_id: int, amount, transaction=None) -> None:
+        tail = cls._update_balance(wallet_id, -amount, Wallet.balance >= amount)
+        if tail is None:
+            raise InsufficientFundsError("Insufficient funds")
+        LedgerService.post(wallet_id, -amount, transaction, tail)
+
+    @classmethod
+    def apply(cls, movements) -> None:
+        """
+        Apply [(wallet_id, delta[, transaction]), ...] inside the current
+        transaction, posting one ledger entry per movement (linked to the
+        given Transaction row, if any).
+
+        Rows are touched in ascending wallet id order (debits first for the
+        same wallet) so two opposing transfers always lock in the same order
+        and cannot deadlock.
+        """
+        for wallet_id, delta, *rest in sorted(movements, key=lambda m: (m[0], m[1] > 0)):
+            transaction = rest[0] if rest else None
+            if delta < 0:
+                cls.debit(wallet_id, -delta, transaction)
+            elif delta > 0:
+                cls.credit(wallet_id, delta, transaction)
+        cls._expire_wallets()
+
+    @classmethod
+    def apply_bulk(cls, movements) -> None:
+        """
+        Set-based apply() for large batches: [(wallet_id, delta,
+        transaction_id), ...] becomes one UPDATE over every wallet involved
+        (net delta per wallet via CASE, guarded by balance + delta >= 0) and
+        one multi-row ledger INSERT, whatever the number of movements.
+
+        The UPDATE does not order its row locks, so callers that may race
+        with transfers in the opposite direction should lock the wallets in
+        id order first. If a guard fails InsufficientFundsError is raised
+        and the caller's transaction must be rolled back.
+        """
+        net = defaultdict(Money)
+        entries = Counter()
+        for wallet_id, delta, _ in movements:
+            net[wallet_id] += delta
+            entries[wallet_id] += 1
+        balance = type_coerce(Wallet.balance, BigInteger) + case(
+            {wallet_id: delta.cents for wallet_id, delta in net.items()}, value=Wallet.id)
+        stmt = (update(Wallet)
+                .where(Wallet.id.in_(net), balance >= 0)
+                .values(balance=balance,
+                        entries_since_snapshot=Wallet.entries_since_snapshot
+                        + case(dict(entries), value=Wallet.id))
+                .returning(Wallet.id, Wallet.user_id, Wallet.balance,
+                           Wallet.entries_since_snapshot)
+                .execution_options(synchronize_session=False))
+        rows = db.session.execute(stmt).all()
+        if len(rows) != len(net):
+            raise InsufficientFundsError("Insufficient funds")
+
+        tails = {}
+        for wallet_id, user_id, new_balance, tail in rows:
+            RealtimeService.notify_balance(user_id, new_balance)
+            UserVersionService.touch(user_id)
+            tails[wallet_id] = tail
+        LedgerService.post_many(movements, tails)
+        cls._expire_wallets()
+
+    @staticmethod
+    def _expire_wallets():
+        # In-session Wallet objects now hold stale balances
+        for obj in db.session.identity_map.values():
+            if isinstance(obj, Wallet):
+                db.session.expire(obj, ["balance", "entries_since_snapshot"])
+
+    @staticmethod
+    def is_retryable(exc: DBAPIError) -> bool:
+        orig = getattr(exc, "orig", None)
+        if getattr(orig, "pgcode", None) in RETRYABLE_PGCODES:
+            return True
+        return "database is locked" in str(orig)
+
+    @classmethod
+    def run(cls, fn, retries: int = 3, backoff: float = 0.01):
+        """
+        Call fn() (which must commit) and retry it on serialization failures,
+        deadlocks and SQLite lock timeouts with jittered exponential backoff.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return fn()
+            except DBAPIError as e:
+                db.session.rollback()
+                if attempt == retries or not cls.is_retryable(e):
+                    raise
+                time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+            except Exception:
+                db.session.rollback()
+                raise
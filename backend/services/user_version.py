@@ -0,0 +1,86 @@
+# backend/services/user_version.py
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models.beneficiary import Beneficiary
+from models.transaction import Transaction
+from models.user import User
+from models.user_version import UserVersion
+from models.wallet import Wallet
+
+_TOUCHED = "user_version_touched"  # session.info: user ids changed in this transaction
+
+
+class UserVersionService:
+    """
+    Keeps UserVersion current: one counter per user, bumped when anything
+    the user's GET endpoints show has changed.
+
+    after_flush collects the owners of every User, Wallet, Beneficiary and
+    Transaction written; TransferService.touch()es the owners of balance
+    UPDATEs (which never pass through a flush). before_commit bumps all of
+    them in one upsert, inside the transaction that made the change, so a
+    version can never be visible before the data it stands for.
+    """
+
+    @classmethod
+    def init_app(cls, app):
+        for name, fn in (("after_flush", cls._after_flush),
+                         ("before_commit", cls._before_commit),
+                         ("after_soft_rollback", cls._after_rollback)):
+            if not event.contains(db.session, name, fn):
+                event.listen(db.session, name, fn)
+
+    @staticmethod
+    def touch(user_id: int):
+        db.session.info.setdefault(_TOUCHED, set()).add(user_id)
+
+    @staticmethod
+    def current(user_id: int) -> int:
+        version = db.session.scalar(
+            db.select(UserVersion.version).where(UserVersion.user_id == user_id))
+        return version or 0
+
+    @staticmethod
+    def _after_flush(session, flush_context):
+        touched = set()
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, (Transaction, Beneficiary, Wallet)):
+                touched.add(obj.user_id)
+            elif isinstance(obj, User):
+                touched.add(obj.id)
+        touched.discard(None)
+        if touched:
+            session.info.setdefault(_TOUCHED, set()).update(touched)
+
+    @classmethod
+    def _before_commit(cls, session):
+        if session.in_nested_transaction():
+            return
+        session.flush()
+        touched = session.info.pop(_TOUCHED, None)
+        if touched:
+            cls._bump(session.connection(), touched)
+
+    @staticmethod
+    def _after_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(_TOUCHED, None)
+
+    @staticmethod
+    def _bump(connection, user_ids):
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            raise RuntimeError(f"User version upsert not supported on {dialect}")
+        table = UserVersion.__table__
+        # sorted, so concurrent commits lock the rows in the same order
+        stmt = insert(table).values([{"user_id": u, "version": 1} for u in sorted(user_ids)])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"version": table.c.version + 1},
+        )
+        connection.execute(stmt)
@@ -0,0 +1,9 @@
+import os
+
+# Config reads the environment at import, so set it before any test imports app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("CALLBACK_INBOX_WORKER", "0")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("STK_DISPATCH_WORKERS", "0")
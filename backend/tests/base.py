@@ -0,0 +1,41 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from extensions import db
+from services.entity_cache import EntityCache
+from services.token_service import TokenService
+
+
+class AppTestCase(unittest.TestCase):
+    """A fresh in-memory database per test, with a statement counter on the engine."""
+
+    def setUp(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        EntityCache.clear()
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._count)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count(self, conn, cursor, statement, *_):
+        self.statements.append(statement)
+
+    def count_statements(self, fn, *args, **kwargs):
+        """(fn(*args, **kwargs), number of SQL statements it ran)."""
+        self.statements.clear()
+        result = fn(*args, **kwargs)
+        return result, len(self.statements)
+
+    @staticmethod
+    def auth(user):
+        return {"Authorization": f"Bearer {TokenService.issue(user.id, user.role)}"}
@@ -0,0 +1,82 @@
+import unittest
+
+from sqlalchemy import select
+
+from extensions import db
+from models.analytics import TransactionRollup
+from models.beneficiary import Beneficiary
+from models.transaction import Transaction
+from models.user import User
+from models.wallet import Wallet
+from services.analytics_service import AnalyticsService
+from services.transfer_service import TransferService
+from tests.base import AppTestCase
+
+
+class RollupTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        sender = User(email="s@example.com", password_hash="x", first_name="S", last_name="S",
+                      phone="+254700000001")
+        payee = User(email="p@example.com", password_hash="x", first_name="P", last_name="P",
+                     phone="+254700000002")
+        db.session.add_all([sender, payee])
+        db.session.flush()
+        wallet = Wallet(user_id=sender.id, balance=0)
+        db.session.add_all([wallet, Wallet(user_id=payee.id, balance=0)])
+        db.session.flush()
+        TransferService.credit(wallet.id, 1000)
+        beneficiary = Beneficiary(user_id=sender.id, name="P", phone=payee.phone)
+        db.session.add(beneficiary)
+        db.session.commit()
+        self.headers = self.auth(sender)
+        self.beneficiary_id = beneficiary.id
+        self.client.get("/api/wallet/balance", headers=self.headers)  # token revocation sync
+
+    def rollups(self):
+        return sorted(db.session.execute(select(
+            TransactionRollup.granularity, TransactionRollup.bucket_start, TransactionRollup.type,
+            TransactionRollup.status, TransactionRollup.tx_count, TransactionRollup.volume,
+            TransactionRollup.fees)).all())
+
+    def assert_matches_rebuild(self):
+        incremental = self.rollups()
+        AnalyticsService.rebuild()
+        self.assertEqual(incremental, self.rollups())
+
+    def assert_rollups_after_wallets(self):
+        kinds = ["wallet" if s.startswith("UPDATE wallet") else
+                 "rollup" if s.startswith("INSERT INTO transaction_rollup") else None
+                 for s in self.statements]
+        kinds = [k for k in kinds if k]
+        self.assertIn("rollup", kinds)
+        self.assertEqual(kinds.count("rollup"), 1)
+        self.assertEqual(kinds[-1], "rollup")  # last, after every wallet lock
+
+    def test_send_writes_rollups_last(self):
+        self.statements.clear()
+        r = self.client.post("/api/transactions/send", headers=self.headers,
+                             json={"beneficiaryId": self.beneficiary_id, "amount": 10})
+        self.assertEqual(r.status_code, 200, r.json)
+        self.assert_rollups_after_wallets()
+        self.assert_matches_rebuild()
+
+    def test_batch_writes_rollups_last(self):
+        self.statements.clear()
+        r = self.client.post("/api/transactions/send/batch", headers=self.headers, json={
+            "items": [{"beneficiaryId": self.beneficiary_id, "amount": 5}] * 3})
+        self.assertEqual(r.status_code, 200, r.json)
+        self.assert_rollups_after_wallets()
+        self.assert_matches_rebuild()
+
+    def test_rolled_back_flush_leaves_no_deltas(self):
+        user_id = db.session.scalar(select(User.id).where(User.email == "s@example.com"))
+        db.session.add(Transaction(user_id=user_id, type="deposit", amount=50, status="completed"))
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        self.assert_matches_rebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()
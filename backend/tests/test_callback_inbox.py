@@ -0,0 +1,169 @@
+import json
+import unittest
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.callback_inbox import CallbackInbox
+from models.ledger import LedgerEntry
+from models.money import Money
+from models.transaction import Transaction
+from models.user import User
+from models.wallet import Wallet
+from services.callback_inbox import CallbackInboxService
+from tests.base import AppTestCase
+
+
+def payload(checkout_id, receipt=None, amount=100, code=0):
+    stk = {"CheckoutRequestID": checkout_id, "ResultCode": code, "ResultDesc": "result"}
+    if code == 0:
+        stk["CallbackMetadata"] = {"Item": [{"Name": "Amount", "Value": amount},
+                                            {"Name": "MpesaReceiptNumber", "Value": receipt}]}
+    return json.dumps({"Body": {"stkCallback": stk}})
+
+
+class CallbackInboxTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["CALLBACK_RETRY_BACKOFF"] = 0  # retries are due at once
+        self.app.config["CALLBACK_MAX_ATTEMPTS"] = 3
+        self.user = self.make_user(0)
+        db.session.add(Wallet(user_id=self.user.id, balance=0))
+        db.session.commit()
+
+    def make_user(self, i):
+        user = User(email=f"u{i}@example.com", password_hash="x", first_name="U", last_name=str(i),
+                    phone=f"+25470000000{i}")
+        db.session.add(user)
+        db.session.flush()
+        return user
+
+    def deposit(self, checkout_id, user=None, amount=100):
+        tx = Transaction(user_id=(user or self.user).id, type="deposit", amount=amount, fee=0,
+                         status="pending", checkout_request_id=checkout_id)
+        db.session.add(tx)
+        db.session.commit()
+        return tx.id
+
+    def append(self, body):
+        return CallbackInboxService.append(body)
+
+    def balance(self, user=None):
+        db.session.expire_all()
+        return Wallet.query.filter_by(user_id=(user or self.user).id).one().balance
+
+    def entry(self, entry_id):
+        db.session.expire_all()
+        return db.session.get(CallbackInbox, entry_id)
+
+    def test_credits_a_matched_callback(self):
+        tx_id = self.deposit("co-1")
+        entry_id = self.append(payload("co-1", "R1"))
+        self.assertEqual(CallbackInboxService.drain(), 1)
+        self.assertEqual(self.entry(entry_id).result, "credited")
+        tx = db.session.get(Transaction, tx_id)
+        self.assertEqual((tx.status, tx.mpesa_receipt), ("completed", "R1"))
+        self.assertEqual(self.balance(), Money.of(100))
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(LedgerEntry)), 1)
+
+    def test_declined_callback_fails_the_deposit(self):
+        tx_id = self.deposit("co-1")
+        entry_id = self.append(payload("co-1", code=1032))
+        CallbackInboxService.drain()
+        self.assertEqual(self.entry(entry_id).result, "declined")
+        self.assertEqual(db.session.get(Transaction, tx_id).status, "failed")
+        self.assertEqual(self.balance(), Money.of(0))
+
+    def test_duplicate_receipts_credit_once(self):
+        self.deposit("co-1")
+        self.deposit("co-2")
+        # the same callback delivered twice, and another deposit reusing its receipt
+        ids = [self.append(payload("co-1", "R1")), self.append(payload("co-1", "R1")),
+               self.append(payload("co-2", "R1"))]
+        CallbackInboxService.drain()
+        self.assertEqual([self.entry(i).result for i in ids], ["credited", "duplicate", "duplicate"])
+        self.assertEqual(self.balance(), Money.of(100))
+
+    def test_receipt_already_in_the_table_is_a_duplicate(self):
+        self.deposit("co-1")
+        self.deposit("co-2")
+        self.append(payload("co-1", "R1"))
+        CallbackInboxService.drain()
+        later = self.append(payload("co-2", "R1"))
+        CallbackInboxService.drain()
+        self.assertEqual(self.entry(later).result, "duplicate")
+        self.assertEqual(self.balance(), Money.of(100))
+
+    def test_unmatched_callback_is_retried_until_its_transaction_appears(self):
+        entry_id = self.append(payload("co-early", "R1"))
+        CallbackInboxService.drain()
+        entry = self.entry(entry_id)
+        self.assertEqual((entry.status, entry.result, entry.attempts), ("pending", "unmatched", 1))
+
+        self.deposit("co-early")  # the STK response (with the checkout id) lands late
+        CallbackInboxService.drain()
+        entry = self.entry(entry_id)
+        self.assertEqual((entry.status, entry.result), ("done", "credited"))
+        self.assertEqual(self.balance(), Money.of(100))
+
+    def test_unmatched_callback_fails_after_max_attempts(self):
+        entry_id = self.append(payload("co-never", "R1"))
+        for _ in range(3):
+            CallbackInboxService.drain()
+        entry = self.entry(entry_id)
+        self.assertEqual((entry.status, entry.result, entry.attempts), ("failed", "unmatched", 3))
+        self.assertEqual(CallbackInboxService.drain(), 0)
+
+    def test_failed_batch_is_retried_one_by_one(self):
+        walletless = self.make_user(1)  # crediting them raises
+        db.session.commit()
+        self.deposit("co-bad", user=walletless)
+        self.deposit("co-good")
+        bad = self.append(payload("co-bad", "R1"))
+        good = self.append(payload("co-good", "R2"))
+
+        self.assertEqual(CallbackInboxService.drain(), 2)
+        self.assertEqual(self.entry(good).result, "credited")
+        self.assertEqual(self.balance(), Money.of(100))
+        entry = self.entry(bad)
+        self.assertEqual((entry.status, entry.result, entry.attempts), ("pending", "error", 1))
+        self.assertIn("Wallet not found", entry.last_error)
+
+    def test_replay_settles_a_fixed_entry(self):
+        walletless = self.make_user(1)
+        db.session.commit()
+        self.deposit("co-1", user=walletless)
+        entry_id = self.append(payload("co-1", "R1"))
+        for _ in range(3):
+            CallbackInboxService.drain()
+        self.assertEqual(self.entry(entry_id).status, "failed")
+
+        db.session.add(Wallet(user_id=walletless.id, balance=0))
+        db.session.commit()
+        self.assertEqual(CallbackInboxService.replay(failed=True), 1)
+        CallbackInboxService.drain()
+        entry = self.entry(entry_id)
+        self.assertEqual((entry.status, entry.result, entry.attempts), ("done", "credited", 1))
+        self.assertEqual(self.balance(walletless), Money.of(100))
+
+    def test_replaying_a_settled_entry_does_not_credit_twice(self):
+        self.deposit("co-1")
+        entry_id = self.append(payload("co-1", "R1"))
+        CallbackInboxService.drain()
+        self.assertEqual(CallbackInboxService.replay([entry_id]), 1)
+        CallbackInboxService.drain()
+        self.assertEqual(self.entry(entry_id).result, "duplicate")
+        self.assertEqual(self.balance(), Money.of(100))
+
+    def test_replay_needs_ids_or_failed(self):
+        self.assertEqual(CallbackInboxService.replay(), 0)
+
+    def test_invalid_payload_fails_without_retry(self):
+        entry_id = self.append("not json")
+        CallbackInboxService.drain()
+        entry = self.entry(entry_id)
+        self.assertEqual((entry.status, entry.result), ("failed", "invalid"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from extensions import db
+from models.transaction import Transaction
+from models.user import User
+from tests.base import AppTestCase
+
+
+class DepositStatusTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.other = [
+            User(email=f"u{i}@example.com", password_hash="x", first_name="U", last_name=str(i),
+                 phone=f"+25470000000{i}") for i in range(2)]
+        db.session.add_all([self.owner, self.other])
+        db.session.flush()
+        deposit = Transaction(user_id=self.owner.id, type="deposit", amount=100, fee=0,
+                              status="pending", checkout_request_id="ws_CO_123")
+        db.session.add(deposit)
+        db.session.commit()
+        self.deposit_id = deposit.id
+
+    def status(self, user, ref):
+        return self.client.get(f"/api/wallet/tx-status/{ref}", headers=self.auth(user))
+
+    def test_owner_can_poll_by_either_reference(self):
+        for ref in ("ws_CO_123", self.deposit_id):
+            response = self.status(self.owner, ref)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json["id"], self.deposit_id)
+
+    def test_other_users_cannot_see_it(self):
+        for ref in ("ws_CO_123", self.deposit_id):
+            self.assertEqual(self.status(self.other, ref).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
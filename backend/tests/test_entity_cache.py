@@ -0,0 +1,71 @@
+import unittest
+
+from sqlalchemy import update
+
+from extensions import db
+from models.beneficiary import Beneficiary
+from models.user import User
+from services.entity_cache import EntityCache
+from tests.base import AppTestCase
+
+
+class ProcessTierTest(AppTestCase):
+    """Writes from another worker (no local invalidation) are simulated with Core UPDATEs."""
+
+    def setUp(self):
+        super().setUp()
+        EntityCache._ttl = 60
+        self.user = User(email="u@example.com", password_hash="x", first_name="U", last_name="U",
+                         phone="+254700000001")
+        db.session.add(self.user)
+        db.session.flush()
+        self.beneficiary = Beneficiary(user_id=self.user.id, name="B", phone="+254700000002")
+        db.session.add(self.beneficiary)
+        db.session.commit()
+
+    def tearDown(self):
+        EntityCache._ttl = self.app.config["ENTITY_CACHE_TTL"]
+        super().tearDown()
+
+    def change_elsewhere(self, stmt):
+        db.session.execute(stmt.execution_options(synchronize_session=False))
+        db.session.commit()
+
+    def test_beneficiary_is_read_per_request(self):
+        self.assertEqual(EntityCache.beneficiary(self.beneficiary.id)["phone"], "+254700000002")
+        db.session.commit()
+        self.change_elsewhere(update(Beneficiary).where(Beneficiary.id == self.beneficiary.id)
+                              .values(phone="+254700000003"))
+        self.assertEqual(EntityCache.beneficiary(self.beneficiary.id)["phone"], "+254700000003")
+
+    def test_user_id_by_phone_is_read_per_request(self):
+        self.assertEqual(EntityCache.user_id_by_phone("+254700000001"), self.user.id)
+        db.session.commit()
+        self.change_elsewhere(update(User).where(User.id == self.user.id)
+                              .values(phone="+254700000009"))
+        self.assertIsNone(EntityCache.user_id_by_phone("+254700000001"))
+
+    def test_user_is_read_per_request_by_default(self):
+        EntityCache.user(self.user.id)
+        db.session.commit()
+        self.change_elsewhere(update(User).where(User.id == self.user.id).values(first_name="V"))
+        self.assertEqual(EntityCache.user(self.user.id)["first_name"], "V")
+
+    def test_shared_opts_in_to_the_process_tier(self):
+        EntityCache.user(self.user.id, shared=True)
+        db.session.commit()
+        _, count = self.count_statements(EntityCache.user, self.user.id, shared=True)
+        self.assertEqual(count, 0)
+        db.session.remove()  # next request
+        _, count = self.count_statements(EntityCache.user, self.user.id)
+        self.assertEqual(count, 1)
+
+    def test_misses_are_not_shared(self):
+        self.assertIsNone(EntityCache.wallet_id(self.user.id, shared=True))
+        db.session.commit()
+        _, count = self.count_statements(EntityCache.wallet_id, self.user.id, shared=True)
+        self.assertEqual(count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
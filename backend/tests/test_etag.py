@@ -0,0 +1,53 @@
+import unittest
+
+from sqlalchemy import update
+
+from extensions import db
+from models.user import User
+from services.entity_cache import EntityCache
+from services.user_version import UserVersionService
+from tests.base import AppTestCase
+
+
+class ProfileEtagTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        EntityCache._ttl = 60
+        user = User(email="u@example.com", password_hash="x", first_name="Old", last_name="U",
+                    phone="+254700000001")
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        self.headers = self.auth(user)
+        self.client.get("/api/auth/profile", headers=self.headers)  # token revocation sync
+
+    def tearDown(self):
+        EntityCache._ttl = self.app.config["ENTITY_CACHE_TTL"]
+        super().tearDown()
+
+    def rename_elsewhere(self, name):
+        """A profile change committed by another worker: no local cache invalidation."""
+        db.session.execute(update(User).where(User.id == self.user_id).values(first_name=name)
+                           .execution_options(synchronize_session=False))
+        UserVersionService._bump(db.session.connection(), {self.user_id})
+        db.session.commit()
+        db.session.remove()
+
+    def test_body_is_as_new_as_the_etag(self):
+        first = self.client.get("/api/auth/profile", headers=self.headers)
+        self.assertEqual(first.json["first_name"], "Old")
+        self.rename_elsewhere("New")
+
+        second = self.client.get("/api/auth/profile",
+                                 headers={**self.headers, "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(second.json["first_name"], "New")
+
+        third = self.client.get("/api/auth/profile",
+                                headers={**self.headers, "If-None-Match": second.headers["ETag"]})
+        self.assertEqual(third.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
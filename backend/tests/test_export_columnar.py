@@ -0,0 +1,45 @@
+import io
+import json
+import struct
+import unittest
+from types import SimpleNamespace
+
+from services.export_service import (COLUMNAR_MAGIC, COLUMNAR_SCHEMA, COLUMNAR_VERSION,
+                                     _encode_block, read_columnar)
+
+
+def _stream(rows):
+    schema = json.dumps(COLUMNAR_SCHEMA).encode("utf-8")
+    return io.BytesIO(COLUMNAR_MAGIC + struct.pack("<BI", COLUMNAR_VERSION, len(schema)) + schema
+                      + _encode_block(rows) + struct.pack("<I", 0))
+
+
+def _row(i, type_):
+    return SimpleNamespace(id=i, user_id=1, created_at=None, amount=SimpleNamespace(cents=100),
+                           fee=SimpleNamespace(cents=0), type=type_, status="completed",
+                           description=None, recipient_name=None, recipient_phone=None,
+                           mpesa_receipt=None)
+
+
+class DictColumnTest(unittest.TestCase):
+    def round_trip(self, types):
+        (block,) = read_columnar(_stream([_row(i, t) for i, t in enumerate(types)]))
+        return [r["type"] for r in block]
+
+    def test_distinct_values_up_to_the_limit(self):
+        for distinct in (1, 254):
+            types = [f"t{i % distinct}" for i in range(600)]
+            self.assertEqual(self.round_trip(types), types)
+
+    def test_too_many_values_fall_back_to_strings(self):
+        for distinct in (255, 256, 300):
+            types = [f"t{i}" for i in range(distinct)]
+            self.assertEqual(self.round_trip(types), types)
+
+    def test_long_value_falls_back_to_strings(self):
+        types = ["send", "x" * 300, "send"]
+        self.assertEqual(self.round_trip(types), types)
+
+
+if __name__ == "__main__":
+    unittest.main()
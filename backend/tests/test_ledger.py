@@ -0,0 +1,90 @@
+import unittest
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.ledger import BalanceSnapshot, LedgerEntry
+from models.money import Money
+from models.user import User
+from models.wallet import Wallet
+from services.ledger_service import LedgerService
+from services.transfer_service import TransferService
+from tests.base import AppTestCase
+
+
+class SnapshotTest(AppTestCase):
+    INTERVAL = 3
+
+    def setUp(self):
+        super().setUp()
+        self.app.config["LEDGER_SNAPSHOT_INTERVAL"] = self.INTERVAL
+        self.wallet_ids = []
+        for i in range(2):
+            user = User(email=f"u{i}@example.com", password_hash="x", first_name="U",
+                        last_name=str(i), phone=f"+25470000000{i}")
+            db.session.add(user)
+            db.session.flush()
+            wallet = Wallet(user_id=user.id, balance=0)
+            db.session.add(wallet)
+            db.session.flush()
+            self.wallet_ids.append(wallet.id)
+        db.session.commit()
+
+    def post_some(self):
+        a, b = self.wallet_ids
+        TransferService.credit(a, Money.of(100))
+        db.session.commit()
+        for _ in range(4):
+            TransferService.apply([(a, Money.of(-7)), (b, Money.of(7))])
+            db.session.commit()
+        TransferService.apply_bulk([(a, Money.of(-1), None), (b, Money.of(1), None)] * 3)
+        db.session.commit()
+
+    def test_snapshots_match_the_ledger(self):
+        self.post_some()
+        for wallet_id in self.wallet_ids:
+            wallet = db.session.get(Wallet, wallet_id)
+            snapshots = db.session.scalars(
+                select(BalanceSnapshot).where(BalanceSnapshot.wallet_id == wallet_id)
+                .order_by(BalanceSnapshot.last_entry_id)).all()
+            self.assertTrue(snapshots)
+            # every snapshot is the sum of its wallet's entries up to last_entry_id
+            for snap in snapshots:
+                total = db.session.scalar(select(func.coalesce(func.sum(LedgerEntry.amount), 0))
+                                          .where(LedgerEntry.wallet_id == wallet_id,
+                                                 LedgerEntry.id <= snap.last_entry_id))
+                self.assertEqual(snap.balance, Money.of(total))
+            self.assertLess(wallet.entries_since_snapshot, self.INTERVAL)
+            tail = db.session.scalar(select(func.count()).where(
+                LedgerEntry.wallet_id == wallet_id,
+                LedgerEntry.id > snapshots[-1].last_entry_id))
+            self.assertEqual(tail, wallet.entries_since_snapshot)
+            self.assertEqual(LedgerService.balance(wallet_id), wallet.balance)
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+    def test_checkpoint_all_clears_the_tails(self):
+        self.post_some()
+        LedgerService.checkpoint_all()
+        for wallet_id in self.wallet_ids:
+            self.assertEqual(db.session.get(Wallet, wallet_id).entries_since_snapshot, 0)
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+    def test_reconcile_reports_a_drifted_balance(self):
+        self.post_some()
+        db.session.execute(db.update(Wallet).where(Wallet.id == self.wallet_ids[0])
+                           .values(balance=Wallet.balance + 1))
+        db.session.commit()
+        report = LedgerService.reconcile()
+        self.assertFalse(report["ok"])
+        self.assertEqual([m["walletId"] for m in report["balance_mismatches"]], [self.wallet_ids[0]])
+
+    def test_snapshots_are_append_only(self):
+        self.post_some()
+        snap = db.session.scalars(select(BalanceSnapshot)).first()
+        snap.balance = Money.of(0)
+        with self.assertRaises(ValueError):
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
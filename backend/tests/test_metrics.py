@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+
+from app import create_app
+from config import Config
+
+
+class MetricsRouteTest(unittest.TestCase):
+    def app_with(self, enabled, token):
+        with mock.patch.object(Config, "METRICS_ENABLED", enabled), \
+                mock.patch.object(Config, "METRICS_TOKEN", token):
+            return create_app()
+
+    def test_disabled_has_no_route(self):
+        client = self.app_with(False, None).test_client()
+        self.assertEqual(client.get("/metrics").status_code, 404)
+
+    def test_enabled_without_token_refuses_to_start(self):
+        with self.assertRaises(ValueError):
+            self.app_with(True, None)
+
+    def test_enabled_requires_the_token(self):
+        client = self.app_with(True, "s3cret").test_client()
+        self.assertEqual(client.get("/metrics").status_code, 401)
+        self.assertEqual(client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code,
+                         401)
+        response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http_request_duration_seconds", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
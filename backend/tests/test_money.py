@@ -0,0 +1,48 @@
+import unittest
+from decimal import Decimal
+
+from models.money import MAX_CENTS, Money
+
+
+class MoneyTest(unittest.TestCase):
+    def test_of_rounds_half_up_to_the_cent(self):
+        self.assertEqual(Money.of("12.345").cents, 1235)
+        self.assertEqual(Money.of("-12.345").cents, -1235)
+        self.assertEqual(Money.of(0.1).cents, 10)
+        self.assertEqual(Money.of(Decimal("7")).cents, 700)
+
+    def test_of_rejects_non_numbers(self):
+        for value in (None, True, "abc", "", "NaN", "Infinity", float("inf")):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                Money.of(value)
+
+    def test_of_rejects_values_outside_bigint_cents(self):
+        for value in ("1e30", "-1e30", "1e100000", 2 ** 63, Decimal(MAX_CENTS + 1).scaleb(-2)):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                Money.of(value)
+
+    def test_of_accepts_the_bigint_limits(self):
+        limit = Decimal(MAX_CENTS).scaleb(-2)
+        self.assertEqual(Money.of(limit).cents, MAX_CENTS)
+        self.assertEqual(Money.of(-limit).cents, -MAX_CENTS)
+
+    def test_arithmetic(self):
+        self.assertEqual(Money.of(10) + 2.5, Money.of("12.50"))
+        self.assertEqual(5 - Money.of(1), Money.of(4))
+        self.assertEqual(sum([Money.of(1), Money.of(2)]), Money.of(3))
+        self.assertEqual(Money.of(500) * Decimal("0.01"), Money.of(5))
+        self.assertEqual(Money.of("0.05") * Decimal("0.5"), Money(3))  # 2.5 cents, half up
+        with self.assertRaises(TypeError):
+            Money.of(1) * Money.of(1)
+
+    def test_comparison_and_formatting(self):
+        self.assertLess(Money.of(1), 2)
+        self.assertEqual(Money.of(1), "1.00")
+        self.assertNotEqual(Money.of(1), "abc")
+        self.assertEqual(str(Money(1250)), "12.50")
+        self.assertEqual(float(Money(1250)), 12.5)
+        self.assertFalse(Money(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import unittest
+
+from benchmarks.query_budget import BUDGETS, check, measure
+
+# Sizes to seed (see benchmarks/query_budget.py for why the smallest is 1000)
+SIZES = [int(n) for n in os.environ.get("QUERY_BUDGET_SIZES", "1000 2000").split()]
+
+
+class QueryBudgetTest(unittest.TestCase):
+    """Every route in BUDGETS within its statement and allocation budget, flat across SIZES."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = measure(SIZES)
+        cls.problems = check(cls.results)
+
+    def test_routes_within_budget(self):
+        for name, *_ in BUDGETS:
+            with self.subTest(route=name):
+                self.assertEqual(self.problems[name], [], f"{name}: {self.results[name]}")
+
+
+if __name__ == "__main__":
+    unittest.main()
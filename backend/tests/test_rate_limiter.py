@@ -0,0 +1,76 @@
+import threading
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+from app import create_app
+from config import Config
+from services.rate_limiter import MemoryBucketStore, RateLimiter
+
+
+class MemoryBucketStoreTest(unittest.TestCase):
+    def test_limits_a_key(self):
+        store = MemoryBucketStore(max_keys=10)
+        self.assertEqual([store.take("k", 2, 0.001)[0] for _ in range(3)], [True, True, False])
+
+    def test_size_stays_bounded(self):
+        store = MemoryBucketStore(max_keys=100, evict_batch=10)
+        for i in range(1000):
+            store.take(f"k{i}", 5, 0.001)
+        self.assertLessEqual(len(store._buckets), 100)
+
+    def test_evicts_least_recently_used(self):
+        store = MemoryBucketStore(max_keys=3, evict_batch=1)
+        store.take("old", 1, 0.001)
+        store.take("busy", 1, 0.001)
+        store.take("other", 1, 0.001)
+        store.take("old", 1, 0.001)  # touched again: "busy" is now the oldest
+        store.take("new", 1, 0.001)
+        self.assertEqual(list(store._buckets), ["other", "old", "new"])
+        # "old" kept its (empty) bucket
+        self.assertFalse(store.take("old", 1, 0.001)[0])
+
+    def test_eviction_cannot_drop_a_bucket_being_written(self):
+        store = MemoryBucketStore(max_keys=1, evict_batch=1)
+        armed = False
+
+        class Buckets(OrderedDict):
+            def __setitem__(self, key, value):
+                super().__setitem__(key, value)
+                if armed and key == "k":
+                    # a new key, taken right after this write, evicts the oldest
+                    evicting = threading.Thread(target=store.take, args=("new", 1, 0.001))
+                    evicting.start()
+                    evicting.join(0.1)
+
+        store._buckets = Buckets()
+        store.take("k", 2, 0.001)
+        armed = True
+        self.assertTrue(store.take("k", 2, 0.001)[0])
+
+
+class ClientKeyTest(unittest.TestCase):
+    def client_key(self, hops, forwarded=None):
+        with mock.patch.object(Config, "RATE_LIMIT_TRUST_PROXY", hops):
+            app = create_app()
+        headers = {"X-Forwarded-For": forwarded} if forwarded else {}
+        with app.test_request_context(headers=headers, environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+            return RateLimiter._client()
+
+    def test_peer_address_without_trusted_proxies(self):
+        self.assertEqual(self.client_key(0, "1.1.1.1"), "10.0.0.1")
+
+    def test_spoofed_entries_are_ignored(self):
+        for spoofed in ("1.1.1.1", "2.2.2.2, 3.3.3.3"):
+            self.assertEqual(self.client_key(1, f"{spoofed}, 9.9.9.9"), "9.9.9.9")
+
+    def test_counts_hops_from_the_right(self):
+        self.assertEqual(self.client_key(2, "1.1.1.1, 9.9.9.9, 10.0.0.2"), "9.9.9.9")
+
+    def test_falls_back_to_the_peer_when_hops_are_missing(self):
+        self.assertEqual(self.client_key(2, "9.9.9.9"), "10.0.0.1")
+        self.assertEqual(self.client_key(1), "10.0.0.1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.beneficiary import Beneficiary
+from models.ledger import LedgerEntry
+from models.money import Money
+from models.transaction import Transaction
+from models.user import User
+from models.wallet import Wallet
+from services.ledger_service import LedgerService
+from services.transfer_service import TransferService
+from tests.base import AppTestCase
+
+
+class SendBatchTest(AppTestCase):
+    """Alice (100.00) pays Bob (registered) and Carol (not registered)."""
+
+    def setUp(self):
+        super().setUp()
+        self.alice = self.make_user(1)
+        self.bob = self.make_user(2)
+        wallets = [Wallet(user_id=self.alice.id, balance=0), Wallet(user_id=self.bob.id, balance=0)]
+        db.session.add_all(wallets)
+        db.session.flush()
+        self.alice_wallet, self.bob_wallet = (w.id for w in wallets)
+        TransferService.apply([(self.alice_wallet, Money.of(100))])
+        self.to_bob = Beneficiary(user_id=self.alice.id, name="Bob", phone=self.bob.phone)
+        self.to_carol = Beneficiary(user_id=self.alice.id, name="Carol", phone="+254700000099")
+        db.session.add_all([self.to_bob, self.to_carol])
+        db.session.commit()
+
+    def make_user(self, i):
+        user = User(email=f"u{i}@example.com", password_hash="x", first_name="U", last_name=str(i),
+                    phone=f"+25470000000{i}")
+        db.session.add(user)
+        db.session.flush()
+        return user
+
+    def send(self, items, mode=None):
+        body = {"items": items}
+        if mode:
+            body["mode"] = mode
+        return self.client.post("/api/transactions/send/batch", headers=self.auth(self.alice),
+                                json=body)
+
+    def balances(self):
+        db.session.expire_all()
+        return (db.session.get(Wallet, self.alice_wallet).balance,
+                db.session.get(Wallet, self.bob_wallet).balance)
+
+    def count(self, model):
+        return db.session.scalar(select(func.count()).select_from(model))
+
+    def assert_untouched(self):
+        self.assertEqual(self.balances(), (Money.of(100), Money.of(0)))
+        self.assertEqual(self.count(Transaction), 0)
+        self.assertEqual(self.count(LedgerEntry), 1)  # the opening credit only
+
+    def test_all_or_nothing_pays_every_item(self):
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 30},
+                              {"beneficiaryId": self.to_carol.id, "amount": 20}])
+        self.assertEqual(response.status_code, 200, response.get_json())
+        data = response.get_json()
+        self.assertEqual((data["mode"], data["completed"], data["failed"]), ("all_or_nothing", 2, 0))
+        self.assertEqual(data["totalDebited"], 50.5)
+        self.assertEqual([i["status"] for i in data["items"]], ["completed", "completed"])
+        self.assertEqual(self.balances(), (Money.of("49.50"), Money.of(30)))
+        # two sends plus Bob's receive
+        self.assertEqual(self.count(Transaction), 3)
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+    def test_all_or_nothing_rejects_a_partly_invalid_batch(self):
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 30},
+                              {"beneficiaryId": 9999, "amount": 20},
+                              {"beneficiaryId": self.to_carol.id, "amount": -5}])
+        self.assertEqual(response.status_code, 400)
+        items = response.get_json()["items"]
+        self.assertEqual([i["status"] for i in items], ["skipped", "failed", "failed"])
+        self.assertEqual(items[1]["error"], "Beneficiary not found or does not belong to you")
+        self.assertEqual(items[2]["error"], "A valid amount is required")
+        self.assert_untouched()
+
+    def test_all_or_nothing_checks_the_balance_for_the_whole_batch(self):
+        # each fits on its own, together with the fees they do not
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 50},
+                              {"beneficiaryId": self.to_carol.id, "amount": 50}])
+        self.assertEqual(response.status_code, 400)
+        items = response.get_json()["items"]
+        self.assertEqual([i["status"] for i in items], ["skipped", "failed"])
+        self.assertEqual(items[1]["error"], "Insufficient funds")
+        self.assert_untouched()
+
+    def test_best_effort_pays_what_is_valid_and_fits(self):
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 60},
+                              {"beneficiaryId": self.to_carol.id, "amount": 60},
+                              {"beneficiaryId": 9999, "amount": 1},
+                              {"beneficiaryId": self.to_carol.id, "amount": 30}],
+                             mode="best_effort")
+        self.assertEqual(response.status_code, 200, response.get_json())
+        data = response.get_json()
+        self.assertEqual((data["completed"], data["failed"]), (2, 2))
+        self.assertEqual([i["status"] for i in data["items"]],
+                         ["completed", "failed", "failed", "completed"])
+        self.assertEqual(data["items"][1]["error"], "Insufficient funds")
+        self.assertEqual(data["totalDebited"], 90.9)
+        self.assertEqual(self.balances(), (Money.of("9.10"), Money.of(60)))
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+    def test_best_effort_with_nothing_payable_moves_nothing(self):
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 500}], mode="best_effort")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["completed"], 0)
+        self.assert_untouched()
+
+    def test_foreign_beneficiary_is_not_paid(self):
+        other = Beneficiary(user_id=self.bob.id, name="Alice", phone=self.alice.phone)
+        db.session.add(other)
+        db.session.commit()
+        response = self.send([{"beneficiaryId": other.id, "amount": 10}], mode="best_effort")
+        self.assertEqual(response.get_json()["items"][0]["status"], "failed")
+        self.assert_untouched()
+
+    def test_request_validation(self):
+        self.assertEqual(self.send([]).status_code, 400)
+        self.assertEqual(self.send([1, 2]).status_code, 400)
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 1}], mode="some")
+        self.assertEqual(response.status_code, 400)
+        self.app.config["TRANSFER_BATCH_MAX_ITEMS"] = 1
+        response = self.send([{"beneficiaryId": self.to_bob.id, "amount": 1}] * 2)
+        self.assertEqual(response.status_code, 400)
+        self.assert_untouched()
+
+
+if __name__ == "__main__":
+    unittest.main()
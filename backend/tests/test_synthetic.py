@@ -0,0 +1,47 @@
+import unittest
+
+from sqlalchemy import select
+
+from database import synthetic
+from extensions import db
+from models.ledger import LedgerEntry
+from models.transaction import Transaction
+from models.user import User
+from services.ledger_service import LedgerService
+from tests.base import AppTestCase
+
+
+class SyntheticDataTest(AppTestCase):
+    def dataset(self, seed):
+        db.drop_all()
+        db.create_all()
+        synthetic.generate(20, 200, seed=seed)
+        return (
+            db.session.execute(select(User.id, User.first_name, User.phone, User.created_at)
+                               .order_by(User.id)).all(),
+            db.session.execute(select(Transaction.id, Transaction.user_id, Transaction.type,
+                                      Transaction.status, Transaction.amount,
+                                      Transaction.created_at).order_by(Transaction.id)).all(),
+            db.session.execute(select(LedgerEntry.wallet_id, LedgerEntry.amount)
+                               .order_by(LedgerEntry.id)).all(),
+        )
+
+    def test_same_seed_same_data(self):
+        self.assertEqual(self.dataset(7), self.dataset(7))
+
+    def test_different_seed_different_data(self):
+        self.assertNotEqual(self.dataset(7)[1], self.dataset(8)[1])
+
+    def test_history_ends_at_the_default_end(self):
+        self.dataset(7)
+        latest = db.session.scalar(select(Transaction.created_at)
+                                   .order_by(Transaction.created_at.desc()).limit(1))
+        self.assertLess(latest, synthetic.DEFAULT_END)
+
+    def test_ledger_consistent(self):
+        self.dataset(7)
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
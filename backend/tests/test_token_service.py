@@ -0,0 +1,94 @@
+import datetime
+import time
+import unittest
+from unittest import mock
+
+from sqlalchemy import update
+
+from extensions import db
+from models.user import User
+from services.token_service import InvalidToken, TokenService
+from tests.base import AppTestCase
+
+
+class TokenServiceTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User(email="u@example.com", password_hash="x", first_name="U", last_name="U",
+                         phone="+254700000001")
+        db.session.add(self.user)
+        db.session.commit()
+
+    def test_round_trip(self):
+        token = TokenService.issue(self.user.id, "user")
+        self.assertEqual(TokenService.verify(token), (self.user.id, "user"))
+
+    def test_tampering_is_rejected(self):
+        token = TokenService.issue(self.user.id, "user")
+        payload, _, sig = token.rpartition(".")
+        user_id, role, issued_ms, expires = payload.split(".")
+        forged = [
+            f"{user_id}.admin.{issued_ms}.{expires}.{sig}",           # escalated role
+            f"{int(user_id) + 1}.{role}.{issued_ms}.{expires}.{sig}",  # someone else
+            f"{payload}.{int(expires) + 86400}.{sig}",               # extra field
+            f"{user_id}.{role}.{issued_ms}.{int(expires) + 86400}.{sig}",  # longer life
+            f"{payload}.{'B' if sig[0] == 'A' else 'A'}{sig[1:]}",  # altered signature
+            "", "garbage", f"{payload}.",
+        ]
+        for bad in forged:
+            with self.subTest(token=bad), self.assertRaises(InvalidToken):
+                TokenService.verify(bad)
+
+    def test_other_secret_is_rejected(self):
+        token = TokenService.issue(self.user.id, "user")
+        self.app.config["SECRET_KEY"] = "another-secret"
+        TokenService.init_app(self.app)
+        with self.assertRaises(InvalidToken):
+            TokenService.verify(token)
+
+    def test_expiry(self):
+        token = TokenService.issue(self.user.id, "user")
+        expires = int(token.split(".")[3])
+        with mock.patch("services.token_service.time.time", return_value=expires - 1):
+            TokenService.verify(token)
+        with mock.patch("services.token_service.time.time", return_value=expires):
+            with self.assertRaisesRegex(InvalidToken, "expired"):
+                TokenService.verify(token)
+
+    def test_revoke_rejects_earlier_tokens_only(self):
+        old = TokenService.issue(self.user.id, "user")
+        TokenService.revoke(self.user)
+        db.session.commit()
+        time.sleep(0.002)
+        new = TokenService.issue(self.user.id, "user")
+        with self.assertRaisesRegex(InvalidToken, "revoked"):
+            TokenService.verify(old)
+        self.assertEqual(TokenService.verify(new), (self.user.id, "user"))
+
+    def test_revocation_from_another_worker_arrives_on_refresh(self):
+        token = TokenService.issue(self.user.id, "user")
+        TokenService.verify(token)  # syncs; next sync in AUTH_REVOCATION_REFRESH
+        time.sleep(0.002)
+        db.session.execute(update(User).where(User.id == self.user.id)
+                           .values(tokens_revoked_at=datetime.datetime.utcnow()))
+        db.session.commit()
+        TokenService.verify(token)  # not seen before the refresh
+        TokenService._next_refresh = 0.0
+        with self.assertRaisesRegex(InvalidToken, "revoked"):
+            TokenService.verify(token)
+
+    def test_role_change_logs_the_user_out(self):
+        admin = User(email="a@example.com", password_hash="x", first_name="A", last_name="A",
+                     phone="+254700000002", role="admin")
+        db.session.add(admin)
+        db.session.commit()
+        headers = self.auth(self.user)
+        self.assertEqual(self.client.get("/api/auth/profile", headers=headers).status_code, 200)
+        response = self.client.patch(f"/api/admin/users/{self.user.id}/status",
+                                     json={"role": "deactivated"}, headers=self.auth(admin))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/api/auth/profile", headers=headers).status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from extensions import db
+from models.transaction import Transaction
+from models.user import User
+from tests.base import AppTestCase
+
+
+class HistoryTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User(email="u@example.com", password_hash="x", first_name="U", last_name="U",
+                         phone="+254700000001")
+        db.session.add(self.user)
+        db.session.flush()
+        rows = [("send", 10, "completed", "Rent 100%"), ("send", 20, "reversed", "Groceries"),
+                ("receive", 5, "completed", "Lunch"), ("deposit", 50, "completed", "M-Pesa deposit"),
+                ("deposit", 70, "pending", "M-Pesa deposit")]
+        db.session.add_all(Transaction(user_id=self.user.id, type=type_, amount=amount, fee=0,
+                                       status=status, description=description)
+                           for type_, amount, status, description in rows)
+        db.session.commit()
+
+    def get(self, path, **params):
+        response = self.client.get(path, headers=self.auth(self.user), query_string=params)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()
+
+    def test_pages_follow_the_cursor(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = self.get("/api/transactions/", **params)
+            seen += [t["id"] for t in page["transactions"]]
+            cursor = page["nextCursor"]
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_search_matches_a_substring_literally(self):
+        page = self.get("/api/transactions/", q="rent 100%")
+        self.assertEqual([t["description"] for t in page["transactions"]], ["Rent 100%"])
+        self.assertEqual(self.get("/api/transactions/", q="%")["transactions"][0]["description"],
+                         "Rent 100%")
+        self.assertEqual(len(self.get("/api/transactions/", q="m-pesa", type="deposit")
+                             ["transactions"]), 2)
+
+    def test_summary_covers_the_whole_history(self):
+        summary = self.get("/api/transactions/summary")
+        self.assertEqual(summary["count"], 5)
+        self.assertEqual(summary["byType"], {
+            "send": {"count": 2, "volume": 10.0},
+            "receive": {"count": 1, "volume": 5.0},
+            "deposit": {"count": 2, "volume": 50.0},
+        })
+        self.assertEqual(self.get("/api/transactions/summary", type="receive")["count"], 1)
+
+    def test_summary_is_per_user(self):
+        other = User(email="o@example.com", password_hash="x", first_name="O", last_name="O",
+                     phone="+254700000002")
+        db.session.add(other)
+        db.session.commit()
+        self.assertEqual(self.client.get("/api/transactions/summary", headers=self.auth(other))
+                         .get_json(), {"count": 0, "byType": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from extensions import db
+from models.transaction import Transaction
+from models.user import User
+from schemas.transaction_schema import transactions_schema
+from tests.base import AppTestCase
+
+
+class TransactionListQueryCountTest(AppTestCase):
+    """Dumping or listing N transactions costs the same statements for any N."""
+
+    def setUp(self):
+        super().setUp()
+        users = [User(email=f"u{i}@example.com", password_hash="x", first_name="U",
+                      last_name=str(i), phone=f"+2547{i:08d}",
+                      role="admin" if i == 0 else "user")
+                 for i in range(10)]
+        db.session.add_all(users)
+        db.session.commit()
+        self.admin_headers = self.auth(users[0])
+        self.user_ids = [u.id for u in users]
+        self.total = 0
+
+    def grow_to(self, n):
+        """Add transactions (spread over the users) until there are n."""
+        db.session.add_all(Transaction(user_id=self.user_ids[i % len(self.user_ids)], type="deposit",
+                                       amount=100 + i, fee=0, status="completed")
+                           for i in range(self.total, n))
+        db.session.commit()
+        db.session.expunge_all()
+        self.total = n
+
+    def dump_statements(self, n):
+        self.grow_to(n)
+        transactions = Transaction.query.all()
+        data, count = self.count_statements(transactions_schema.dump, transactions)
+        self.assertEqual(len(data), n)
+        self.assertNotIn("Unknown", {t["user_name"] for t in data})
+        db.session.expunge_all()
+        return count
+
+    def list_statements(self, n):
+        self.grow_to(n)
+        response, count = self.count_statements(
+            self.client.get, "/api/admin/transactions", headers=self.admin_headers,
+            query_string={"limit": 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json["transactions"]), n)
+        return count
+
+    def test_schema_dump_prefetches_users(self):
+        self.assertEqual(self.dump_statements(10), 1)  # the users' IN-list query
+        self.assertEqual(self.dump_statements(100), 1)
+
+    def test_admin_list_is_constant(self):
+        self.list_statements(1)  # first request syncs token revocations
+        self.assertEqual(self.list_statements(10), self.list_statements(100))
+
+if __name__ == "__main__":
+    unittest.main()
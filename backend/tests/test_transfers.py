@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.beneficiary import Beneficiary
+from models.ledger import LedgerEntry
+from models.money import Money
+from models.transaction import Transaction
+from models.user import User
+from models.wallet import Wallet
+from services.ledger_service import LedgerService
+from services.transfer_service import InsufficientFundsError, TransferService
+from tests.base import AppTestCase
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TransferTestCase(AppTestCase):
+    """Alice (100.00) pays Bob (0.00), a registered beneficiary."""
+
+    def setUp(self):
+        super().setUp()
+        self.alice = self.make_user(1)
+        self.bob = self.make_user(2)
+        self.alice_wallet = Wallet(user_id=self.alice.id, balance=0)
+        self.bob_wallet = Wallet(user_id=self.bob.id, balance=0)
+        db.session.add_all([self.alice_wallet, self.bob_wallet])
+        db.session.flush()
+        TransferService.apply([(self.alice_wallet.id, Money.of(100))])
+        self.beneficiary = Beneficiary(user_id=self.alice.id, name="Bob", phone=self.bob.phone)
+        db.session.add(self.beneficiary)
+        db.session.commit()
+
+    def make_user(self, i):
+        user = User(email=f"u{i}@example.com", password_hash="x", first_name="U", last_name=str(i),
+                    phone=f"+25470000000{i}")
+        db.session.add(user)
+        db.session.flush()
+        return user
+
+    def balances(self):
+        db.session.expire_all()
+        return (db.session.get(Wallet, self.alice_wallet.id).balance,
+                db.session.get(Wallet, self.bob_wallet.id).balance)
+
+    def count(self, model):
+        return db.session.scalar(select(func.count()).select_from(model))
+
+
+class GuardedDebitTest(TransferTestCase):
+    def test_debit_within_balance(self):
+        TransferService.debit(self.alice_wallet.id, Money.of(100))
+        db.session.commit()
+        self.assertEqual(self.balances()[0], Money.of(0))
+
+    def test_debit_past_balance_changes_nothing(self):
+        with self.assertRaises(InsufficientFundsError):
+            TransferService.debit(self.alice_wallet.id, Money.of("100.01"))
+        db.session.rollback()
+        self.assertEqual(self.balances(), (Money.of(100), Money.of(0)))
+        self.assertEqual(self.count(LedgerEntry), 1)  # the opening credit only
+
+    def test_guard_is_evaluated_in_the_update(self):
+        # a stale in-session balance must not let the debit through
+        db.session.execute(Wallet.__table__.update().where(Wallet.id == self.alice_wallet.id)
+                           .values(balance=Money.of(10)))
+        db.session.commit()
+        with self.assertRaises(InsufficientFundsError):
+            TransferService.debit(self.alice_wallet.id, Money.of(50))
+        db.session.rollback()
+        self.assertEqual(self.balances()[0], Money.of(10))
+
+    def test_bulk_guard_rejects_the_whole_batch(self):
+        movements = [(self.alice_wallet.id, -Money.of(60), None),
+                     (self.bob_wallet.id, Money.of(60), None),
+                     (self.alice_wallet.id, -Money.of(60), None),
+                     (self.bob_wallet.id, Money.of(60), None)]
+        with self.assertRaises(InsufficientFundsError):
+            TransferService.apply_bulk(movements)
+        db.session.rollback()
+        self.assertEqual(self.balances(), (Money.of(100), Money.of(0)))
+        self.assertEqual(self.count(LedgerEntry), 1)
+
+
+class SendRollbackTest(TransferTestCase):
+    def send(self, amount):
+        return self.client.post("/api/transactions/send", headers=self.auth(self.alice),
+                                json={"beneficiaryId": self.beneficiary.id, "amount": amount})
+
+    def test_send_moves_amount_and_fee(self):
+        response = self.send(50)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(self.balances(), (Money.of("49.50"), Money.of(50)))
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+    def test_insufficient_funds_rolls_everything_back(self):
+        response = self.send(100)  # plus the 1% fee
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["error"], "Insufficient funds")
+        self.assertEqual(self.balances(), (Money.of(100), Money.of(0)))
+        self.assertEqual(self.count(Transaction), 0)
+        self.assertEqual(self.count(LedgerEntry), 1)
+        self.assertTrue(LedgerService.reconcile()["ok"])
+
+    def test_later_send_still_works_after_a_rollback(self):
+        self.send(100)
+        self.assertEqual(self.send(10).status_code, 200)
+        self.assertEqual(self.balances(), (Money.of("89.90"), Money.of(10)))
+        self.assertEqual(self.count(Transaction), 2)
+
+
+class StressTransfersTest(unittest.TestCase):
+    def test_small_run_keeps_the_invariants(self):
+        env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}  # its own SQLite file
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.stress_transfers",
+             "--users", "5", "--transfers", "60", "--threads", "4", "--balance", "100"],
+            cwd=BACKEND, env=env, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("OK: money conserved", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,2 @@
+from .pagination import encode_cursor, decode_cursor, keyset_paginate, parse_limit
+from .filters import parse_transaction_filters, apply_transaction_filters
@@ -0,0 +1,31 @@
+from functools import wraps
+from flask import g, make_response, request
+from services.user_version import UserVersionService
+
+
+def user_etag(f):
+    """
+    Conditional GET for a view that only shows the current user's data.
+
+    The ETag is the user's change counter (UserVersion), so a matching
+    If-None-Match costs one primary-key lookup and the view never runs.
+    The version is read before the view, so a change committed in between
+    only makes the next request miss. The view must read what it shows
+    from the DB (or EntityCache's request tier, never shared=True): a body
+    older than the version would be pinned under its ETag by every 304
+    until the next change. Goes under @login_required.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        etag = f"u{g.user_id}.v{UserVersionService.current(g.user_id)}"
+        if request.if_none_match.contains_weak(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        # the browser may keep the body but must revalidate every time
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return decorated_function
@@ -0,0 +1,89 @@
+import datetime
+from sqlalchemy import or_
+from models.money import Money
+from models.transaction import Transaction
+
+TRANSACTION_TYPES = {"send", "receive", "deposit", "refund"}
+TRANSACTION_STATUSES = {"completed", "pending", "failed", "reversed"}
+
+
+def _parse_date(value, end_of_day=False):
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}' (expected ISO 8601)")
+    # A bare date in 'to' means "through the end of that day"
+    if end_of_day and len(value) == 10:
+        parsed += datetime.timedelta(days=1)
+    return parsed
+
+
+def _parse_amount(value, name):
+    try:
+        amount = Money.of(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{value}'")
+    if amount < 0:
+        raise ValueError(f"{name} must be >= 0")
+    return amount
+
+
+def parse_transaction_filters(args):
+    """
+    Turn request query args into a validated filter dict.
+    Supported keys: type, status, from, to, minAmount, maxAmount and q
+    (substring of the description or recipient name). The rollup-backed
+    analytics only apply type, status and the dates.
+    """
+    filters = {}
+
+    if args.get("type"):
+        if args["type"] not in TRANSACTION_TYPES:
+            raise ValueError(f"Invalid type '{args['type']}'")
+        filters["type"] = args["type"]
+    if args.get("status"):
+        if args["status"] not in TRANSACTION_STATUSES:
+            raise ValueError(f"Invalid status '{args['status']}'")
+        filters["status"] = args["status"]
+
+    if args.get("from"):
+        filters["date_from"] = _parse_date(args["from"])
+    if args.get("to"):
+        filters["date_to"] = _parse_date(args["to"], end_of_day=True)
+
+    if args.get("minAmount"):
+        filters["min_amount"] = _parse_amount(args["minAmount"], "minAmount")
+    if args.get("maxAmount"):
+        filters["max_amount"] = _parse_amount(args["maxAmount"], "maxAmount")
+
+    if args.get("q", "").strip():
+        filters["search"] = args["q"].strip()
+
+    return filters
+
+
+def apply_transaction_filters(query, filters):
+    """
+    Apply a dict produced by parse_transaction_filters to a Transaction query
+    (or Core select). Callers may add 'user_id' themselves.
+    """
+    if "user_id" in filters:
+        query = query.filter(Transaction.user_id == filters["user_id"])
+    if "type" in filters:
+        query = query.filter(Transaction.type == filters["type"])
+    if "status" in filters:
+        query = query.filter(Transaction.status == filters["status"])
+    if "date_from" in filters:
+        query = query.filter(Transaction.created_at >= filters["date_from"])
+    if "date_to" in filters:
+        query = query.filter(Transaction.created_at < filters["date_to"])
+    if "min_amount" in filters:
+        query = query.filter(Transaction.amount >= filters["min_amount"])
+    if "max_amount" in filters:
+        query = query.filter(Transaction.amount <= filters["max_amount"])
+    if "search" in filters:
+        query = query.filter(or_(
+            Transaction.description.icontains(filters["search"], autoescape=True),
+            Transaction.recipient_name.icontains(filters["search"], autoescape=True),
+        ))
+    return query
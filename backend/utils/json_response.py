@@ -0,0 +1,39 @@
+from flask import current_app, jsonify
+from services.request_metrics import RequestMetrics
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to Flask's encoder
+    orjson = None
+
+
+def _unsupported(obj):
+    raise TypeError
+
+
+def json_response(payload, status=200):
+    """
+    jsonify() for large list payloads: the same bytes, encoded with orjson
+    when it is installed.
+
+    orjson output only equals Flask's (sorted keys, compact separators,
+    ASCII-escaped) when the payload is plain JSON types and ASCII text, so
+    anything else (non-ASCII names, datetimes, Decimals, ...), debug mode
+    or a missing orjson goes through jsonify(). Floats must be ordinary
+    money values (no exponent notation), which is all the list endpoints
+    send.
+    """
+    if orjson is not None and not current_app.debug and current_app.json.compact is not False:
+        try:
+            body = RequestMetrics.timed_serialize(
+                orjson.dumps, payload, default=_unsupported,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+        except TypeError:
+            body = None
+        if body is not None and body.isascii():
+            return current_app.response_class(body + b"\n", status=status,
+                                              mimetype=current_app.json.mimetype)
+    response = jsonify(payload)
+    response.status_code = status
+    return response
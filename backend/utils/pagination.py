@@ -0,0 +1,66 @@
+import base64
+import datetime
+import json
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at, row_id):
+    """
+    Encode a (created_at, id) keyset position as an opaque URL‑safe token.
+    """
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Inverse of encode_cursor. Raises ValueError on anything malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.datetime.fromisoformat(created_at) if created_at else None
+        return created_at, int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_paginate(query, model, limit, cursor=None):
+    """
+    Page through `query` newest‑first on (created_at, id).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Each page is a single index range scan no matter how deep it is.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+
+    rows = (
+        query
+        .order_by(model.created_at.desc(), model.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+def parse_limit(value, default, maximum):
+    """
+    Validate a ?limit= query arg, clamping it to `maximum`.
+    """
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid limit '{value}'")
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    return min(limit, maximum)
@@ -1,3 +1,14 @@
+import os
+
+# Under the eventlet worker (see Dockerfile) patch the stdlib and psycopg2
+# before anything imports them, so DB and HTTP calls yield to other
+# connections instead of blocking the whole worker
+if os.environ.get("SOCKETIO_ASYNC_MODE") == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+    from eventlet.support.psycopg2_patcher import make_psycopg_green
+    make_psycopg_green()
+
 from app import create_app
 from database.db_init import init_db  # your init logic
 
@@ -8,4 +19,4 @@ app = create_app()
 with app.app_context():
     init_db(app)
 
-# Gunicorn will serve app
\ No newline at end of file
+# Gunicorn will serve app
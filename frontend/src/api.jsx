@@ -28,6 +28,14 @@ const _callApi = async (endpoint, method = "GET", data = null, token = null) =>
   }
 };
 
+// "?a=1&b=2" from an object, skipping empty values and "all"
+const _query = (params = {}) => {
+  const qs = new URLSearchParams(
+    Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== "" && v !== "all")
+  ).toString();
+  return qs ? `?${qs}` : "";
+};
+
 export const api = {
   // — Auth —
   login: async (email, password) => {
@@ -74,11 +82,17 @@ export const api = {
     return { wallet: response };
   },
 
-  // Add funds via M-Pesa STK (backend expects amount & phone_number)
+  // Add funds via M-Pesa STK (backend expects amount & phone_number).
+  // Returns the 202 body: { transactionId, dispatchStatus, ... }
   addFunds: async (amount, phone_number) => {
     const token = localStorage.getItem("authToken");
-    const response = await _callApi("/wallet/add-funds", "POST", { amount, phone: phone_number }, token);
-    return { wallet: response };
+    return await _callApi("/wallet/add-funds", "POST", { amount, phone: phone_number }, token);
+  },
+
+  // Deposit outcome: { status: "pending" | "completed" | "failed", ... }
+  getTxnStatus: async (transactionId) => {
+    const token = localStorage.getItem("authToken");
+    return await _callApi(`/wallet/tx-status/${transactionId}`, "GET", null, token);
   },
 
   downloadStatement: async () => {
@@ -127,10 +141,20 @@ export const api = {
   },
 
   // — Transactions —
-  getTransactions: async () => {
+  // One page, newest first. `filters` are the server's query params (type,
+  // status, from, to, q, ...); pass the returned nextCursor for the next page
+  getTransactions: async (filters = {}, cursor = null) => {
+    const token = localStorage.getItem("authToken");
+    const { transactions, nextCursor } = await _callApi(
+      `/transactions/${_query({ ...filters, cursor })}`, "GET", null, token
+    );
+    return { transactions, nextCursor };
+  },
+
+  // { count, byType: { send: { count, volume }, ... } } over the whole history
+  getTransactionSummary: async (filters = {}) => {
     const token = localStorage.getItem("authToken");
-    const { transactions } = await _callApi("/transactions/", "GET", null, token);
-    return { transactions };
+    return await _callApi(`/transactions/summary${_query(filters)}`, "GET", null, token);
   },
 
   sendMoney: async (sendData) => {
@@ -147,10 +171,19 @@ export const api = {
     return { users };
   },
 
-  getAllTransactions: async () => {
+  // Same paging and filters as getTransactions, plus userId
+  getAllTransactions: async (filters = {}, cursor = null) => {
+    const token = localStorage.getItem("authToken");
+    const { transactions, nextCursor } = await _callApi(
+      `/admin/transactions${_query({ ...filters, cursor })}`, "GET", null, token
+    );
+    return { transactions, nextCursor };
+  },
+
+  // { count, volume, feeRevenue, breakdown } from the analytics rollups
+  getAnalyticsSummary: async (filters = {}) => {
     const token = localStorage.getItem("authToken");
-    const { transactions } = await _callApi("/admin/transactions", "GET", null, token);
-    return { transactions };
+    return await _callApi(`/admin/analytics/summary${_query(filters)}`, "GET", null, token);
   },
 
   getUserDetails: async (userId) => {
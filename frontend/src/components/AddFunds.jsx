@@ -26,6 +26,7 @@ const normalizePhone = (p) => {
 }
 
 const QUICK_AMOUNTS = [1000, 5000, 10000]
+const MAX_POLLS = 60  // ~1 min for the customer to enter their PIN
 
 const AddFunds = () => {
   useMpesaSocket()  // ← start listening for callback events
@@ -34,7 +35,9 @@ const AddFunds = () => {
   const navigate = useNavigate()
 
   const { user } = useSelector((s) => s.auth)
-  const { wallet, status, error, polling, pendingCheckoutId } = useSelector((s) => s.wallet)
+  const { wallet, status, error, polling, pendingDepositId, depositResult } = useSelector(
+    (s) => s.wallet
+  )
 
   const [amount, setAmount] = useState("")
   const [phoneNumber, setPhoneNumber] = useState("")
@@ -46,7 +49,6 @@ const AddFunds = () => {
   // refs to avoid re-renders
   const startBalanceRef = useRef(null)
   const triesRef = useRef(0)
-  const timeoutRef = useRef(null)
 
   // initial load
   useEffect(() => {
@@ -55,29 +57,32 @@ const AddFunds = () => {
     dispatch(fetchWalletBalance())
   }, [dispatch, user])
 
-  // poll every 1s (fallback)
+  // poll every 1s (fallback for the socket); the outcome lands in depositResult
   useEffect(() => {
-    if (!polling || !pendingCheckoutId) return
+    if (!polling || !pendingDepositId) return
 
     const id = setInterval(() => {
       triesRef.current += 1
-      dispatch(pollTxnStatus(pendingCheckoutId)).then((res) => {
-        const st = res?.payload?.status
-        if (st && st !== "pending") finishSuccess()
-      })
-      if (triesRef.current > 10) {
+      if (triesRef.current > MAX_POLLS) {
         dispatch(stopPolling())
         setLocalProcessing(false)
         setFormErrors({
           general:
             "Still waiting for M‑Pesa. If you approved, your wallet should update shortly.",
         })
-        clearTimeout(timeoutRef.current)
+        return
       }
+      dispatch(pollTxnStatus(pendingDepositId))
     }, 1000)
 
     return () => clearInterval(id)
-  }, [polling, pendingCheckoutId, dispatch])
+  }, [polling, pendingDepositId, dispatch])
+
+  // deposit settled (poll or socket)
+  useEffect(() => {
+    if (depositResult === "completed") finishSuccess()
+    else if (depositResult === "failed") finishFailure()
+  }, [depositResult])
 
   // fallback on balance change
   useEffect(() => {
@@ -137,7 +142,6 @@ const AddFunds = () => {
       .unwrap()
       .then(() => {
         toast.info("✅ STK Push sent! Check your phone.")
-        timeoutRef.current = setTimeout(() => finishSuccess(), 15000)
       })
       .catch((e) => {
         setFormErrors({ general: e.message || "Failed to initiate STK" })
@@ -146,15 +150,21 @@ const AddFunds = () => {
   }
 
   const finishSuccess = () => {
-    clearTimeout(timeoutRef.current)
     dispatch(stopPolling())
     dispatch(fetchWalletBalance())
-    dispatch(fetchTransactions(user.id))
+    dispatch(fetchTransactions())
     setTransactionComplete(true)
     setLocalProcessing(false)
     triesRef.current = 0
   }
 
+  const finishFailure = () => {
+    dispatch(stopPolling())
+    setLocalProcessing(false)
+    setFormErrors({ general: "M‑Pesa payment failed or was cancelled. Please try again." })
+    triesRef.current = 0
+  }
+
   const finish = () => navigate("/dashboard")
 
   const displayAmt = parseFloat(amount) || 0
@@ -1,11 +1,12 @@
 "use client"
 
-import { useEffect } from "react"
+import { useEffect, useState } from "react"
 import { useDispatch, useSelector } from "react-redux"
 import { Link } from "react-router-dom"
 import { fetchWalletBalance } from "../features/wallet/walletSlice"
 import { fetchTransactions } from "../features/transactions/transactionsSlice"
 import { fetchBeneficiaries } from "../features/beneficiaries/beneficiariesSlice"
+import { api } from "../api"
 import TransactionItem from "./common/TransactionItem"
 import WalletCard from "./common/WalletCard"
 import LoadingSpinner from "./common/LoadingSpinner"
@@ -16,6 +17,8 @@ const Dashboard = () => {
   const { wallet, status: walletStatus } = useSelector((state) => state.wallet)
   const { transactions, status: transactionsStatus } = useSelector((state) => state.transactions)
   const { beneficiaries, status: beneficiariesStatus } = useSelector((state) => state.beneficiaries)
+  // Totals over the whole history (the list below is only its first page)
+  const [summary, setSummary] = useState({ count: 0, byType: {} })
 
   // derive first name, last name, initials
   const firstName = user?.firstName || user?.first_name || ''
@@ -25,11 +28,17 @@ const Dashboard = () => {
   useEffect(() => {
     if (user) {
       dispatch(fetchWalletBalance(user.id))
-      dispatch(fetchTransactions(user.id))
+      dispatch(fetchTransactions())
       dispatch(fetchBeneficiaries(user.id))
+      api
+        .getTransactionSummary()
+        .then(setSummary)
+        .catch(() => {})
     }
   }, [dispatch, user])
 
+  const volume = (type) => summary.byType[type]?.volume || 0
+
   // Get recent transactions (last 5)
   const recentTransactions = transactions.slice(0, 5)
 
@@ -138,10 +147,7 @@ const Dashboard = () => {
                 <h3>Total Sent</h3>
                 <p className="stat-value">
                   {wallet?.currency}{" "}
-                  {transactions
-                    .filter((t) => t.type === "send")
-                    .reduce((sum, t) => sum + t.amount, 0)
-                    .toLocaleString()}
+                  {volume("send").toLocaleString()}
                 </p>
               </div>
 
@@ -149,16 +155,13 @@ const Dashboard = () => {
                 <h3>Total Received</h3>
                 <p className="stat-value">
                   {wallet?.currency}{" "}
-                  {transactions
-                    .filter((t) => t.type === "receive")
-                    .reduce((sum, t) => sum + t.amount, 0)
-                    .toLocaleString()}
+                  {volume("receive").toLocaleString()}
                 </p>
               </div>
 
               <div className="stat-card">
                 <h3>Transactions</h3>
-                <p className="stat-value">{transactions.length}</p>
+                <p className="stat-value">{summary.count}</p>
               </div>
 
               <div className="stat-card">
@@ -12,15 +12,22 @@ import autoTable from "jspdf-autotable"
 const Transactions = () => {
   const dispatch = useDispatch()
   const { user } = useSelector((state) => state.auth)
-  const { transactions, status, error, filters, sorting } = useSelector((state) => state.transactions)
+  const { transactions, nextCursor, loadingMore, status, error, filters, sorting } = useSelector(
+    (state) => state.transactions,
+  )
 
   const [searchTerm, setSearchTerm] = useState(filters.searchTerm || "")
 
+  // Filters are applied by the server; changing one reloads from the first page
   useEffect(() => {
     if (user) {
-      dispatch(fetchTransactions(user.id))
+      dispatch(fetchTransactions({ filters }))
     }
-  }, [dispatch, user])
+  }, [dispatch, user, filters])
+
+  const handleLoadMore = () => {
+    dispatch(fetchTransactions({ filters, cursor: nextCursor }))
+  }
 
   const handleFilterChange = (e) => {
     const { name, value } = e.target
@@ -54,16 +61,8 @@ const Transactions = () => {
     )
   }
 
-  const filteredTransactions = transactions.filter((transaction) => {
-    if (filters.type !== "all" && transaction.type !== filters.type) return false
-    if (filters.searchTerm && !transaction.description?.toLowerCase().includes(filters.searchTerm.toLowerCase())) {
-      return false
-    }
-    return true
-  })
-
-  
-  const sortedTransactions = [...filteredTransactions].sort((a, b) => {
+  // Pages arrive newest first; other orders apply to the pages loaded so far
+  const sortedTransactions = [...transactions].sort((a, b) => {
     if (sorting.field === "created_at_formatted") {
       // Handle missing or invalid created_at_formatted for sorting
       const dateA = a.created_at_formatted
@@ -207,6 +206,11 @@ const Transactions = () => {
           {sortedTransactions.map((transaction) => (
             <TransactionItem key={transaction.id} transaction={transaction} detailed={true} />
           ))}
+          {nextCursor && (
+            <button className="btn btn-outline" onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load More"}
+            </button>
+          )}
         </div>
       ) : (
         <div className="empty-state">
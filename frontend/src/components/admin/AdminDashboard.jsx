@@ -23,6 +23,7 @@ const AdminDashboard = () => {
 
   useEffect(() => {
     if (user && user.role === "admin") {
+      // first page only, for the recent list; totals come from the rollups
       dispatch(fetchAllTransactions())
       setUsersLoading(true)
       api
@@ -34,21 +35,23 @@ const AdminDashboard = () => {
         .catch(() => {
           setUsersLoading(false)
         })
+      api
+        .getAnalyticsSummary()
+        .then(({ count, volume, feeRevenue }) => {
+          setStats((prev) => ({
+            ...prev,
+            totalTransactions: count,
+            totalVolume: volume,
+            totalFees: feeRevenue,
+          }))
+        })
+        .catch(() => {})
     }
   }, [dispatch, user])
 
   useEffect(() => {
-    if (allTransactions.length > 0 && users.length > 0) {
-      const totalVolume = allTransactions.reduce((sum, t) => sum + (t.amount || 0), 0)
-      const totalFees = allTransactions.reduce((sum, t) => sum + (t.fee || 0), 0)
-      setStats({
-        totalUsers: users.length,
-        totalTransactions: allTransactions.length,
-        totalVolume,
-        totalFees,
-      })
-    }
-  }, [allTransactions, users])
+    setStats((prev) => ({ ...prev, totalUsers: users.length }))
+  }, [users])
 
   // Helper to get a user's display name (handles camel/snake)
   const getUserName = (u) =>
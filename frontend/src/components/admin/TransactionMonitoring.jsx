@@ -9,7 +9,9 @@ import LoadingSpinner from "../common/LoadingSpinner";
 const TransactionMonitoring = () => {
   const dispatch = useDispatch();
   const { user: currentUser } = useSelector((state) => state.auth);
-  const { allTransactions, status, error } = useSelector((state) => state.transactions);
+  const { allTransactions, allNextCursor, loadingMore, status, error } = useSelector(
+    (state) => state.transactions
+  );
 
   const [users, setUsers] = useState([]);
   const [usersLoading, setUsersLoading] = useState(true);
@@ -25,11 +27,11 @@ const TransactionMonitoring = () => {
     direction: "desc",
   });
   const [searchTerm, setSearchTerm] = useState("");
+  // Totals over every transaction, from the analytics rollups
+  const [summary, setSummary] = useState({ count: 0, volume: 0, feeRevenue: 0 });
 
   useEffect(() => {
     if (currentUser?.role === "admin") {
-      dispatch(fetchAllTransactions());
-
       setUsersLoading(true);
       api
         .getAllUsers()
@@ -37,8 +39,23 @@ const TransactionMonitoring = () => {
           setUsers(response.users);
         })
         .finally(() => setUsersLoading(false));
+      api
+        .getAnalyticsSummary()
+        .then(setSummary)
+        .catch(() => {});
+    }
+  }, [currentUser]);
+
+  // Filters are applied by the server; changing one reloads from the first page
+  useEffect(() => {
+    if (currentUser?.role === "admin") {
+      dispatch(fetchAllTransactions({ filters }));
     }
-  }, [dispatch, currentUser]);
+  }, [dispatch, currentUser, filters]);
+
+  const handleLoadMore = () => {
+    dispatch(fetchAllTransactions({ filters, cursor: allNextCursor }));
+  };
 
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
@@ -73,68 +90,14 @@ const TransactionMonitoring = () => {
   const handleReverse = async (transactionId) => {
     try {
       await api.reverseTransaction(transactionId);
-      dispatch(fetchAllTransactions());
+      dispatch(fetchAllTransactions({ filters }));
     } catch (err) {
       console.error("Reverse failed:", err);
     }
   };
 
-  // Filtering
-  const filteredTransactions = allTransactions.filter((tx) => {
-    if (filters.type !== "all" && tx.type !== filters.type) return false;
-    if (filters.status !== "all" && tx.status !== filters.status) return false;
-
-    const userId = tx.user_id ?? tx.userId;
-    if (filters.userId !== "all" && userId !== Number(filters.userId)) return false;
-
-    const dateVal = tx.created_at ?? tx.createdAt;
-    if (filters.dateRange !== "all" && dateVal) {
-      const txDate = new Date(dateVal);
-      const today = new Date();
-      if (filters.dateRange === "today") {
-        if (
-          txDate.getDate() !== today.getDate() ||
-          txDate.getMonth() !== today.getMonth() ||
-          txDate.getFullYear() !== today.getFullYear()
-        )
-          return false;
-      } else if (filters.dateRange === "week") {
-        const weekAgo = new Date();
-        weekAgo.setDate(today.getDate() - 7);
-        if (txDate < weekAgo) return false;
-      } else if (filters.dateRange === "month") {
-        const monthAgo = new Date();
-        monthAgo.setMonth(today.getMonth() - 1);
-        if (txDate < monthAgo) return false;
-      }
-    }
-
-    if (filters.searchTerm) {
-      const term = filters.searchTerm.toLowerCase();
-      const description = (tx.description || "").toLowerCase();
-      const recipient = (tx.recipient_name || tx.recipientName || "").toLowerCase();
-      const amount = String(tx.amount || "");
-      const userName =
-        tx.user_name ||
-        (() => {
-          const u = users.find((u) => u.id === userId);
-          return u ? `${u.firstName} ${u.lastName}` : "";
-        })().toLowerCase();
-
-      if (
-        !description.includes(term) &&
-        !recipient.includes(term) &&
-        !amount.includes(term) &&
-        !userName.includes(term)
-      )
-        return false;
-    }
-
-    return true;
-  });
-
-  // Sorting
-  const sortedTransactions = [...filteredTransactions].sort((a, b) => {
+  // Sorting (pages arrive newest first; other orders apply to the pages loaded so far)
+  const sortedTransactions = [...allTransactions].sort((a, b) => {
     if (sorting.field === "createdAt") {
       const ad = new Date(a.created_at ?? a.createdAt);
       const bd = new Date(b.created_at ?? b.createdAt);
@@ -161,23 +124,22 @@ const TransactionMonitoring = () => {
       <div className="monitoring-stats">
         <div className="stat-card">
           <h3>Total Transactions</h3>
-          <p className="stat-value">{allTransactions.length}</p>
+          <p className="stat-value">{summary.count}</p>
         </div>
         <div className="stat-card">
           <h3>Total Volume</h3>
-          <p className="stat-value">
-            KES {allTransactions.reduce((s, t) => s + Number(t.amount), 0).toLocaleString()}
-          </p>
+          <p className="stat-value">KES {summary.volume.toLocaleString()}</p>
         </div>
         <div className="stat-card">
           <h3>Total Fees</h3>
-          <p className="stat-value">
-            KES {allTransactions.reduce((s, t) => s + Number(t.fee), 0).toLocaleString()}
-          </p>
+          <p className="stat-value">KES {summary.feeRevenue.toLocaleString()}</p>
         </div>
         <div className="stat-card">
           <h3>Filtered Results</h3>
-          <p className="stat-value">{sortedTransactions.length}</p>
+          <p className="stat-value">
+            {sortedTransactions.length}
+            {allNextCursor ? "+" : ""}
+          </p>
         </div>
       </div>
 
@@ -268,6 +230,11 @@ const TransactionMonitoring = () => {
               })}
             </tbody>
           </table>
+          {allNextCursor && (
+            <button className="btn btn-outline" onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load More"}
+            </button>
+          )}
         </div>
       ) : (
         <div className="empty-state">
@@ -3,15 +3,32 @@ import { api } from "../../api"
 import { logout } from "../auth/authSlice"
 import { updateWalletBalance } from "../wallet/walletSlice"
 
+// UI filters ({ type, status, userId, dateRange, searchTerm }) -> server query params
+export const toQueryFilters = ({ dateRange, searchTerm, ...rest } = {}) => {
+  const query = { ...rest, q: searchTerm }
+  if (dateRange && dateRange !== "all") {
+    const from = new Date()
+    if (dateRange === "today") from.setHours(0, 0, 0, 0)
+    else from.setDate(from.getDate() - (dateRange === "week" ? 7 : 30))
+    query.from = from.toISOString().slice(0, 19) // created_at is naive UTC
+  }
+  return query
+}
+
 // Async thunks
 
-export const fetchTransactions = createAsyncThunk("transactions/fetchAll", async (userId, { rejectWithValue }) => {
-  try {
-    return await api.getTransactions(userId)
-  } catch (error) {
-    return rejectWithValue(error.message)
-  }
-})
+// { filters, cursor }: without a cursor the first page replaces the list,
+// with one the page is appended
+export const fetchTransactions = createAsyncThunk(
+  "transactions/fetchAll",
+  async ({ filters, cursor } = {}, { rejectWithValue }) => {
+    try {
+      return await api.getTransactions(toQueryFilters(filters), cursor)
+    } catch (error) {
+      return rejectWithValue(error.message)
+    }
+  },
+)
 
 
 export const sendMoney = createAsyncThunk("transactions/send", async (sendData, { rejectWithValue, dispatch }) => {
@@ -25,22 +42,27 @@ export const sendMoney = createAsyncThunk("transactions/send", async (sendData,
   }
 })
 
-// For admin
+// For admin; same arguments as fetchTransactions
 export const fetchAllTransactions = createAsyncThunk(
   "transactions/fetchAllForAdmin",
-  async (_, { rejectWithValue }) => {
+  async ({ filters, cursor } = {}, { rejectWithValue }) => {
     try {
-      return await api.getAllTransactions()
+      return await api.getAllTransactions(toQueryFilters(filters), cursor)
     } catch (error) {
       return rejectWithValue(error.message)
     }
   },
 )
 
+const isNextPage = (action) => Boolean(action.meta.arg?.cursor)
+
 const initialState = {
   transactions: [],
+  nextCursor: null, // null once the last page is loaded
   allTransactions: [], // For admin
+  allNextCursor: null,
   status: "idle", // 'idle' | 'loading' | 'succeeded' | 'failed'
+  loadingMore: false, // a next page is on its way
   error: null,
   filters: {
     type: "all",
@@ -70,16 +92,22 @@ const transactionsSlice = createSlice({
   extraReducers: (builder) => {
     builder
       // Fetch transactions
-      .addCase(fetchTransactions.pending, (state) => {
-        state.status = "loading"
+      .addCase(fetchTransactions.pending, (state, action) => {
+        if (isNextPage(action)) state.loadingMore = true
+        else state.status = "loading"
         state.error = null
       })
       .addCase(fetchTransactions.fulfilled, (state, action) => {
         state.status = "succeeded"
-        state.transactions = action.payload.transactions
+        state.loadingMore = false
+        state.transactions = isNextPage(action)
+          ? state.transactions.concat(action.payload.transactions)
+          : action.payload.transactions
+        state.nextCursor = action.payload.nextCursor
       })
       .addCase(fetchTransactions.rejected, (state, action) => {
         state.status = "failed"
+        state.loadingMore = false
         state.error = action.payload
       })
 
@@ -98,24 +126,33 @@ const transactionsSlice = createSlice({
       })
 
       // Fetch all transactions (admin)
-      .addCase(fetchAllTransactions.pending, (state) => {
-        state.status = "loading"
+      .addCase(fetchAllTransactions.pending, (state, action) => {
+        if (isNextPage(action)) state.loadingMore = true
+        else state.status = "loading"
         state.error = null
       })
       .addCase(fetchAllTransactions.fulfilled, (state, action) => {
         state.status = "succeeded"
-        state.allTransactions = action.payload.transactions
+        state.loadingMore = false
+        state.allTransactions = isNextPage(action)
+          ? state.allTransactions.concat(action.payload.transactions)
+          : action.payload.transactions
+        state.allNextCursor = action.payload.nextCursor
       })
       .addCase(fetchAllTransactions.rejected, (state, action) => {
         state.status = "failed"
+        state.loadingMore = false
         state.error = action.payload
       })
 
       // Clear transactions on logout
       .addCase(logout.fulfilled, (state) => {
         state.transactions = []
+        state.nextCursor = null
         state.allTransactions = []
+        state.allNextCursor = null
         state.status = "idle"
+        state.loadingMore = false
         state.error = null
       })
   },
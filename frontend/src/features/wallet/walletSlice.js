@@ -22,7 +22,8 @@ export const initiateStk = createAsyncThunk(
   "wallet/initiateStk",
   async ({ amount, phone_number }, { rejectWithValue }) => {
     try {
-      // api.addFunds returns the raw STK push response, including CheckoutRequestID
+      // api.addFunds returns the 202 body; the STK push itself is sent in the
+      // background, so only the transactionId is known at this point
       return await api.addFunds(amount, phone_number)
     } catch (err) {
       return rejectWithValue(err.message || "Failed to initiate STK")
@@ -30,12 +31,12 @@ export const initiateStk = createAsyncThunk(
   }
 )
 
-// 3) Poll transaction status (CheckoutRequestID)
+// 3) Poll deposit status (/tx-status/<transactionId>)
 export const pollTxnStatus = createAsyncThunk(
   "wallet/pollTxnStatus",
-  async (checkoutRequestID, { rejectWithValue }) => {
+  async (transactionId, { rejectWithValue }) => {
     try {
-      return await api.getTxnStatus(checkoutRequestID)
+      return await api.getTxnStatus(transactionId)
     } catch (err) {
       return rejectWithValue(err.message || "Poll failed")
     }
@@ -50,7 +51,8 @@ const initialState = {
   error: null,
 
   // STK flow state
-  pendingCheckoutId: null,
+  pendingDepositId: null,   // transactionId of the deposit being confirmed
+  depositResult: null,      // null | 'completed' | 'failed'
   polling: false,
   pollError: null,
 }
@@ -65,7 +67,14 @@ const walletSlice = createSlice({
     },
     stopPolling(state) {
       state.polling = false
-      state.pendingCheckoutId = null
+      state.pendingDepositId = null
+      state.depositResult = null
+    },
+    // final deposit_status pushed over the socket
+    depositSettled(state, action) {
+      state.depositResult = action.payload
+      state.polling = false
+      state.pendingDepositId = null
     },
     updateWalletBalance(state, action) {
       if (state.wallet) state.wallet.balance = action.payload
@@ -91,11 +100,12 @@ const walletSlice = createSlice({
       .addCase(initiateStk.pending, (state) => {
         state.status = "loading"
         state.error = null
+        state.depositResult = null
       })
       .addCase(initiateStk.fulfilled, (state, action) => {
         state.status = "succeeded"
-        // store the CheckoutRequestID for polling
-        state.pendingCheckoutId = action.payload.CheckoutRequestID || action.payload.checkoutRequestID
+        // the CheckoutRequestID is not known yet (202); poll by transactionId
+        state.pendingDepositId = action.payload.transactionId
         state.polling = true
       })
       .addCase(initiateStk.rejected, (state, action) => {
@@ -111,14 +121,15 @@ const walletSlice = createSlice({
       .addCase(pollTxnStatus.fulfilled, (state, action) => {
         const st = action.payload?.status
         if (st && st !== "pending") {
+          state.depositResult = st
           state.polling = false
-          state.pendingCheckoutId = null
+          state.pendingDepositId = null
         }
       })
       .addCase(pollTxnStatus.rejected, (state, action) => {
         state.pollError = action.payload
         state.polling = false
-        state.pendingCheckoutId = null
+        state.pendingDepositId = null
       })
 
       // ── logout cleanup ──
@@ -128,5 +139,5 @@ const walletSlice = createSlice({
   },
 })
 
-export const { clearError, stopPolling, updateWalletBalance } = walletSlice.actions
+export const { clearError, stopPolling, depositSettled, updateWalletBalance } = walletSlice.actions
 export default walletSlice.reducer
@@ -4,7 +4,7 @@ import { useEffect } from "react"
 import { io } from "socket.io-client"
 import { useDispatch, useSelector } from "react-redux"
 import {
-  stopPolling,
+  depositSettled,
   clearError,
   fetchWalletBalance,
 } from "../features/wallet/walletSlice"
@@ -12,7 +12,7 @@ import { fetchTransactions } from "../features/transactions/transactionsSlice"
 
 export default function useMpesaSocket() {
   const dispatch = useDispatch()
-  const { pendingCheckoutId } = useSelector((s) => s.wallet)
+  const { pendingDepositId } = useSelector((s) => s.wallet)
 
   useEffect(() => {
     const backendUrl = import.meta.env.VITE_API_URL || "http://localhost:5000"
@@ -20,17 +20,28 @@ export default function useMpesaSocket() {
       path: "/socket.io",
       transports: ["websocket"],
       withCredentials: true,
+      auth: { token: localStorage.getItem("authToken") },
     })
 
     socket.on("connect_error", (err) => {
       console.error("Socket connection error:", err)
     })
 
-    socket.on("mpesa_status", (msg) => {
-      if (msg.checkoutRequestID === pendingCheckoutId) {
-        // Stop polling and clear any errors
+    // pushed to this user's room when their balance changes
+    socket.on("balance_changed", () => {
+      dispatch(fetchWalletBalance())
+    })
+
+    socket.on("incoming_transfer", () => {
+      dispatch(fetchTransactions())
+    })
+
+    socket.on("deposit_status", (msg) => {
+      if (msg.status === "pending") return  // STK push sent, still waiting
+      if (pendingDepositId != null && String(msg.transactionId) === String(pendingDepositId)) {
+        // Stop polling, clear any errors and record the outcome
         dispatch(clearError())
-        dispatch(stopPolling())
+        dispatch(depositSettled(msg.status))
         // Refresh wallet balance and transaction history
         dispatch(fetchWalletBalance())
         dispatch(fetchTransactions())
@@ -40,5 +51,5 @@ export default function useMpesaSocket() {
     return () => {
       socket.disconnect()
     }
-  }, [dispatch, pendingCheckoutId])
+  }, [dispatch, pendingDepositId])
 }